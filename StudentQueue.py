@@ -1,32 +1,455 @@
 """StudentQueue.py - Python file that holds the functionality of the queue, which does so
-via a Class structure that has a self.queue variable that holds a list of lists which
-contains the student information for all students in the course. The sublists contain student
-first name, last name, 95 number, email, UOID. The first four students in the queue will
+via a Class structure that has a self.queue variable that holds a list of the integer student
+ids (from the StudentDataManager) of all students in the course. The student information itself
+(first name, last name, 95 number, email, UOID) stays in the StudentDataManager roster. The first four students in the queue will
 be those who are 'On Deck', and are allowed to be called upon by the instructor. Once those
 students have been called upon, they are removed from the front of the queue and randomly inserted
-in a location in the back 70% of the queue.
+in a location in the back 70% of the queue. That reinsertion rule is the UniformPolicy, and
+other selection policies (such as the WeightedPolicy, or the CooldownPolicy which guarantees a
+called upon student stays off the deck for a set number of calls) can be handed to the queue instead.
+
+Every call returns a move record holding the exact positions the policy moved students between,
+so a mistaken call can be undone (and redone) by moving the same students back, without
+reshuffling or reading the saved queue again.
 
 Created by Michael Gao on 1-12-2022
 """
 
 import random
 #the Python random library is imported to allow queue randomization in terms of insertion and shuffling the queue
+from studentDataManager import StudentDataManager as SDM
+#the student data manager holds the student information behind each student id
 N = 30
 #Predefined N is 30
+ON_DECK = 4
+#the number of students at the front of the queue that are 'On Deck'
+COOLDOWN = 20
+#the default number of calls a student called upon under the CooldownPolicy has to wait before they can come on deck again
+SAMPLE_ATTEMPTS = 3
+#how many times the WeightedPolicy samples again when it lands on a student without weight
+
+
+class FenwickTree:
+    """The FenwickTree (binary indexed tree) holds one number per student slot and
+    supports changing a slot and finding the slot where a running total is reached
+    in O(log n) time. It is used by the weighted policies to sample students."""
+
+    def __init__(self, size):
+        self.size = size
+        #the number of slots held by the tree
+
+        self.tree = [0] * (size + 1)
+        #the tree is 1-indexed, index 0 is never used
+
+        self.values = [0] * size
+        #the plain value of every slot, kept so set can work out how much a slot changed
+
+        self.top = 1
+        while self.top * 2 <= size:
+            self.top *= 2
+        #the largest power of two not above size, where the search in find starts
+
+    def add(self, slot, amount):
+        """Adds amount to the value held in slot."""
+        self.values[slot] += amount
+        i = slot + 1
+        while i <= self.size:
+            self.tree[i] += amount
+            i += i & (-i)
+            #walk up to every node of the tree that covers this slot
+
+    def set(self, slot, value):
+        """Sets the value held in slot."""
+        self.add(slot, value - self.values[slot])
+
+    def total(self):
+        """Returns the sum of every slot."""
+        result = 0
+        i = self.size
+        while i > 0:
+            result += self.tree[i]
+            i -= i & (-i)
+        return result
+
+    def find(self, target, scale=None, offset=None):
+        """Returns the first slot where the running total goes above target.
+        When scale and offset are given, the value of a slot is taken to be
+        scale * (value in this tree) - (value in the offset tree), which lets
+        a weight that grows with time be sampled without touching every slot."""
+
+        position = 0
+        step = self.top
+        while step > 0:
+            nextPosition = position + step
+            if nextPosition <= self.size:
+                weight = self.tree[nextPosition]
+                if offset is not None:
+                    weight = scale * weight - offset.tree[nextPosition]
+                if weight <= target:
+                    position = nextPosition
+                    target -= weight
+                    #the target is further right, skip over this whole node
+            step //= 2
+        return min(position, self.size - 1)
+
+
+class UniformPolicy:
+    """The UniformPolicy is the original selection policy: a called upon student is
+    removed from the front of the queue and randomly inserted in a location in the
+    back 70% of the queue."""
+
+    def attach(self, queue, deckSize=ON_DECK):
+        """Called whenever the queue gets a new ordering. The uniform policy does not
+        keep any state about the queue."""
+        pass
+
+    def reinsert(self, queue, studentId):
+        """Moves the student with the given id to a random location in the back 70% of the queue.
+        Returns the move as (student id, index moved from, index moved to), or None if the student
+        is not in the queue."""
+
+        numberStudents = len(queue)
+        # gets the number of students in the queue and assigns it to numberStudents, contains integer
+
+        percentageN = N/100
+        # calculates the percentage of N (defined at the top of the file) out of 100, represented as a decimal,
+        # and is assigned to the variable percentageN, contains decimal
+
+        unroundedLocation = percentageN * numberStudents
+        # multiplies percentageN and numberStudents to calculate the unrounded starting index
+        # of where to reinsert a called upon student, assigned to unroundedLocation, contains decimal
+
+        startLocation = round(unroundedLocation)
+        # rounds the unroundedLocation variable to the nearest whole number, contains integer
+
+        insertionLocation = random.randint(startLocation , numberStudents)
+        # chooses a random number anywhere between the startLocation and numberStudents,
+        # aka the first 30% of the queue to the end of the queue (in total, the back 70% of the queue).
+        # the chosen number is the specific index where the student will be inserted into the queue, contains integer
+
+
+        if studentId in queue:
+            fromIndex = queue.index(studentId)
+            del queue[fromIndex]
+            queue.insert(insertionLocation, studentId)
+            #if the student is in the queue, then we removed them from the front of the queue and insert them
+            # in the randomly chosen location of insertionLocation specified above. This inserts the student
+            # anywhere in the back 70% of the queue.
+
+            return (studentId, fromIndex, min(insertionLocation, numberStudents - 1))
+            #inserting past the end of the list puts the student at the end, so that is where they ended up
+
+    def settle(self, queue):
+        """Called before the whole queue is read or changed. The uniform policy always keeps the
+        queue in order."""
+        pass
+
+    def revert(self, queue, move):
+        """Undoes a move returned by reinsert. Moves have to be reverted newest first."""
+        studentId, fromIndex, toIndex = move
+        del queue[toIndex]
+        queue.insert(fromIndex, studentId)
+
+    def replay(self, queue, move):
+        """Redoes a move that was reverted, putting the student back where reinsert put them
+        instead of picking a new random location."""
+        studentId, fromIndex, toIndex = move
+        del queue[fromIndex]
+        queue.insert(toIndex, studentId)
+
+
+class WeightedPolicy:
+    """The WeightedPolicy picks which student comes on deck next instead of picking
+    where the called upon student goes. The student that fills the open on deck spot is
+    sampled from everyone not on deck, weighted by how much they have participated, and
+    the called upon student takes the place in the queue that student came from.
+
+    Two weightings are available:
+        'participation' -> weight is 1 / (1 + number of times called), so students
+                           that have been called less come on deck more often
+        'recency'       -> weight is the number of calls since the student was last
+                           called, so students that have waited longer come on deck sooner
+
+    Each index of the queue is a slot in a FenwickTree holding the weight of the student
+    at that index. A call only swaps two entries of the queue and updates one slot, so
+    picking a student and updating their weight both take O(log n) time, no matter how big
+    the roster is. The order of the students off the deck doesn't matter to this policy."""
+
+    def __init__(self, weighting="participation", counts=None):
+        """weighting is either 'participation' or 'recency'. counts is an optional
+        dictionary of student id -> number of times called, for example compiled
+        from the logs, so the weights carry over between runs of the program."""
+
+        if weighting not in ("participation", "recency"):
+            raise ValueError(f"Unknown weighting '{weighting}'.")
+
+        self.weighting = weighting
+        self.counts = dict(counts) if counts is not None else {}
+        #the number of times each student has been called, indexed by student id
+
+        self.clock = 0
+        #the number of calls made so far, used by the recency weighting
+
+        self.lastCalled = {}
+        #the clock value of the last call of each student, indexed by student id, used by the recency
+        #weighting. It is kept by student id so it carries over when the queue is reordered
+
+        self.weights = None
+        self.eligible = None
+        #the trees used for sampling, one slot per index of the queue, built in attach
+
+        self.deckSize = ON_DECK
+        #the number of on deck students, set in attach
+
+    def weight(self, studentId):
+        """Returns the participation weight of a student."""
+        return 1 / (1 + self.counts.get(studentId, 0))
+
+    def attach(self, queue, deckSize=ON_DECK):
+        """Builds the sampling trees for the current ordering of the queue. Students
+        on deck get a weight of zero since they can't be picked to come on deck."""
+
+        self.deckSize = deckSize
+        self.weights = FenwickTree(len(queue))
+        self.eligible = FenwickTree(len(queue))
+
+        for slot, studentId in enumerate(queue[deckSize:], start=deckSize):
+            self.makeEligible(slot, studentId)
+
+    def makeEligible(self, slot, studentId):
+        """Gives the student at a queue index off the deck their weight in the trees."""
+        if self.weighting == "participation":
+            self.weights.set(slot, self.weight(studentId))
+        else:
+            self.eligible.set(slot, 1)
+            self.weights.set(slot, self.lastCalled.get(studentId, 0))
+
+    def sample(self):
+        """Returns the queue index of a randomly sampled student, weighted by the trees,
+        or None if there is nobody to sample from."""
+
+        if self.weighting == "participation":
+            tree = self.weights
+            total = tree.total()
+            find = lambda target: tree.find(target)
+        else:
+            # with the recency weighting every eligible student's weight is clock - lastCalled,
+            # so the weights can be summed from the number of eligible students and their last calls
+            tree = self.eligible
+            total = (self.clock + 1) * tree.total() - self.weights.total()
+            find = lambda target: tree.find(target, scale=self.clock + 1, offset=self.weights)
+        if total <= 0:
+            return None
+
+        for attempt in range(SAMPLE_ATTEMPTS):
+            slot = find(random.random() * total)
+            if tree.values[slot] > 0:
+                return slot
+        #the participation weights are floats, so the sums held by the tree drift from the weights they
+        #were built from, and a sample can land on a slot without weight (ex. one on deck). After a few
+        #tries the last slot with weight is taken, so a call always brings someone on deck
+
+        for slot in range(len(tree.values) - 1, self.deckSize - 1, -1):
+            if tree.values[slot] > 0:
+                return slot
+        return None
+
+    def reinsert(self, queue, studentId):
+        """Swaps the on deck student with the given id with a sampled student off the deck.
+        Returns the move (see apply), or None if the student is not on deck."""
+
+        deck = queue[:self.deckSize]
+        if studentId not in deck:
+            return None
+        #give up if the called upon student is not on deck, their slot has no weight to give
+
+        return self.apply(queue, deck.index(studentId), self.sample())
+
+    def apply(self, queue, fromIndex, picked):
+        """Makes one call of the student at fromIndex on the deck. picked is the queue index of the
+        student to bring on deck, or None if there is nobody off the deck. Returns the move as (student
+        id, index on the deck, their count and last call before the move, picked)."""
+
+        studentId = queue[fromIndex]
+        move = (studentId, fromIndex, self.counts.get(studentId, None), self.lastCalled.get(studentId, None), picked)
+
+        self.clock += 1
+        self.counts[studentId] = self.counts.get(studentId, 0) + 1
+        self.lastCalled[studentId] = self.clock
+        #record the call for the weights
+
+        if picked is not None:
+            queue[fromIndex], queue[picked] = queue[picked], studentId
+            self.makeEligible(picked, studentId)
+            #the sampled student takes the on deck spot, and the called upon student takes their
+            #place off the deck where they can be sampled again
+
+        return move
+
+    def revert(self, queue, move):
+        """Undoes a move returned by reinsert, putting both students back and restoring the
+        weights. Moves have to be reverted newest first."""
+
+        studentId, fromIndex, count, lastCalled, picked = move
+
+        self.clock -= 1
+        if count is None:
+            del self.counts[studentId]
+        else:
+            self.counts[studentId] = count
+        if lastCalled is None:
+            del self.lastCalled[studentId]
+        else:
+            self.lastCalled[studentId] = lastCalled
+
+        if picked is not None:
+            queue[fromIndex], queue[picked] = studentId, queue[fromIndex]
+            self.makeEligible(picked, queue[picked])
+            #the student that was brought on deck goes back where they were sampled from
+
+    def replay(self, queue, move):
+        """Redoes a move that was reverted, bringing the same student on deck instead of
+        sampling a new one."""
+        self.apply(queue, move[1], move[4])
+
+    def settle(self, queue):
+        """Called before the whole queue is read or changed. The weighted policy always keeps the
+        queue in order."""
+        pass
+
+
+class CooldownPolicy:
+    """The CooldownPolicy guarantees that a called upon student stays off the deck for at least
+    `cooldown` calls, which the N = 30 rule of the UniformPolicy can't (a student put back near the
+    30% mark can come on deck again soon after).
+
+    The students waiting out their cooldown sit in a ring of buckets, one bucket per call, at the back
+    of the queue. Every call drains the oldest bucket into the pool of eligible students (everyone not
+    on deck and not cooling down) and puts the called upon student in the bucket it freed, so a student
+    drains exactly `cooldown` calls after they were called. The student that fills the open on deck spot
+    is picked at random from the eligible pool. The queue list is laid out as
+
+        [on deck students] [eligible pool, in any order] [ring of buckets, oldest first from head]
+
+    and a call only swaps three entries of it, so it takes O(1) time no matter how big the roster is.
+    The ring turns in place, so settle rotates it back to oldest first before the queue is saved,
+    which lets attach rebuild the ring from a saved queue (the last `cooldown` students are cooling
+    down, the oldest first)."""
+
+    def __init__(self, cooldown=COOLDOWN):
+        if cooldown < 1:
+            raise ValueError("The cooldown has to be at least one call.")
+
+        self.cooldown = cooldown
+        self.size = 0
+        #the number of buckets in the ring, the cooldown unless there are too few students off the deck
+
+        self.head = 0
+        #the offset in the ring of the oldest bucket, which is drained by the next call
+
+        self.deckSize = ON_DECK
+
+    def attach(self, queue, deckSize=ON_DECK):
+        """Called whenever the queue gets a new ordering. The last students of the queue are the ones
+        cooling down, the oldest first."""
+        self.deckSize = deckSize
+        self.size = max(0, min(self.cooldown, len(queue) - deckSize))
+        #with fewer students off the deck than the cooldown every student off the deck is cooling down,
+        #and the students come back on deck in the order they were called
+        self.head = 0
+
+    def reinsert(self, queue, studentId):
+        """Puts the on deck student with the given id in the newest bucket of the ring and fills their
+        spot from the eligible pool. Returns the move (see apply), or None if the student is not on deck."""
+        deck = queue[:self.deckSize]
+        if studentId not in deck:
+            return None
+        if self.size == 0:
+            return (studentId, deck.index(studentId), None)
+            #everyone is on deck, so nobody moves
+
+        ring = len(queue) - self.size
+        #the index of the first bucket of the ring, the eligible pool is everything between the deck and it
+        picked = random.randrange(self.deckSize, ring + 1)
+        return self.apply(queue, deck.index(studentId), None if picked == ring else picked)
+
+    def apply(self, queue, fromIndex, picked):
+        """Makes one call of the student at fromIndex on the deck. picked is the index in the eligible
+        pool of the student to bring on deck, or None to bring on the student drained from the oldest bucket.
+        Returns the move as (student id, index on the deck, picked)."""
+        studentId = queue[fromIndex]
+        oldest = len(queue) - self.size + self.head
+        drained = queue[oldest]
+
+        if picked is None:
+            queue[fromIndex] = drained
+        else:
+            queue[fromIndex] = queue[picked]
+            queue[picked] = drained
+            #the drained student takes the pool spot of the student that went on deck
+        queue[oldest] = studentId
+        #the called upon student goes in the bucket that was drained, which is now the newest
+        self.head = (self.head + 1) % self.size
+
+        return (studentId, fromIndex, picked)
+
+    def revert(self, queue, move):
+        """Undoes a move returned by reinsert. Moves have to be reverted newest first."""
+        studentId, fromIndex, picked = move
+        if self.size == 0:
+            return
+        self.head = (self.head - 1) % self.size
+        newest = len(queue) - self.size + self.head
+        #the bucket the called upon student was put in, which goes back to being the oldest
+
+        if picked is None:
+            queue[newest] = queue[fromIndex]
+        else:
+            queue[newest] = queue[picked]
+            queue[picked] = queue[fromIndex]
+        queue[fromIndex] = studentId
+
+    def replay(self, queue, move):
+        """Redoes a move that was reverted, bringing the same student on deck instead of picking a new one."""
+        if self.size > 0:
+            self.apply(queue, move[1], move[2])
+
+    def settle(self, queue):
+        """Called before the whole queue is read or changed. Rotates the ring in place so the oldest
+        bucket is first again. This costs O(cooldown) time, less than reading the whole queue."""
+        if self.head:
+            ring = len(queue) - self.size
+            queue[ring:] = queue[ring + self.head:] + queue[ring:ring + self.head]
+            self.head = 0
+
 
 class StudentQueue:
 
-    def __init__(self, studentArray):
+    def __init__(self, studentArray, policy=None, deckSize=ON_DECK):
 
         """The initializer for the StudentQueue takes in an list of lists, where each
         sublist holds a student and their info (ex. student first name, student last name,
-        student id, etc) of students in the course. The first four students in the queue
-        will be 'On Deck'"""
+        student id, etc) of students in the course. Each student is looked up in (or added to)
+        the StudentDataManager roster and the queue keeps just their integer id. The first deckSize (four by default)
+        students in the queue will be 'On Deck'. The optional policy decides where called upon students are
+        reinserted, and defaults to the UniformPolicy (anywhere in the back 70%)."""
 
-        self.queue = studentArray
-        #this initializes the queue to hold the contents of studentArray, which is a
+        self.queue = [SDM.GetStudentId(student) for student in studentArray]
+        #this initializes the queue to hold the ids of the students in studentArray, which is a
         #list of lists that contains all the student information
 
+        self.roster = SDM.StudentRoster
+        #the student information behind each id
+
+        self.deckSize = deckSize
+        #the number of students that are 'On Deck' at the front of the queue
+
+        self.policy = policy if policy is not None else UniformPolicy()
+        #the selection policy used by processOnDeckStudents, the uniform one if none was given
+
+        self.policy.attach(self.queue, self.deckSize)
+        #let the policy look at the starting ordering of the queue
+
 
     def numStudents(self):
 
@@ -34,99 +457,142 @@ class StudentQueue:
         entered into the course."""
 
         return len(self.queue)
-        #this finds the number of lists (aka students) within the self.queue variable
+        #this finds the number of ids (aka students) within the self.queue variable
         #by taking the length of it and returns it
 
 
 
     def getOnDeckStudents(self):
-        """The getOnDeckStudents function returns the first 4 students
-        in the queue, which are the 'On Deck' students."""
+        """The getOnDeckStudents function returns the first deckSize (4 by default)
+        students in the queue, which are the 'On Deck' students."""
 
-        return [str(self.queue[i][0] + ' ' + self.queue[i][1]) for i in range(0 , 4)]
+        return [str(self.roster[i][0] + ' ' + self.roster[i][1]) for i in self.getOnDeckIds()]
 
         # this uses Python list comprehension to create and return a new list which contains a concatenated
         # string of the first and last name  of the first four students in the self.queue, which subsequently
         # are the 'On Deck' students.
 
-        # it iterates over the values 0, 1, 2 , and 3, and takes the list at index i and then the item at the
-        # 1st subindex (0) to get the first name, and the item and the 2nd subindex (1) to get the last name.
-        #this then concatenates together via the string function, while adding a space between the names and
-        # stores the four student names in a new list.
+        # it iterates over the ids of the on deck students, and looks up the student information of each id
+        # in the roster, taking the item at the 1st subindex (0) to get the first name, and the item at the
+        # 2nd subindex (1) to get the last name. this then concatenates together via the string function,
+        # while adding a space between the names and stores the four student names in a new list.
+
+
+    def getOnDeckIds(self):
+        """The getOnDeckIds function returns the ids of the first deckSize (4 by default)
+        students in the queue, which are the 'On Deck' students."""
+
+        return self.queue[0:self.deckSize]
 
 
 
-    def processOnDeckStudents(self, student):
+    def processOnDeckStudents(self, studentId):
 
         """The processOnDeckStudents function is called once an Instructor
         calls upon a student, and thus the student is removed from their
         on deck position (in the front of the queue) and moved to the back
         of the queue to allow other students to be called upon. It takes in
-        a student name string as input."""
+        the student's integer id as input. Where the student goes is decided by
+        the selection policy the queue was created with."""
 
+        return self.policy.reinsert(self.queue, studentId)
+        # hands the queue and the called upon student over to the selection policy, which
+        # moves the student out of the on deck positions and somewhere into the back of the queue.
+        # the policy returns a record of the move, which can be handed to undoMove to take it back
 
-        numberStudents = self.numStudents()
-        # calls the numStudents function to get the number of
-        # students in the queue and assigns it to numberStudents, contains integer
+    def undoMove(self, move):
 
-        studentnames = student.split()
-        # takes the student name input string and splits it based on the space
-        # to distinct between first and last name. These values are stored at the 1st and
-        # 2nd index location inside the studentnames array stored inside the studentnames,
-        # contains string
+        """The undoMove function takes back a call made with processOnDeckStudents, given the
+        move it returned. Only the students that were moved are touched, so it takes about as long
+        as the call did. Moves have to be undone newest first."""
 
-        studentfname = studentnames[0].strip()
-        # gets the first element of the studentnames array to get the first name,
-        # strips any remaining whitespace, and assigns it to studentfname, contains string
+        self.policy.revert(self.queue, move)
 
-        studentlname = studentnames[1].strip()
-        # gets the second element of the studentnames array to get the first name,
-        # strips any remaining whitespace, and assigns it to studentfname, contains string
+    def redoMove(self, move):
 
-        percentageN = N/100
-        # calculates the percentage of N (defined at the top of the file) out of 100, represented as a decimal,
-        # and is assigned to the variable percentageN, contains decimal
+        """The redoMove function makes a call that was taken back with undoMove again, moving the
+        students to the same places they went the first time."""
 
-        unroundedLocation = percentageN * numberStudents
-        # multiplies percentageN and numberStudents to calculate the unrounded starting index
-        # of where to reinsert a called upon student, assigned to unroundedLocation, contains decimal
+        self.policy.replay(self.queue, move)
 
-        startLocation = round(unroundedLocation)
-        # rounds the unroundedLocation variable to the nearest whole number, contains integer
+    def processOnDeckGroup(self, studentIds):
 
-        insertionLocation = random.randint(startLocation , numberStudents)
-        # chooses a random number anywhere between the startLocation and numberStudents,
-        # aka the first 30% of the queue to the end of the queue (in total, the back 70% of the queue).
-        # the chosen number is the specific index where the student will be inserted into the queue, contains integer
+        """The processOnDeckGroup function is called when an Instructor calls upon several on deck
+        students at once (for example a think-pair-share group). Every student in studentIds that is
+        on deck is handed to the selection policy in one pass, the same as processOnDeckStudents would.
+        Returns the moves made, in order, which can be handed to undoGroup to take the whole group back."""
+
+        onDeck = set(self.getOnDeckIds())
+        moves = [self.policy.reinsert(self.queue, studentId) for studentId in studentIds if studentId in onDeck]
+        # the students are handed over one at a time. The uniform policy shifts the queue list for each of
+        # them, but that shift is one memmove of the list's pointers, which is faster than rebuilding the
+        # list in a single pass out of slices (copying a slice has to touch every student it copies). The
+        # other policies only swap a few entries per student
+        # the deck is looked at once before the group is called, so a student that comes on deck while the
+        # group is being called isn't taken off with it
+        return [move for move in moves if move is not None]
+
+    def undoGroup(self, moves):
 
+        """The undoGroup function takes back a group call made with processOnDeckGroup, newest move first."""
 
-        for i in self.queue:
-            #loop through the contents of the queue
+        for move in reversed(moves):
+            self.policy.revert(self.queue, move)
 
-            if i[0] == studentfname and i[1] == studentlname:
-                self.queue.remove(i)
-                self.queue.insert(insertionLocation, i)
-                #if the first and last name at the specific index match the student in question, then we removed them
-                # from the front of the queue and insert them in the randomly chosen location of insertionLocation
-                # specified above. This inserts the student anywhere in the back 70% of the queue.
-                
-                break
-                #break from the loop after done
+    def redoGroup(self, moves):
 
+        """The redoGroup function makes a group call that was taken back with undoGroup again."""
 
+        for move in moves:
+            self.policy.replay(self.queue, move)
+
+
+
+    def addStudents(self, studentIds):
+
+        """The addStudents function adds students that joined the course to the queue. Each one is
+        inserted at a random location in the back 70% of the queue, the same place a called upon
+        student goes, so they don't jump onto the deck."""
+
+        self.policy.settle(self.queue)
+        #the policy puts the queue in order before its students change
+
+        for studentId in studentIds:
+            startLocation = max(round(N/100 * len(self.queue)), min(self.deckSize, len(self.queue)))
+            self.queue.insert(random.randint(startLocation, len(self.queue)), studentId)
+
+        self.policy.attach(self.queue, self.deckSize)
+        #the policy has to look at the queue again since its students changed
+
+    def removeStudents(self, studentIds):
+
+        """The removeStudents function takes students that left the course out of the queue.
+        Students behind them move up, so the deck is filled back up from the front of the queue."""
+
+        leaving = set(studentIds)
+        self.policy.settle(self.queue)
+        self.queue[:] = [studentId for studentId in self.queue if studentId not in leaving]
+
+        self.policy.attach(self.queue, self.deckSize)
 
     def randomize(self):
         """The randomize function randomizes the order of the students in the list."""
         random.shuffle(self.queue)
         #randomly shuffles around the order of the contents inside the self.queue variable
 
+        self.policy.attach(self.queue, self.deckSize)
+        #the policy has to look at the new ordering since different students are now on deck
+
     def sendQueue(self):
 
         """The sendQueue function gets the current ordering of the student queue
         and sends it to the Student Data module in order to save the queue state."""
 
-        return self.queue
-        #this function gets the contents of the self.queue variable and returns it.
+        self.policy.settle(self.queue)
+        #let the policy put the queue in the order it is saved in
+
+        return [self.roster[i] for i in self.queue]
+        #this function looks up the student information of every id in the self.queue variable and returns it.
 
 
     def studentOrdering(self):
@@ -135,7 +601,7 @@ class StudentQueue:
         in the queue."""
 
         for student in self.queue:
-            print(student)
+            print(self.roster[student])
             #this iterates over all the sublists in the self.queue and prints all their student info.
 
 
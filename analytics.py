@@ -0,0 +1,294 @@
+"""
+analytics.py - Participation analytics over the cold call logs.
+
+Loads every cold call record (archives and the live log) into NumPy arrays once,
+and computes the report with vectorized operations instead of per record Python:
+    * Calls and flags per student, and the ratio of flagged calls
+    * Gaps between consecutive calls of each student
+    * Calls per week of the term, for the course and per student
+    * A Gini index of how evenly the calls were spread over the students, for every course
+      and for all of them together
+
+The report is written as a CSV file with one row per student, and as a static HTML
+page with all of its styling and charts inline, so it can be emailed or opened offline.
+
+Requires NumPy.
+"""
+
+import csv
+import datetime
+import html
+import itertools
+import numpy
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+# Seconds in a week, used to bucket calls into weeks of the term
+WEEK = 7 * 24 * 60 * 60
+
+# The columns of the log records the report is computed from
+COLUMNS = ("date", "time", "flagged", "uoid", "fname", "lname")
+
+
+class ParticipationLogs:
+    """ The cold call records held as parallel NumPy arrays, one element per call.
+
+    Attributes
+    ----------
+    students (List[tuple]): The student data of every student index, students on the roster first.
+    student (numpy.ndarray): The student index of each call.
+    time (numpy.ndarray): The time of each call in seconds since the epoch (local time).
+    flagged (numpy.ndarray): Whether each call was flagged.
+    courses (List[str]): The name of every course index, the course of the current roster first.
+    course (numpy.ndarray): The course index of each call.
+    roster_size (int): The number of students on the current roster, which are the first student indexes.
+    """
+
+    def __init__(self, students, student, time, flagged, courses=("Course",), course=None, roster_size=0):
+        self.students, self.student, self.time, self.flagged = students, student, time, flagged
+        self.courses = list(courses)
+        self.course = course if course is not None else numpy.zeros(len(student), dtype=numpy.int64)
+        self.roster_size = roster_size
+
+
+def load_logs(records=None, include_roster=True, course="Course") -> ParticipationLogs:
+    """ Loads the cold call records into arrays.
+
+    Arguments
+    ---------
+    records (Iterable[tuple]): (date, time, flagged, uoid, first name, last name) of every record to load,
+        defaults to every archive and the live log. A seventh value names the course of the record.
+    include_roster (bool): Whether every student on the current roster is included, even those never called.
+    course (str): The course of the current roster, and of the records that don't name a course.
+
+    Returns
+    -------
+    ParticipationLogs: The records as arrays.
+    """
+
+    if records is None:
+        records = fio.scan_logs(COLUMNS)
+
+    # Calls that were undone are left out along with the records that undid them
+    records = fio.cancel_undone(records, 3, 2)
+
+    # The index of every student seen so far, by UO ID, and their data
+    index = {}
+    students = []
+    if include_roster:
+        for data in SDM.StudentRoster.values():
+            if data[2] not in index:
+                index[data[2]] = len(students)
+                students.append(tuple(data[0:6]))
+
+    roster_size = len(students)
+
+    # The index of every course seen so far, by name
+    courses = {course: 0}
+
+    # Only the columns the report needs are kept from each line
+    student, stamps, flagged, course_index = [], [], [], []
+    for date, time, flag, uoid, fname, lname, *named in records:
+        if uoid not in index:
+            index[uoid] = len(students)
+            students.append((fname, lname, uoid))
+        student.append(index[uoid])
+        course_index.append(courses.setdefault(named[0] if named else course, len(courses)))
+        # The logs use YYYY/MM/DD HH:MM:SS, turned into ISO 8601 so NumPy can parse all of them at once
+        stamps.append(f"{date.replace('/', '-')}T{time}")
+        flagged.append(flag == "True")
+
+    return ParticipationLogs(
+        students,
+        numpy.array(student, dtype=numpy.int64),
+        numpy.array(stamps, dtype="datetime64[s]").astype(numpy.int64),
+        numpy.array(flagged, dtype=bool),
+        list(courses),
+        numpy.array(course_index, dtype=numpy.int64),
+        roster_size,
+    )
+
+
+def gini(values: numpy.ndarray) -> float:
+    """ Gets the Gini index of a set of values. 0 means every value is the same (everyone was
+    called equally often) and values close to 1 mean a few students got almost every call.
+    """
+    if len(values) == 0 or values.sum() == 0:
+        return 0.0
+    ordered = numpy.sort(values.astype(numpy.float64))
+    n = len(ordered)
+    ranks = numpy.arange(1, n + 1)
+    return float((2 * (ranks * ordered).sum()) / (n * ordered.sum()) - (n + 1) / n)
+
+
+def compute_report(logs: ParticipationLogs) -> dict:
+    """ Computes the participation statistics of every student and of the course.
+
+    Arguments
+    ---------
+    logs (ParticipationLogs): The records from load_logs.
+
+    Returns
+    -------
+    dict: The per student arrays (indexed by student index) and the course totals.
+    """
+
+    n = len(logs.students)
+    calls = numpy.bincount(logs.student, minlength=n)
+    flags = numpy.bincount(logs.student, weights=logs.flagged, minlength=n).astype(numpy.int64)
+
+    # Students that were never called have a flag ratio of zero instead of dividing by zero
+    flag_ratio = numpy.divide(flags, calls, out=numpy.zeros(n), where=calls > 0)
+
+    # Sort the calls by student and then by time, so the gaps are the differences between neighbours of the same student
+    order = numpy.lexsort((logs.time, logs.student))
+    student_sorted, time_sorted = logs.student[order], logs.time[order]
+    same_student = student_sorted[1:] == student_sorted[:-1]
+    gaps = (time_sorted[1:] - time_sorted[:-1])[same_student]
+    gap_owner = student_sorted[1:][same_student]
+    gap_count = numpy.bincount(gap_owner, minlength=n)
+    mean_gap = numpy.divide(numpy.bincount(gap_owner, weights=gaps, minlength=n), gap_count,
+                            out=numpy.full(n, numpy.nan), where=gap_count > 0)
+
+    # The longest gap of each student. Students without a gap are left at -inf and become NaN like their mean gap
+    max_gap = numpy.full(n, -numpy.inf)
+    numpy.maximum.at(max_gap, gap_owner, gaps)
+    max_gap[numpy.isneginf(max_gap)] = numpy.nan
+
+    # The calls of every student in every course, as one row per course. A course's students are the ones called in
+    # it, and for the course of the current roster also everyone on the roster
+    course_count = len(logs.courses)
+    course_calls = numpy.bincount(logs.course * n + logs.student, minlength=course_count * n).reshape(course_count, n)
+    in_course = course_calls > 0
+    in_course[0, :logs.roster_size] = True
+
+    # Weeks are counted from the first call in the logs
+    if len(logs.time):
+        week = (logs.time - logs.time.min()) // WEEK
+        calls_per_week = numpy.bincount(week)
+    else:
+        calls_per_week = numpy.zeros(0, dtype=numpy.int64)
+    weeks = max(len(calls_per_week), 1)
+
+    return {
+        "calls": calls,
+        "flags": flags,
+        "flag_ratio": flag_ratio,
+        "mean_gap_days": mean_gap / 86400,
+        "max_gap_days": max_gap / 86400,
+        "calls_per_week": calls / weeks,
+        "course_calls_per_week": calls_per_week,
+        "gini": gini(calls),
+        "course_gini": {name: gini(course_calls[c][in_course[c]]) for c, name in enumerate(logs.courses)},
+        "total_calls": int(calls.sum()),
+        "total_flags": int(flags.sum()),
+        "first_call": int(logs.time.min()) if len(logs.time) else None,
+    }
+
+
+def _rows(logs: ParticipationLogs, report: dict):
+    """ Yields one row of report values per student, most called first.
+    """
+    for i in numpy.argsort(-report["calls"], kind="stable"):
+        student = logs.students[i]
+        yield (
+            student[0], student[1], student[2],
+            int(report["calls"][i]), int(report["flags"][i]),
+            f"{report['flag_ratio'][i]:.3f}",
+            "" if numpy.isnan(report["mean_gap_days"][i]) else f"{report['mean_gap_days'][i]:.2f}",
+            "" if numpy.isnan(report["max_gap_days"][i]) else f"{report['max_gap_days'][i]:.2f}",
+            f"{report['calls_per_week'][i]:.2f}",
+        )
+
+
+# The column titles of the per student rows
+HEADER = ("First Name", "Last Name", "UOID", "Times Called", "Times Flagged", "Flag Ratio",
+          "Mean Days Between Calls", "Longest Days Between Calls", "Calls Per Week")
+
+
+def write_csv(path: str, logs: ParticipationLogs, report: dict) -> None:
+    """ Writes the per student report as a CSV file.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(_rows(logs, report))
+
+
+def write_html(path: str, logs: ParticipationLogs, report: dict, course: str = "Course") -> None:
+    """ Writes the report as a single static HTML page with the styling and the weekly chart inline.
+    """
+
+    # A bar chart of the calls made in each week of the term, drawn as inline SVG
+    weekly = report["course_calls_per_week"]
+    tallest = max(int(weekly.max()), 1) if len(weekly) else 1
+    bar_width = 24
+    bars = "".join(
+        f'<rect x="{i * bar_width + 2}" y="{120 - 110 * int(count) / tallest:.1f}" width="{bar_width - 4}" '
+        f'height="{110 * int(count) / tallest:.1f}"><title>Week {i + 1}: {int(count)} calls</title></rect>'
+        for i, count in enumerate(weekly))
+    chart = f'<svg width="{max(len(weekly), 1) * bar_width}" height="120" class="chart">{bars}</svg>'
+
+    fairness = "".join(f"<tr><td>{html.escape(name)}</td><td>{value:.3f}</td></tr>\n" for name, value in report["course_gini"].items())
+
+    first_call = report["first_call"]
+    since = (datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=first_call)).strftime("%Y/%m/%d") if first_call is not None else "-"
+    rows = "".join("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>\n"
+                   for row in _rows(logs, report))
+    header = "".join(f"<th>{html.escape(title)}</th>" for title in HEADER)
+
+    with open(path, "w") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(course)} Participation</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #999; padding: 4px 8px; text-align: left; }}
+th {{ background: #eee; }}
+.chart rect {{ fill: #336; }}
+</style></head><body>
+<h1>{html.escape(course)} Participation</h1>
+<p>Calls: {report['total_calls']} &middot; Flagged: {report['total_flags']} &middot; Students: {len(logs.students)}
+&middot; Gini index: {report['gini']:.3f} &middot; Logs since: {since}</p>
+<h2>Gini index per course</h2>
+<table><tr><th>Course</th><th>Gini index</th></tr>
+{fairness}</table>
+<h2>Calls per week</h2>
+{chart}
+<h2>Students</h2>
+<table><tr>{header}</tr>
+{rows}</table>
+</body></html>
+""")
+
+
+def _course_records(name: str, paths):
+    """ Yields the records of the merged logs of another course, each with the name of the course added.
+    """
+    for record in fio.scan_merged_logs(paths, COLUMNS):
+        yield record + (name,)
+
+
+def generate_report(csv_path: str, html_path: str, course: str = "Course", course_logs=None) -> dict:
+    """ Loads the logs and writes the participation report as CSV and HTML.
+
+    Arguments
+    ---------
+    csv_path (str): The path to write the CSV report to.
+    html_path (str): The path to write the HTML report to.
+    course (str): The name of the course of the current roster, shown in the HTML report.
+    course_logs (dict): The log files of other courses to report on too, by course name. The logs of
+        each course are merged like the logs of several machines (see fileIO.merge_logs).
+
+    Returns
+    -------
+    dict: The computed report, see compute_report.
+    """
+    records = fio.scan_logs(COLUMNS)
+    if course_logs:
+        records = itertools.chain(records, *(_course_records(name, paths) for name, paths in course_logs.items()))
+    logs = load_logs(records, course=course)
+    report = compute_report(logs)
+    write_csv(csv_path, logs, report)
+    write_html(html_path, logs, report, course)
+    return report
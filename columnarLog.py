@@ -0,0 +1,310 @@
+"""
+columnarLog.py - An alternative store for the cold call logs meant for analytics.
+
+Instead of one line of text per cold call that repeats all of the student data, every
+cold call is stored as three fixed width columns, each in its own file in COLUMN_DIR:
+
+    student_id.u32 -> The integer id of the student (4 byte unsigned, little endian)
+    time.i64       -> The time of the call in seconds since the epoch (8 byte signed, little endian)
+    flags.u8       -> 1 if the call was flagged, otherwise 0, plus 2 if the record takes back
+                      the student's last call with that flag (1 byte unsigned)
+
+Calls are written here by logging to a fileIO.ColumnarSink, ex. alongside the text log with
+fileIO.set_log_sink(fileIO.FanoutSink(fileIO.FileSink(), fileIO.ColumnarSink())).
+
+The integer ids point into a dictionary table (students.txt) with one line of student data
+per id, so the student data is only stored once. Each column can be read straight into an
+array, or into NumPy with numpy.fromfile(path, dtype="<u4") (and "<i8", "u1"), so per student
+counts and histograms are vectorized column operations instead of re-splitting text.
+"""
+
+import array
+import datetime
+import os
+import sys
+from studentDataManager import StudentDataManager as SDM
+
+# NumPy is optional, the column operations fall back to plain Python without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Student data in the dictionary table is seperated by a tab, the same as the text logs
+DELIMITER = "\t"
+
+# The folder holding the column files and the dictionary table
+COLUMN_DIR = "./data/logs/columns"
+
+# The array typecode, NumPy dtype and file name of every column
+COLUMNS = {
+    "student_id": ("I", "<u4", "student_id.u32"),
+    "time": ("q", "<i8", "time.i64"),
+    "flags": ("B", "u1", "flags.u8"),
+}
+
+# The bits of the flags column
+FLAGGED = 1
+UNDO = 2
+
+# The dictionary table, one line of student data per integer id
+DICTIONARY_FILE = "students.txt"
+
+# The id of every student in the dictionary table indexed by the student's UO ID, loaded on first use.
+# The dictionary table is keyed by UO ID rather than the StudentDataManager's ids, since those are only
+# assigned for the run of the program while the columns are kept for good.
+_student_ids = None
+
+
+def _column_path(column: str) -> str:
+    return os.path.join(COLUMN_DIR, COLUMNS[column][2])
+
+
+def _load_dictionary() -> dict:
+    """
+    Load the dictionary table into _student_ids if it hasn't been loaded yet.
+    """
+    global _student_ids
+    if _student_ids is None:
+        _student_ids = {}
+        path = os.path.join(COLUMN_DIR, DICTIONARY_FILE)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for student_id, line in enumerate(f):
+                    student = line.rstrip("\n").split(DELIMITER)
+                    _student_ids[student[2]] = student_id
+    return _student_ids
+
+
+def student_id(student_data) -> int:
+    """
+    Get the integer id of a student in the dictionary table, adding them to it if they are new.
+
+    Parameters:
+
+    student_data: tuple -> The student's data (first name, last name, UO ID, ...)
+
+    Return: int
+        The id of the student in the dictionary table
+    """
+    ids = _load_dictionary()
+    uoid = student_data[2]
+    if uoid not in ids:
+        os.makedirs(COLUMN_DIR, exist_ok=True)
+        with open(os.path.join(COLUMN_DIR, DICTIONARY_FILE), "a") as f:
+            f.write(DELIMITER.join(student_data[0:6]) + "\n")
+        ids[uoid] = len(ids)
+    return ids[uoid]
+
+
+def _to_bytes(typecode: str, values) -> bytes:
+    """
+    Pack values into the little endian bytes stored in a column file.
+    """
+    column = array.array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def append(uid, flagged: bool = False, when: datetime.datetime = None) -> None:
+    """
+    Add one cold call to the columns.
+
+    Parameters:
+
+    uid: int -> The student id of the student from the StudentDataManager
+    flagged: bool -> Whether the student's cold call was flagged by the instructor
+    when: datetime -> The time of the cold call, defaults to now
+
+    Return: None
+    """
+    append_many([(uid, flagged, when or datetime.datetime.now())])
+
+
+def append_many(calls) -> None:
+    """
+    Add many cold calls to the columns with one write per column.
+
+    Parameters:
+
+    calls: Iterable[Tuple[uid, bool, datetime]] -> The student, flag and time of every call, and
+        optionally True as a fourth value for a record taking back the student's last call with that flag
+
+    Return: None
+    """
+    ids, times, flags = [], [], []
+    for uid, flagged, when, *undo in calls:
+        student_data = SDM.StudentRoster.get(uid, None)
+        if student_data is None:
+            raise KeyError("The student does not exist on the roster.")
+        ids.append(student_id(student_data))
+        times.append(int(when.timestamp()))
+        flags.append((FLAGGED if flagged else 0) | (UNDO if undo and undo[0] else 0))
+
+    _write_columns(ids, times, flags)
+
+
+def _write_columns(ids, times, flags) -> None:
+    """
+    Append the values of one or more calls to the end of each column file.
+    """
+    if not ids:
+        return
+
+    os.makedirs(COLUMN_DIR, exist_ok=True)
+    for column, values in (("student_id", ids), ("time", times), ("flags", flags)):
+        with open(_column_path(column), "ab") as f:
+            f.write(_to_bytes(COLUMNS[column][0], values))
+
+
+def load_columns() -> dict:
+    """
+    Load every column into memory, as NumPy arrays when NumPy is installed and
+    otherwise as array.array. If the program stopped part way through an append
+    the columns are cut to the calls that were fully written.
+
+    Return: dict
+        The columns indexed by column name, all of the same length
+    """
+    columns = {}
+    for column, (typecode, dtype, _) in COLUMNS.items():
+        path = _column_path(column)
+        if numpy is not None:
+            columns[column] = numpy.fromfile(path, dtype=dtype) if os.path.exists(path) else numpy.zeros(0, dtype=dtype)
+        else:
+            values = array.array(typecode)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                values.frombytes(data[:len(data) - len(data) % values.itemsize])
+                if sys.byteorder == "big":
+                    values.byteswap()
+            columns[column] = values
+
+    length = min(len(values) for values in columns.values())
+    return {column: values[:length] for column, values in columns.items()}
+
+
+def load_dictionary() -> list:
+    """
+    Get the dictionary table.
+
+    Return: list
+        The student data of every id, so the data for id i is at index i
+    """
+    path = os.path.join(COLUMN_DIR, DICTIONARY_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [tuple(line.rstrip("\n").split(DELIMITER)) for line in f]
+
+
+def _bincount(values, length: int, weights=None) -> list:
+    """
+    Count how many times each integer appears in values (or sum their weights).
+    """
+    if numpy is not None:
+        counts = numpy.bincount(numpy.asarray(values, dtype=numpy.int64), weights=weights, minlength=length)
+        return counts.astype(numpy.int64).tolist()
+    counts = [0] * length
+    if weights is None:
+        for value in values:
+            counts[value] += 1
+    else:
+        for value, weight in zip(values, weights):
+            counts[value] += weight
+    return counts
+
+
+def _signs(flags) -> list:
+    """
+    Get the weight of every record when counting calls, 1 for a call and -1 for a record taking one back.
+    """
+    if numpy is not None:
+        return 1 - (numpy.asarray(flags, dtype=numpy.int64) & UNDO)
+    return [1 - (flag & UNDO) for flag in flags]
+
+
+def participation_counts(columns: dict = None) -> list:
+    """
+    Get the number of calls and the number of flagged calls of every student.
+
+    Parameters:
+
+    columns: dict -> Columns from load_columns, loaded if not given
+
+    Return: list
+        (student data, times called, times flagged) for every student in the dictionary table
+    """
+    if columns is None:
+        columns = load_columns()
+    dictionary = load_dictionary()
+    # A record taking back a call counts as minus one call, so the pair adds up to nothing
+    signs = _signs(columns["flags"])
+    calls = _bincount(columns["student_id"], len(dictionary), weights=signs)
+    if numpy is not None:
+        flagged_signs = signs * (numpy.asarray(columns["flags"], dtype=numpy.int64) & FLAGGED)
+    else:
+        flagged_signs = [sign * (flag & FLAGGED) for sign, flag in zip(signs, columns["flags"])]
+    flagged = _bincount(columns["student_id"], len(dictionary), weights=flagged_signs)
+    return [(student, calls[i], flagged[i]) for i, student in enumerate(dictionary)]
+
+
+def calls_per_day(columns: dict = None) -> dict:
+    """
+    Get a histogram of the number of calls made on each day (in UTC).
+
+    Parameters:
+
+    columns: dict -> Columns from load_columns, loaded if not given
+
+    Return: dict
+        The number of calls indexed by date
+    """
+    if columns is None:
+        columns = load_columns()
+    if len(columns["time"]) == 0:
+        return {}
+
+    signs = _signs(columns["flags"])
+    if numpy is not None:
+        days = columns["time"] // 86400
+        first = int(days.min())
+        counts = numpy.bincount(days - first, weights=signs)
+    else:
+        days = [t // 86400 for t in columns["time"]]
+        first = min(days)
+        counts = _bincount([day - first for day in days], max(days) - first + 1, weights=signs)
+
+    epoch = datetime.date(1970, 1, 1)
+    return {epoch + datetime.timedelta(days=first + i): int(count) for i, count in enumerate(counts) if count}
+
+
+def convert_text_log(lines) -> int:
+    """
+    Add the records of the text logs to the columns, for example to move over the
+    history from before the columnar log was switched on.
+
+    Parameters:
+
+    lines: Iterable[str] -> Record lines of the text log (ex. fileIO.iter_log_lines())
+
+    Return: int
+        The number of records added
+    """
+    ids, times, flags = [], [], []
+    for line in lines:
+        record = line.rstrip("\n").split(DELIMITER)
+        if len(record) < 6:
+            continue
+        when = datetime.datetime.strptime(f"{record[0]} {record[1]}", "%Y/%m/%d %H:%M:%S")
+        ids.append(student_id(tuple(record[3:9])))
+        times.append(int(when.timestamp()))
+        flagged = record[2]
+        # fileIO.UNDO_PREFIX, not imported since fileIO imports this module
+        undo = UNDO if flagged.startswith("Undo:") else 0
+        flags.append((FLAGGED if flagged.endswith("True") else 0) | undo)
+
+    _write_columns(ids, times, flags)
+    return len(ids)
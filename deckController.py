@@ -0,0 +1,246 @@
+"""deckController.py - Python file that holds the state of the deck without any user interface (the
+highlight, the selected spots, the calls waiting to be handled and the undo history). gui.MainWin wraps
+a DeckController and only draws what it says.
+"""
+
+import collections
+import datetime
+import time
+import fileIO as fio
+from latencyHistogram import LatencyHistogram
+from rosterWatcher import apply_roster_diff
+
+UNDO_LIMIT = 100
+#the number of calls that can be undone
+
+PHASES = ("queue update", "log write", "save")
+#the phases of a call timed by the controller, the window adds the time to repaint the deck
+
+
+class DeckController:
+    """The DeckController holds the deck state machine. Moving the highlight and queueing calls are cheap
+    and happen as keys are pressed, and the queued calls are handled together by flush, so a burst of key
+    presses costs one save of the queue."""
+
+    def __init__(self, studentQueue=None, persist=True, sink=None, latency=None):
+        self.queue = None
+        #the StudentQueue being called from, set with setQueue
+
+        self.persist = persist
+        self.sink = sink if persist else fio.NullSink()
+        #calls are logged to sink (the default log sink if None) and the queue is saved after every flush,
+        #unless persist is False, then nothing is written to disk
+
+        self.highlighted = None
+        #the index of the highlighted deck spot, None if no spot is highlighted
+
+        self.selected = []
+        #the indexes of the deck spots selected for a group call, in the order they were selected
+
+        self.pendingCalls = []
+        #(student ids, flagged, time of the key press) of the calls waiting for flush, one entry per key press
+        #so a group call is a single entry
+
+        self.undoStack = collections.deque(maxlen=UNDO_LIMIT)
+        self.redoStack = []
+        #(student ids, moves returned by the student queue, flagged) of the calls that can be undone (newest last)
+        #and of the calls that were undone and can be redone. A group call is one entry, so it is undone as a whole.
+        #A call of a student who wasn't on deck (see callOn) didn't move anyone and has no moves. Every call the
+        #controller logs is on the stack, so undo always takes back the newest call, which is the one the log's
+        #readers take back (see fileIO.cancel_undone)
+
+        self.latency = latency if latency is not None else {phase: LatencyHistogram(phase) for phase in PHASES}
+        #how long each phase of a call takes, in LatencyHistograms indexed by phase
+
+        if studentQueue is not None:
+            self.setQueue(studentQueue)
+
+    def setQueue(self, studentQueue):
+        """Starts calling from a new queue, for example after a new roster was imported. Calls that were
+        not handled yet and the undo history are dropped since they belong to the old queue."""
+        self.queue = studentQueue
+        self.pendingCalls = []
+        self.clearHighlight()
+        self.resetUndo()
+
+    def resetUndo(self):
+        # Moves only make sense for the queue they were made on
+        self.undoStack.clear()
+        self.redoStack.clear()
+
+    def deckIds(self):
+        return self.queue.getOnDeckIds()
+
+    def deckNames(self):
+        return self.queue.getOnDeckStudents()
+
+    def deckSize(self):
+        return len(self.queue.getOnDeckIds())
+
+    # Key presses
+
+    def right(self):
+        """Highlights the rightmost spot if no spot is highlighted, otherwise moves the highlight one spot to
+        the right unless it is already on the rightmost spot. Returns the highlighted spot."""
+        if self.highlighted is None:
+            self.highlighted = self.deckSize() - 1
+        elif self.highlighted < self.deckSize() - 1:
+            self.highlighted += 1
+        return self.highlighted
+
+    def left(self):
+        """Highlights the leftmost spot if no spot is highlighted, otherwise moves the highlight one spot to
+        the left unless it is already on the leftmost spot. Returns the highlighted spot."""
+        if self.highlighted is None:
+            self.highlighted = 0
+        elif self.highlighted > 0:
+            self.highlighted -= 1
+        return self.highlighted
+
+    def select(self):
+        """Adds the highlighted spot to the group to call on together, or takes it out if it is already in
+        it. Returns whether the highlighted spot is selected now, or None if no spot is highlighted."""
+        if self.highlighted is None:
+            return None
+        if self.highlighted in self.selected:
+            self.selected.remove(self.highlighted)
+            return False
+        self.selected.append(self.highlighted)
+        return True
+
+    def clearHighlight(self):
+        """Clears the highlight and the selection, for when the students on deck are about to change.
+        Returns the spots that were highlighted or selected."""
+        spots = self.selected
+        if self.highlighted is not None and self.highlighted not in spots:
+            spots.append(self.highlighted)
+        self.highlighted = None
+        self.selected = []
+        return spots
+
+    def remove(self, pressTime=None):
+        """Queues a call of the selected students and the highlighted student, and clears the highlight and
+        the selection. Returns the spots that were called on, empty if no spot was highlighted or selected."""
+        return self.queueCall(False, pressTime)
+
+    def flag(self, pressTime=None):
+        """Queues a flagged call of the selected students and the highlighted student, and clears the highlight
+        and the selection. Returns the spots that were called on, empty if no spot was highlighted or selected."""
+        return self.queueCall(True, pressTime)
+
+    def queueCall(self, flagged, pressTime=None):
+        spots = self.clearHighlight()
+        if spots:
+            deck = self.deckIds()
+            self.pendingCalls.append((tuple(deck[spot] for spot in spots), flagged,
+                                      time.perf_counter_ns() if pressTime is None else pressTime))
+        return spots
+
+    def callOn(self, studentId, flagged=False):
+        """Calls on any student on the roster, for example one who volunteered. A student on deck is queued
+        the same as pressing the remove key, anyone else only has the call logged and keeps their place in
+        the queue. Either way the call can be undone. Returns whether the call was queued (and needs a flush)."""
+        if studentId in self.deckIds():
+            self.pendingCalls.append(((studentId,), flagged, time.perf_counter_ns()))
+            return True
+        # calls waiting to be handled were made first, so they are logged and put on the undo stack first
+        self.flush()
+        fio.log_cold_call(studentId, flagged=flagged, sink=self.sink)
+        self.undoStack.append(((studentId,), (), flagged))
+        self.redoStack.clear()
+        return False
+
+    def flush(self):
+        """Handles every call queued since the last flush. The students of each call (one, or a whole group)
+        are taken off the deck together, then every call is logged in one batch and the queue is saved once
+        for all of them. A student that is no longer on deck by the time their call is handled (for example a
+        repeat of a key press that was already handled) is skipped.
+
+        Returns the key press times of the calls that were handled, empty if the deck didn't change."""
+        calls, self.pendingCalls = self.pendingCalls, []
+
+        pressed = []
+        logged = []
+        for studentIds, flagged, pressTime in calls:
+            # give the student ids to the queue to be taken off, keeping the moves so the call can be undone
+            start = time.perf_counter_ns()
+            moves = self.queue.processOnDeckGroup(studentIds)
+            if not moves:
+                continue
+            self.latency["queue update"].recordSince(start, time.perf_counter_ns())
+            self.undoStack.append((tuple(move[0] for move in moves), moves, flagged))
+            self.redoStack.clear()
+
+            now = datetime.datetime.now()
+            logged.extend((move[0], flagged, now) for move in moves)
+            pressed.append(pressTime)
+
+        if pressed:
+            # give the student ids and flagged values to the log in one batch
+            start = time.perf_counter_ns()
+            fio.log_cold_calls(logged, sink=self.sink)
+            end = time.perf_counter_ns()
+            self.latency["log write"].recordSince(start, end)
+
+            self.save()
+            self.latency["save"].recordSince(end, time.perf_counter_ns())
+        return pressed
+
+    def undo(self):
+        """Takes back the most recent call (every student of a group call): the students it moved are moved
+        back to where they were, and records taking back the call are added to the log. Calls still waiting
+        to be handled are handled first, so the right call is taken back. Returns whether a call was undone."""
+        self.flush()
+        if not self.undoStack:
+            return False
+
+        studentIds, moves, flagged = call = self.undoStack.pop()
+        self.queue.undoGroup(moves)
+        now = datetime.datetime.now()
+        fio.log_cold_calls([(studentId, flagged, now, True) for studentId in studentIds], sink=self.sink)
+        self.redoStack.append(call)
+        self.clearHighlight()
+        if moves:
+            self.save()
+        return True
+
+    def redo(self):
+        """Makes the most recently undone call again, moving the same students to the same places and logging
+        the call again. Returns whether a call was redone."""
+        if self.pendingCalls or not self.redoStack:
+            return False
+
+        studentIds, moves, flagged = call = self.redoStack.pop()
+        self.queue.redoGroup(moves)
+        now = datetime.datetime.now()
+        fio.log_cold_calls([(studentId, flagged, now) for studentId in studentIds], sink=self.sink)
+        self.undoStack.append(call)
+        self.clearHighlight()
+        if moves:
+            self.save()
+        return True
+
+    def applyRosterChange(self, diff, roster):
+        """Applies changes to the roster (from StudentDataManager.GetRosterDiff) to the queue and saves them.
+        Calls waiting to be handled are for the old roster, so they are handled first."""
+        self.flush()
+        apply_roster_diff(self.queue, diff)
+        if self.persist:
+            fio.save_roster(roster)
+        self.save()
+        self.clearHighlight()
+        self.resetUndo()
+
+    def close(self):
+        """Handles the calls still waiting and makes sure everything logged so far is on disk, for when the
+        deck is done with (the window closes, or a benchmark is about to delete its folder). The sink is only
+        flushed, not closed, since it may be the one shared by the whole program."""
+        self.flush()
+        sink = self.sink if self.sink is not None else fio.get_log_sink()
+        if hasattr(sink, "flush"):
+            sink.flush()
+
+    def save(self):
+        """Saves the order of the queue, unless persistence is turned off."""
+        if self.persist:
+            fio.save_queue(self.queue.sendQueue())
@@ -6,25 +6,339 @@ Read files for importing data.
     * Inital import of student data
     * Re importing student data
     * Saving and reading the queue
+    * Importing student photos as thumbnails
     * Loading default controls
 
 Write to export data.
     * Exporting student data
     * Log any cold calls in log files
     * Export final Participation
+    * Archive the logs of past days into compressed files
+    * Checksum every log record and the live log, and verify and quarantine bad records
+    * Follow up messages for flagged students, as an mbox or EML batch or sent over SMTP
+    * Send cold calls to a pluggable log sink (file, memory, null or several at once)
+
+Keep process wide counters of the file I/O above.
+    * Bytes read and written, file opens and fsyncs per function
+    * Log records written, queue saves and roster size
+    * Peak memory during import and export
+    * Exported in the Prometheus text format to a file or a localhost endpoint
 
 """
+import array
+import atexit
 import email
+import email.message
+import email.policy
+import email.utils
+import mailbox
+import smtplib
 import os.path, os
 import datetime
 import shutil
 import re
+import gzip
+import heapq
+import lzma
+import mmap
+import operator
+import contextlib
+import functools
+import threading
+import time
+import tracemalloc
+import http.server
+import collections
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from studentDataManager import StudentDataManager as SDM
+import columnarLog
 
 # Student data is seperated by either a tab or comma
 DELIMITER = "\t"
 # DELIMITER = ","
 
+# The live cold call log, and the folder its past days are archived to
+LOG_PATH = "./data/logs/daily_logs.txt"
+ARCHIVE_DIR = "./data/logs/archive"
+
+# The sidecar index of the live log, one line per record with the record's UO ID, byte offset and length
+LOG_INDEX_PATH = "./data/logs/daily_logs.idx"
+
+# The index of the archived records, one line per record with the record's UO ID, date, time and flagged column. The
+# archives are compressed and can't be seeked into, so the columns a student's history needs are kept instead of offsets
+ARCHIVE_INDEX_PATH = "./data/logs/archive/daily_logs.idx"
+
+# The running checksum of the live log: the number of bytes at the start of the log it covers and their CRC32
+LOG_CHECKSUM_PATH = "./data/logs/daily_logs.crc"
+
+# The folder records that fail verification are moved to, one file per verification that found any
+QUARANTINE_DIR = "./data/logs/quarantine"
+
+# The header line at the top of the live log and of every archive
+LOG_HEADER = DELIMITER.join(('<Date>', '<Time>', '<Flagged>', '<First Name>', '<Last Name>', '<UOID>', '<Email>', '<Phonetic Spelling>', '<Reveal Code>', '<CRC32>'))
+
+# The file holding the path of the roster file that was last imported, so it can be watched for changes
+ROSTER_SOURCE_PATH = "./data/roster_source"
+
+# How many lines of a roster file are read between progress reports (and checks for a cancel) while it is imported
+IMPORT_PROGRESS_LINES = 1000
+
+# Who follow up messages for flagged students are from, and the subject they are sent with
+FOLLOW_UP_SENDER = "coldcall@localhost"
+FOLLOW_UP_SUBJECT = "Following up on class discussion"
+
+# The format every line of a roster file has to start with: first name, last name, UO ID and email address.
+# The patterns are hard coded because tabs require raw strings, thus formatted strings can't be used
+ROSTER_PATTERN = re.compile(r"[A-z\-]+\t[A-z\-]+\t[0-9]{9}\t[A-z0-9]+@uoregon.edu" if DELIMITER == "\t"
+                            else r"[A-z\-]+,[A-z\-]+,[0-9]{9},[A-z0-9]+@uoregon.edu")
+
+# The folder the student photo thumbnails are saved in, one PNG per student named after their UO ID
+THUMBNAIL_DIR = "./data/thumbnails"
+
+# The largest width or height of a thumbnail, in pixels
+THUMBNAIL_SIZE = 64
+
+# The ways the next student to come on deck can be chosen, set with a "policy : <name>" line of the config file. The
+# first one is the default (see selection_policy and the policies of StudentQueue.py)
+SELECTION_POLICIES = ("uniform", "participation", "recency", "cooldown")
+
+# The entries of the config file that are settings and not key bindings
+CONFIG_SETTINGS = ("policy", "cooldown")
+
+# The flagged column of a record that takes back an earlier call is this prefix followed by the flag of the call it
+# takes back (ex. "Undo:True"). The earlier record is left in the log and readers drop both, see cancel_undone
+UNDO_PREFIX = "Undo:"
+
+# The name of every column of a log record, in the order they are logged. The last column is the CRC32 of the rest of
+# the record, records logged before it was added don't have it
+LOG_COLUMNS = ("date", "time", "flagged", "fname", "lname", "uoid", "email", "phonetic", "reveal_code", "crc")
+
+# The longest the running checksum of a log is only kept in memory before it is written to its sidecar file, in seconds
+LOG_CHECKSUM_FLUSH_SECONDS = 1.0
+
+# The number of bytes of a log each worker verifies at a time, logs smaller than two chunks are verified without workers
+VERIFY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# The format of a record logged before records had a CRC32, which is all there is to check them against
+LEGACY_RECORD_PATTERN = re.compile(r"[0-9]{4}/[0-9]{2}/[0-9]{2}\t[0-9]{2}:[0-9]{2}:[0-9]{2}\t(Undo:)?(True|False)\t[^\t]*\t[^\t]*\t[0-9]+\t" if DELIMITER == "\t"
+                                   else r"[0-9]{4}/[0-9]{2}/[0-9]{2},[0-9]{2}:[0-9]{2}:[0-9]{2},(Undo:)?(True|False),[^,]*,[^,]*,[0-9]+,")
+
+# The file extension used for each compression the archives can use
+ARCHIVE_EXTENSIONS = {"gzip": ".gz", "lzma": ".xz"}
+
+# Process wide I/O counters, indexed by (metric name, function name).
+# They are read by metrics_text and never reset while the program runs.
+IO_COUNTERS = {}
+
+# Gauges (values that go up and down), indexed the same way as the counters
+IO_GAUGES = {}
+
+# The help text and type of every metric, used when exporting them
+METRIC_INFO = {
+    "coldcall_io_bytes_read_total": ("counter", "Bytes read from disk by each fileIO function."),
+    "coldcall_io_bytes_written_total": ("counter", "Bytes written to disk by each fileIO function."),
+    "coldcall_io_opens_total": ("counter", "Files opened by each fileIO function."),
+    "coldcall_io_fsyncs_total": ("counter", "fsync calls made by each fileIO function."),
+    "coldcall_log_records_written_total": ("counter", "Cold call records written to the logs."),
+    "coldcall_queue_saves_total": ("counter", "Times the queue ordering was saved."),
+    "coldcall_roster_students": ("gauge", "Students in the most recently loaded roster."),
+    "coldcall_peak_memory_bytes": ("gauge", "Peak Python memory traced during the last run of each import and export function."),
+}
+
+# Guards the counters, since the GUI, the metrics endpoint and worker threads may touch them at once
+_METRICS_LOCK = threading.Lock()
+
+
+def _count(metric: str, function: str, amount: int = 1) -> None:
+    """
+    Add amount to the counter metric for the function.
+    """
+    with _METRICS_LOCK:
+        IO_COUNTERS[(metric, function)] = IO_COUNTERS.get((metric, function), 0) + amount
+
+
+def _gauge(metric: str, function: str, value: int) -> None:
+    """
+    Set the gauge metric for the function to value.
+    """
+    with _METRICS_LOCK:
+        IO_GAUGES[(metric, function)] = value
+
+
+@contextlib.contextmanager
+def _counted_open(path: str, mode: str, function: str):
+    """
+    Open a file like open() does while counting the open and the bytes
+    read or written through it against the calling function.
+    """
+
+    with open(path, mode) as f:
+        _count("coldcall_io_opens_total", function)
+        if "a" in mode and "+" not in mode:
+            # An append starts at the end of the file, so the bytes written are how far the position moved
+            binary = getattr(f, "buffer", f)
+            start = binary.tell()
+            yield f
+            f.flush()
+            _count("coldcall_io_bytes_written_total", function, binary.tell() - start)
+            return
+        if "+" in mode:
+            # A file opened for updating is both read and written, and neither its position nor its size
+            # tells how much of each, so the bytes are counted as they pass through the binary buffer
+            transferred = _count_transfers(getattr(f, "buffer", f))
+            yield f
+            f.flush()
+            _count("coldcall_io_bytes_read_total", function, transferred[0])
+            _count("coldcall_io_bytes_written_total", function, transferred[1])
+            return
+        yield f
+        if "r" in mode:
+            # The position of the underlying binary buffer is how much was actually read from disk
+            _count("coldcall_io_bytes_read_total", function, getattr(f, "buffer", f).tell())
+        else:
+            f.flush()
+            written = getattr(f, "buffer", f).seek(0, os.SEEK_END)
+
+    if "r" not in mode:
+        # The file was written from the start, so where it ends is how much was written
+        _count("coldcall_io_bytes_written_total", function, written)
+
+
+def _count_transfers(binary) -> list:
+    """
+    Wrap the read and write methods of an open binary file so they add up the bytes
+    passing through them. Returns [bytes read, bytes written], updated as the file is used.
+    """
+    transferred = [0, 0]
+
+    def reader(method):
+        def read(*args):
+            data = method(*args)
+            # readinto fills a buffer given to it and returns how many bytes it read
+            transferred[0] += data if isinstance(data, int) else len(data or b"")
+            return data
+        return read
+
+    def write(data):
+        written = binary_write(data)
+        transferred[1] += written if written is not None else len(data)
+        return written
+
+    for name in ("read", "read1", "readline", "readinto", "readinto1"):
+        setattr(binary, name, reader(getattr(binary, name)))
+    binary_write = binary.write
+    binary.write = write
+    return transferred
+
+
+def _fsync(f, function: str) -> None:
+    """
+    Flush an open file all the way to disk, counting the fsync against the function.
+    """
+    f.flush()
+    os.fsync(f.fileno())
+    _count("coldcall_io_fsyncs_total", function)
+
+
+def _track_memory(function):
+    """
+    Decorator that records the peak memory traced by tracemalloc while the
+    decorated function runs. Tracing is only switched on for the duration of
+    the call, so the rest of the program doesn't pay for it.
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _gauge("coldcall_peak_memory_bytes", function.__name__, tracemalloc.get_traced_memory()[1])
+            if started:
+                tracemalloc.stop()
+
+    return wrapper
+
+
+def metrics_text() -> str:
+    """
+    Build the current value of every I/O counter and gauge in the Prometheus text format.
+
+    Return: str
+        The metrics, one sample per line
+    """
+
+    with _METRICS_LOCK:
+        samples = [(key, value) for key, value in IO_COUNTERS.items()]
+        samples += [(key, value) for key, value in IO_GAUGES.items()]
+
+    lines = []
+    # Group the samples by metric so each metric gets its HELP and TYPE lines once
+    for metric in sorted({key[0] for key, _ in samples}):
+        kind, help_text = METRIC_INFO[metric]
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, function), value in sorted(samples):
+            if name == metric:
+                lines.append(f'{metric}{{function="{function}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path="./data/metrics/fileio.prom") -> None:
+    """
+    Write the I/O metrics in the Prometheus text format to a local file,
+    for example for the node exporter textfile collector.
+
+    Parameters:
+
+    path: str -> The file to write the metrics to
+
+    Return: None
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so a reader never sees half of the metrics
+    with open(path + ".tmp", "w") as f:
+        f.write(metrics_text())
+    os.replace(path + ".tmp", path)
+
+
+def serve_metrics(port=9464) -> http.server.HTTPServer:
+    """
+    Serve the I/O metrics in the Prometheus text format on http://127.0.0.1:<port>/metrics
+    from a background thread. Only the local machine can connect.
+
+    Parameters:
+
+    port: int -> The port to listen on
+
+    Return: HTTPServer
+        The running server, call shutdown() on it to stop serving
+    """
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            # Don't print every scrape to the terminal
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
 
 def data_exists() -> bool:
     """
@@ -47,7 +361,8 @@ def data_exists() -> bool:
     return False
 
 
-def import_student_data(path="", over_write=False) -> int:
+@_track_memory
+def import_student_data(path="", over_write=False, progress=None, cancelled=None, load_roster=True) -> int:
     """
     Take a file with tab seperated values and save it as user values.
     File must be in the correct format. If a file already exists, then
@@ -61,18 +376,25 @@ def import_student_data(path="", over_write=False) -> int:
     <first_name> <tab> <last_name> <tab> <UO ID> <tab> <email_address> <tab>
     <phonetic_spelling> <tab> <reveal_code> <newline>
 
-    Saves the student data in program_dir/data/students
+    Saves the student data in program_dir/data/students. The new data is written to a
+    temporary file that is swapped in once it is complete, so an import that fails or is
+    cancelled leaves the current student data as it was. This can run on a worker thread.
     
     Parameters:
 
     path: str -> The path to import student data from
     over_write: bool -> If set to True any current data is overwritten by new data
+    progress: Callable[[int, int], None] -> Called now and then with the number of characters read so far and the size of the file
+    cancelled: threading.Event -> The import stops, and returns 4, if this is set before the new data is swapped in
+    load_roster: bool -> If set to False the students are not added to the StudentDataManager roster, for
+        callers that load the roster themselves afterwards (ex. on the tkinter thread)
 
     Return: int
     0 -> No error
     1 -> Student Data already exists
     2 -> File in incorrect format
     3 -> No path was selected by the user
+    4 -> The import was cancelled
     """
 
     # If there is already data in the system, then return error 1 to the gui
@@ -89,28 +411,30 @@ def import_student_data(path="", over_write=False) -> int:
     # A list to store the student information as it's
     # read in from disk
     students = []
+
+    # How far into the file the import is, reported to progress every IMPORT_PROGRESS_LINES lines
+    size = os.path.getsize(path)
+    done = 0
     
     # Open the path supplied from the gui
     # f is the file object
-    with open(path, "r") as f:
+    with _counted_open(path, "r", "import_student_data") as f:
 
-        # The regex pattern to match against the student data as it's read in
-        # The delimiter alters the pattern by switching between a comma and tab
-        # The patterns are hard coded because tabs require raw strings, thus
-        # formatted strings can't be used
-        pattern = r"[A-z\-]+,[A-z\-]+,[0-9]{9},[A-z0-9]+@uoregon.edu"
-        if DELIMITER == "\t":
-            pattern = r"[A-z\-]+\t[A-z\-]+\t[0-9]{9}\t[A-z0-9]+@uoregon.edu"
-
-        
         # for each line in the file
         # i is each line in the file
-        for i in f:
+        for number, i in enumerate(f, start=1):
 
-            # Make sure the line from the file matches the regex, return error if it doesn't
-            if not re.match(pattern, i):
+            # Make sure the line from the file matches the roster format, return error if it doesn't
+            if not ROSTER_PATTERN.match(i):
                 return 2
 
+            done += len(i)
+            if number % IMPORT_PROGRESS_LINES == 0:
+                if cancelled is not None and cancelled.is_set():
+                    return 4
+                if progress is not None:
+                    progress(done, size)
+
             # split the line on the delmiter
             i = i.split(DELIMITER)
 
@@ -136,49 +460,209 @@ def import_student_data(path="", over_write=False) -> int:
             # update the student information without whitespace
             i[j] = i[j].strip()
 
-    # for each student in the list of students
-    # student is a student in the master list of students
-    for student in students:
+    # Create the student file to store the newly read in data, beside the current one until it is complete
+    # f is the file object
+    new_path = "./data/students.tmp"
+    try:
+        with _counted_open(new_path, "w", "import_student_data") as f:
+        
+            # for each student in the list of students
+            # i is a list of student information for a specific student
+            for i in students:
+
+                # formated is the string that will be written to the new file
+                # It will contain all the student data seperated by the correct delimiter
+                formated = ""
+
+                # for each piece of information for the student add it 
+                # to the formatted str
+                # j is an iterator for the length of the list minus 1
+                for j in range(len(i) - 1):
+                    formated += i[j] + DELIMITER
+            
+                # add a newline at the end
+                formated += "\n"
+                # write the formatted string to the new file
+                f.write(formated)
+
+            # Make sure the new data is on disk before it replaces the current data
+            _fsync(f, "import_student_data")
+
+        # The last chance to cancel, after this the new data replaces the current data in one step
+        if cancelled is not None and cancelled.is_set():
+            return 4
+        os.replace(new_path, "./data/students")
+    finally:
+        # An import that failed or was cancelled leaves the current data as it was, and nothing beside it
+        if os.path.exists(new_path):
+            os.remove(new_path)
+
+    if progress is not None:
+        progress(size, size)
+
+    if load_roster:
+        # for each student in the list of students
+        # student is a student in the master list of students
+        for student in students:
 
-        # get the unique student ID of the specific student
-        uid = SDM.GetStudentUid(student[0], student[1])
+            # create an list filled with None of size 6
+            roster_data = [None for i in range(6)]
 
-        # create an list filled with None of size 6
-        roster_data = [None for i in range(6)]
+            # Copy the student list into the roaster data list
+            roster_data[0:] = student[:]
 
-        # Copy the student list into the roaster data list
-        roster_data[0:] = student[:]
+            # Add the student to the roaster data, which gives them an id based on their UO ID
+            SDM.AddStudent(tuple(roster_data))
 
-        # Add the student to the roaster data
-        SDM.StudentRoster[uid] = tuple(roster_data)
+    _gauge("coldcall_roster_students", "import_student_data", len(students))
 
-    # Create the student file to store the newly read in data
-    # f is the file object
-    with open("./data/students", "w") as f:
-        
-        # for each student in the list of students
-        # i is a list of student information for a specific student
-        for i in students:
-
-            # formated is the string that will be written to the new file
-            # It will contain all the student data seperated by the correct delimiter
-            formated = ""
-
-            # for each piece of information for the student add it 
-            # to the formatted str
-            # j is an iterator for the length of the list minus 1
-            for j in range(len(i) - 1):
-                formated += i[j] + DELIMITER
-            
-            # add a newline at the end
-            formated += "\n"
-            # write the formatted string to the new file
-            f.write(formated)
+    # Remember where the roster came from so it can be watched for changes
+    with _counted_open(ROSTER_SOURCE_PATH, "w", "import_student_data") as f:
+        f.write(os.path.abspath(path))
 
     # return no error to the gui
     return 0
 
 
+def roster_source() -> str:
+    """
+    Get the path of the roster file that was last imported.
+
+    Return: str
+        The path, or "" if no roster has been imported since this was recorded
+    """
+    if not os.path.exists(ROSTER_SOURCE_PATH):
+        return ""
+    with _counted_open(ROSTER_SOURCE_PATH, "r", "roster_source") as f:
+        return f.read().strip()
+
+
+def iter_roster_file(path: str):
+    """
+    Stream the students of a roster file in the format import_student_data takes,
+    one line at a time, without saving anything.
+
+    Parameters:
+
+    path: str -> The path of the roster file
+
+    Yields: tuple
+        (first name, last name, UO ID, email, phonetic spelling, reveal code) of every student.
+        The phonetic spelling defaults to the first name and the reveal code is empty
+
+    Raises:
+
+    ValueError -> A line of the file is not in the correct format
+    """
+    with _counted_open(path, "r", "iter_roster_file") as f:
+        for number, line in enumerate(f, start=1):
+            if not ROSTER_PATTERN.match(line):
+                raise ValueError(f"Line {number} of the roster is not in the correct format.")
+            student = [value.strip() for value in line.split(DELIMITER)]
+            if len(student) == 4:
+                student.append(student[0])
+            yield tuple(student[0:5]) + ("",)
+
+
+def save_roster(students) -> None:
+    """
+    Save a new roster in place of the imported student data, for when the roster
+    changed after it was imported.
+
+    Parameters:
+
+    students: Iterable[tuple] -> The student entries of the new roster
+
+    Return: None
+    """
+    count = 0
+    # Written beside the current student data and swapped in once it is on disk, the same as
+    # import_student_data, so a crash can't truncate the roster and the watcher never reads half of it
+    new_path = "./data/students.tmp"
+    with _counted_open(new_path, "w", "save_roster") as f:
+        for student in students:
+            # The same format import_student_data writes, without the reveal code
+            f.write("".join(value + DELIMITER for value in student[0:5]) + "\n")
+            count += 1
+        _fsync(f, "save_roster")
+    os.replace(new_path, "./data/students")
+
+    _gauge("coldcall_roster_students", "save_roster", count)
+
+
+def thumbnail_path(uoid: str) -> str:
+    """
+    Get the path the thumbnail of a student is saved at.
+    """
+    return os.path.join(THUMBNAIL_DIR, f"{uoid}.png")
+
+
+def save_images(path=None) -> int:
+    """
+    Import a folder of student photos. Each photo is decoded and shrunk to a
+    thumbnail once, here, and saved as a PNG in THUMBNAIL_DIR so the GUI never has
+    to decode a full size photo. Photos are matched to students by file name, which
+    can be the student's UO ID (951234567.jpg) or their name (First_Last.png).
+
+    Pillow is used to read the photos if it is installed, which allows any image
+    format. Otherwise tkinter reads them, which only supports PNG and GIF and needs
+    the tkinter window to exist.
+
+    Parameters:
+
+    path: str -> The folder holding the photos. If None or empty nothing is imported
+
+    Return: int
+        The number of thumbnails saved
+    """
+
+    if not path or not os.path.isdir(path):
+        return 0
+
+    # The UO ID of every student, by UO ID and by name
+    uoids = {}
+    for student in SDM.StudentRoster.values():
+        uoids[student[2]] = student[2]
+        uoids[f"{student[0]}_{student[1]}".lower()] = student[2]
+
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+        import tkinter
+
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    saved = 0
+    for name in sorted(os.listdir(path)):
+        stem = os.path.splitext(name)[0]
+        uoid = uoids.get(stem, uoids.get(stem.lower(), None))
+        if uoid is None:
+            # The photo doesn't belong to anyone on the roster
+            continue
+
+        source = os.path.join(path, name)
+        _count("coldcall_io_opens_total", "save_images")
+        _count("coldcall_io_bytes_read_total", "save_images", os.path.getsize(source))
+        try:
+            if Image is not None:
+                with Image.open(source) as photo:
+                    photo.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+                    photo.save(thumbnail_path(uoid), "PNG")
+            else:
+                photo = tkinter.PhotoImage(file=source)
+                # tkinter can only shrink images by whole numbers
+                factor = -(-max(photo.width(), photo.height()) // THUMBNAIL_SIZE)
+                photo.subsample(factor, factor).write(thumbnail_path(uoid), format="png")
+        except Exception:
+            # Skip files that aren't images (or are in a format that can't be read)
+            continue
+
+        _count("coldcall_io_bytes_written_total", "save_images", os.path.getsize(thumbnail_path(uoid)))
+        saved += 1
+
+    return saved
+
+
 def save_queue(queue: list) -> None:
     """
     Public interface to save the current ordering of the queue. Is called
@@ -194,27 +678,20 @@ def save_queue(queue: list) -> None:
 
     # Open the file that contains the persistant ordering of the queue
     # f is a file object
-    with open("./data/queue_order", "w") as f:
-        
-        # for each student in the queue
+    # The file is overwritten in place instead of being truncated first, since reordering the queue
+    # doesn't change its length and truncating a file costs far more than writing over it
+    path = "./data/queue_order"
+    with _counted_open(path, "r+" if os.path.exists(path) else "w", "save_queue") as f:
+
+        # for each student in the queue, every piece of information but the last followed by
+        # the delimiter and a newline at the end. The lines are joined and written in one call
         # i is a list of student information
-        for i in queue:
+        f.write("".join(DELIMITER.join(i[:-1]) + DELIMITER + "\n" if len(i) > 1 else "\n" for i in queue))
 
-            # formated is the string that will be written to the new file
-            # It will contain all the student data seperated by the correct delimiter
-            formated = ""
-            
-            # for each piece of information for the student add it 
-            # to the formatted str
-            # j is an iterator for the length of the list minus 1
-            for j in range(len(i) - 1):
-                formated += i[j] + DELIMITER
-
-            # add a newline at the end
-            formated += "\n"
-            
-            # write the formatted string to the new file
-            f.write(formated)
+        # Cut off whatever is left of an older, longer queue
+        f.truncate()
+
+    _count("coldcall_queue_saves_total", "save_queue")
 
 
 def load_queue() -> list:
@@ -247,7 +724,7 @@ def load_queue() -> list:
 
     # Open the correct folder
     # f is a file object
-    with open(path, "r") as f:
+    with _counted_open(path, "r", "load_queue") as f:
 
         # for each line in the file
         # i is a line from the file
@@ -266,6 +743,8 @@ def load_queue() -> list:
             # append the whitespace free data to the list of students
             students.append(i)
 
+    _gauge("coldcall_roster_students", "load_queue", len(students))
+
     # return the list of students to the gui
     return students
 
@@ -288,7 +767,7 @@ def load_new_queue() -> list:
     """
 
     students = []
-    with open("./data/students", "r") as f:
+    with _counted_open("./data/students", "r", "load_new_queue") as f:
 
         # for each line in the file
         # i is a line from the file
@@ -307,14 +786,50 @@ def load_new_queue() -> list:
             # append the whitespace free data to the list of students
             students.append(i)
 
+    _gauge("coldcall_roster_students", "load_new_queue", len(students))
+
     # return the list of students to the gui
     return students
 
 
+def _read_config() -> dict:
+    """
+    Read the entries of the config file, formated as <name> : <value>, one per line.
+
+    Parameters:
+
+    None
+
+    Return: dict
+
+        The value of each name in the config file, empty if there is no config file.
+    """
+
+    entries = {}
+    if not os.path.exists("./data/config"):
+        return entries
+
+    with _counted_open("./data/config", "r", "key_bindings") as f:
+
+        # for each line in the file
+        # i is the line in the file
+        for i in f:
+
+            # split each line on the first colon character, so a binding to the colon key still works
+            name, colon, value = i.partition(":")
+
+            # skip blank lines and anything else that isn't an entry
+            if colon:
+                entries[name.strip()] = value.strip()
+
+    return entries
+
+
 def key_bindings() -> dict:
     """
     Check if a config file is provided that overrides the default controls.
-    Otherwise, return the defualt controls.
+    Otherwise, return the defualt controls. Entries of the config file that are
+    settings (see CONFIG_SETTINGS) and not controls are left out.
 
     Parameters:
 
@@ -330,41 +845,83 @@ def key_bindings() -> dict:
     # default_controls["left"] = left arrow
     # default_controls["up"] = up arrow
     # default_controls["down"] = down arrow
+    # default_controls["select"] = space bar
 
     # A dict that holds the default controls for the program
     default_controls = {
         "right": "<Right>",
         "left": "<Left>",
         "remove": "<Up>",
-        "flag": "<Down>"
+        "flag": "<Down>",
+        "select": "<space>"
     }
 
-    # if the config file doesn't exist of its empty just return the default controls
-    if not os.path.exists("./data/config") or os.path.getsize("./data/config") == 0:
-        return default_controls
-
     # a dict that holds the custom controls provided by the user
-    custom_controls = {}
-
     # file must be formated as: <action> : <key>
-    # open the config file
-    # f is the file object
-    with open("./data/config", "r") as f:
-
-        # for each line in the file
-        # i is the line in the file
-        for i in f:
+    custom_controls = {name: value for name, value in _read_config().items() if name not in CONFIG_SETTINGS}
 
-            # split each line on the colon character
-            i = i.split(":")
+    # if the config file doesn't exist, is empty or only holds settings just return the default controls
+    if not custom_controls:
+        return default_controls
 
-            # add the custom control to the dict
-            custom_controls[i[0].strip()] = i[1].strip()
+    # config files written before group calls don't have the select key, so it keeps its default
+    custom_controls.setdefault("select", default_controls["select"])
 
     # return the custom controls
     return custom_controls
 
 
+def selection_policy() -> str:
+    """
+    Check if the config file picks how the next student to come on deck is chosen (see
+    SELECTION_POLICIES), with a line formated as: policy : <name>. Otherwise, return the default policy.
+
+    Parameters:
+
+    None
+
+    Return: str
+
+        The name of the policy, which may not be one of SELECTION_POLICIES if the config file has a typo.
+    """
+    return _read_config().get("policy", SELECTION_POLICIES[0]).lower()
+
+
+def policy_cooldown():
+    """
+    Check if the config file sets the number of calls a called upon student stays off the deck under the
+    cooldown policy, with a line formated as: cooldown : <calls>.
+
+    Parameters:
+
+    None
+
+    Return: int or None
+
+        The number of calls, or None if the config file doesn't set it or it isn't a whole number above zero.
+    """
+    value = _read_config().get("cooldown", "")
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+def call_counts() -> dict:
+    """
+    Count how many times each student has been called, over the live log and every archive.
+    Calls that were taken back are not counted.
+
+    Parameters:
+
+    None
+
+    Return: dict
+
+        The number of calls of each student on the roster, indexed by student id (from the StudentDataManager).
+    """
+    counts = collections.Counter(uoid for uoid, flagged in cancel_undone(scan_logs(("uoid", "flagged")), 0, 1))
+    return {SDM.StudentIds[uoid]: count for uoid, count in counts.items() if uoid in SDM.StudentIds}
+
+
+@_track_memory
 def export_student_data(exp_path: str) -> None:
     ''' Create a file that has the student info in the correct format.
     '''
@@ -390,126 +947,1266 @@ def export_student_data(exp_path: str) -> None:
 
 
     # Open the target file and write the data for the current student roster to it.
-    with open(exp_path, 'w') as exp_file:
+    with _counted_open(exp_path, 'w', "export_student_data") as exp_file:
         # Write the header containing the title for each data entry separated by the delimiter.
         exp_file.write(f"{DELIMITER.join(('<First Name>', 'Last Name', 'UOID', 'email', 'Phonetic Spelling', 'Reveal Code'))}\n")
         # Write the entries for each student on separate lines.
         exp_file.writelines(get_roster_export_lines())
 
 
-def log_cold_call(uid: str, flagged: bool = False) -> None:
+# One cold call as handed to a log sink. undo is True for a record that takes back the student's last call with the same flag
+ColdCall = collections.namedtuple("ColdCall", ("uid", "flagged", "when", "student_data", "undo"), defaults=(False,))
+
+
+class FileSink:
+    """ Appends cold calls to a tab delimited text log, the daily log file by default.
     """
-    Takes the reponse of the student along with their name and
-    logs it in the daily log file.
 
-    Parameters
-    ----------
-    uid (str): The unique identifier of the student that was cold called.
-    flagged (bool): Whether the student's cold call was flagged by the instructor.
+    def __init__(self, path=None):
+        # None means whatever LOG_PATH is when the calls are written
+        self.path = path
+
+    def write(self, calls) -> None:
+        path = self.path or LOG_PATH
+        # Records added to the live log are added to its index too, which has to be up to date before they are written
+        indexed = os.path.abspath(path) == os.path.abspath(LOG_PATH)
+        if indexed:
+            _load_log_index()
+
+        # Build the text of every call before touching the file.
+        lines = []
+        for call in calls:
+            # Split the time of the call into the date and the time of day.
+            date, time = call.when.date().strftime('%Y/%m/%d'), call.when.time().strftime('%H:%M:%S')
+            # Distribute the data for the current student to variables to make it easier to insert the date and time into the logs.
+            fname, lname, uoid, email, phonetic, reveal_code = call.student_data[0:6]
+
+            flagged = f"{UNDO_PREFIX}{call.flagged}" if call.undo else str(call.flagged)
+
+            record = DELIMITER.join((date, time, flagged, fname, lname, uoid, email, phonetic, reveal_code))
+            # End the record with the CRC32 of the rest of it, so a torn write or a hand edit of the record can be found
+            lines.append(f"{record}{DELIMITER}{record_checksum(record)}\n")
+
+        # Open the logging file and begin appending to it.
+        with _counted_open(path, 'a', "log_cold_call") as logfile:
+            # An append starts at the end of the file, so a new (or empty) log is at position 0 and needs a header.
+            needs_header = logfile.tell() == 0
+            # If the file needs a header, we add one.
+            if needs_header:
+                logfile.write(f"{LOG_HEADER}\n")
+
+            # Append the text for the new logs to the end of the file, keeping where they start and end for the index.
+            start = logfile.tell()
+            logfile.write("".join(lines))
+            end = logfile.tell()
+            encoding = logfile.encoding
+
+        if indexed:
+            _index_appended_records([call.student_data[2] for call in calls], lines, 0 if needs_header else start, start, end)
+
+        # Add the new bytes to the running checksum of the file. Text files turn every newline into the platform's line separator
+        written = (f"{LOG_HEADER}\n" if needs_header else "") + "".join(lines)
+        _extend_log_checksum(path, written.replace("\n", os.linesep).encode(encoding), 0 if needs_header else start, end)
+
+        _count("coldcall_log_records_written_total", "log_cold_call", len(lines))
+
+    def flush(self) -> None:
+        # The running checksum of the log may be ahead of its sidecar file by the calls of the last second
+        flush_log_checksums(self.path or LOG_PATH)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class MemorySink:
+    """ Keeps the most recent cold calls in memory, dropping the oldest once it holds capacity of them.
+    Useful for tests and simulations that want to look at what was logged without touching the disk.
     """
 
-    # Get the data for the selected student.
-    student_data = SDM.StudentRoster.get(uid, None)
-    # If there is no data for the student the student does not exist and we throw an error.
-    if student_data is None:
-        raise KeyError("The student does not exist on the roster.")
-
-    # Get the current time from the users computer.
-    now = datetime.datetime.now()
-    # Split the current time into the current date and the current time of day.
-    date, time = now.date().strftime('%Y/%m/%d'), now.time().strftime('%H:%M:%S')
-    # Distribute the data for the current student to variables to make it easier to insert the date and time into the logs.
-    fname, lname, uoid, email, phonetic, reveal_code = student_data[0:6]
-
-    # 
-    needs_header = False
-    # Check whether the log file already exists.
-    if not os.path.exists('./data/logs/daily_logs.txt'):
-        # If it doesn't we need to make a header file.
-        needs_header = True
-
-    # Open the logging file and begin appending to it.
-    with open('./data/logs/daily_logs.txt', 'a') as logfile:
-        # If the file needs a header, we add one.
-        if needs_header:
-            logfile.write(f"{DELIMITER.join(('<Date>', '<Time>', '<Flagged>', '<First Name>', '<Last Name>', '<UOID>', '<Email>', '<Phonetic Spelling>', '<Reveal Code>'))}\n")
-        
-        # Append the text for the new log to the end of the file.
-        logfile.write(
-            f"{DELIMITER.join((date, time, str(flagged), fname, lname, uoid, email, phonetic, reveal_code))}\n")
+    def __init__(self, capacity=100000):
+        self.calls = collections.deque(maxlen=capacity)
+        # The number of calls ever written, including the ones that have been dropped
+        self.written = 0
 
+    def write(self, calls) -> None:
+        self.calls.extend(calls)
+        self.written += len(calls)
 
-def export_final_participation(exp_path: str):
-    """ Compiles the existant student logs into a compiled record of how student performed in the class.
 
-    Arguments
-    ---------
-    exp_path (str): The filepath to export these logs to.
+class NullSink:
+    """ Throws cold calls away, only counting them, so benchmarks measure the queue and not the disk.
+    """
 
-    Raises
-    ------
-    KeyError: When we attempt to export to a file that already exists.
+    def __init__(self):
+        self.written = 0
+
+    def write(self, calls) -> None:
+        self.written += len(calls)
+
+
+class ColumnarSink:
+    """ Appends cold calls to the columnar log used for analytics (see columnarLog.py).
     """
 
-    def load_daily_logs():
-        """ An internal function responsible for importing the data from the existing logging file.
-        """
+    def write(self, calls) -> None:
+        columnarLog.append_many((call.uid, call.flagged, call.when, call.undo) for call in calls)
 
-        # Initialize a variable to hold the contents of the logs file.
-        # Must be done outside of the 'with' block allow other parts of the proc to access it.
-        logs = None
-        # Open the logging file to read from.
-        with open('./data/logs/daily_logs.txt', 'r') as logfile:
-            # Skip the header line on the logs.
-            logfile.readline()
-            #Store the rest of the logfiles data.
-            logs = logfile.readlines()
-
-        # If there is no data there were no logs and we should't bother.
-        if logs is None:
-            return
 
-        # for each log entry in the log file...
-        for log in logs:
-            # Convert the entry from a single, monolithic, string to a set of parameters.
-            logdata = [datum.strip() for datum in log.split()]
-            # Parse whether or not the log entry was flagged to a bool.
-            logdata[2] = bool(logdata[2])
-            # Yield the resulting log parameters.
-            yield tuple(logdata)
+class FanoutSink:
+    """ Writes cold calls to every one of several sinks, ex. FanoutSink(FileSink(), ColumnarSink()).
+    """
 
-    def compile_final_participation_logs():
-        """ Internal function responsible for generating the final participation logs.
-        """
+    def __init__(self, *sinks):
+        self.sinks = sinks
 
-        class ParticipationData:
-            """ An internal class holding the participation data for a student.
+    def write(self, calls) -> None:
+        for sink in self.sinks:
+            sink.write(calls)
 
-            Attributes
-            ----------
-            fname (str): The first name of the student
-            lname (str): The last name of the student.
-            uoid (str): The university id of the student.
-            email (str): The email address for the student.
-            phonetic (str): The phonetic spelling of the students name.
-            reveal_code (str): The reveal code for the student.
-            dates (List[str]): The dates the student was cold called.
-            times_flagged (int): The number of times this student has been flagged while this logfile has been active.
-            """
+    def flush(self) -> None:
+        for sink in self.sinks:
+            if hasattr(sink, "flush"):
+                sink.flush()
 
-            def __init__(self, fname=None, lname=None, uoid=None, email=None, phonetic=None, reveal_code=None):
-                # Set student attributes as given.
-                self.fname, self.lname, self.uoid, self.email, self.phonetic, self.reveal_code = fname, lname, uoid, email, phonetic, reveal_code
-                # Create an empty list to hold the dates the student was cold called.
-                self.dates = []
-                # Create an accumulated to hold the number of times the student was flagged when the student was cold called.
-                self.times_flagged = 0
+    def close(self) -> None:
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
 
-            def __str__(self) -> str:
-                # Parse this entry into its component parts for exporting.
+
+# The sink cold calls are logged to when no sink is given to log_cold_call
+_log_sink = FileSink()
+
+
+def set_log_sink(sink) -> None:
+    """
+    Choose where the cold calls of this process are logged.
+
+    Parameters:
+
+    sink -> A FileSink, MemorySink, NullSink, ColumnarSink, FanoutSink or anything else with a write(calls) method
+
+    Return: None
+    """
+    global _log_sink
+    _log_sink = sink
+
+
+def get_log_sink():
+    """
+    Get the sink the cold calls of this process are logged to.
+    """
+    return _log_sink
+
+
+def log_cold_call(uid: int, flagged: bool = False, sink=None) -> None:
+    """
+    Takes the reponse of the student along with their name and
+    logs it in the daily log file.
+
+    Parameters
+    ----------
+    uid (int): The student id (from the StudentDataManager) of the student that was cold called.
+    flagged (bool): Whether the student's cold call was flagged by the instructor.
+    sink: Where to log the call, defaults to the sink chosen with set_log_sink (the daily log file).
+    """
+
+    # Log the call with the current time from the users computer.
+    log_cold_calls([(uid, flagged, datetime.datetime.now())], sink)
+
+
+def log_cold_calls(calls, sink=None) -> None:
+    """
+    Logs many cold calls with one write to the sink, for example the merged results of a simulation.
+
+    Parameters
+    ----------
+    calls (Iterable[Tuple[int, bool, datetime]]): The student id, whether the call was flagged and the time of every call.
+        A fourth value of True makes the record take back the student's last call with that flag instead (see log_undo).
+    sink: Where to log the calls, defaults to the sink chosen with set_log_sink (the daily log file).
+    """
+
+    records = []
+    for uid, flagged, now, *undo in calls:
+        # Get the data for the selected student.
+        student_data = SDM.StudentRoster.get(uid, None)
+        # If there is no data for the student the student does not exist and we throw an error.
+        if student_data is None:
+            raise KeyError("The student does not exist on the roster.")
+        records.append(ColdCall(uid, flagged, now, student_data, bool(undo and undo[0])))
+
+    if records:
+        (sink or _log_sink).write(records)
+
+
+def log_undo(uid: int, flagged: bool = False, sink=None) -> None:
+    """
+    Logs a record that takes back the most recent call of a student with the same flag, for when a call
+    was made by mistake. The log is only ever appended to, so the mistaken record stays where it is and
+    every reader of the logs drops it along with this record (see cancel_undone).
+
+    Parameters
+    ----------
+    uid (int): The student id (from the StudentDataManager) of the student whose call is taken back.
+    flagged (bool): Whether the call that is taken back was flagged.
+    sink: Where to log the record, defaults to the sink chosen with set_log_sink (the daily log file).
+    """
+    log_cold_calls([(uid, flagged, datetime.datetime.now(), True)], sink)
+
+
+def cancel_undone(records, uoid_index: int, flagged_index: int) -> list:
+    """
+    Drop every undo record and the call each one takes back from a sequence of log records.
+
+    Parameters:
+
+    records: Iterable[tuple] -> Log records, oldest first, as read with scan_logs
+    uoid_index: int -> The position of the UO ID in each record
+    flagged_index: int -> The position of the flagged column in each record
+
+    Return: list
+        The records that were not taken back, in their original order
+    """
+    kept = []
+    # The positions in kept of the calls of each (UO ID, flagged column), newest last
+    calls = {}
+    for record in records:
+        flagged = record[flagged_index]
+        if flagged.startswith(UNDO_PREFIX):
+            taken_back = calls.get((record[uoid_index], flagged[len(UNDO_PREFIX):]), None)
+            if taken_back:
+                kept[taken_back.pop()] = None
+            continue
+        calls.setdefault((record[uoid_index], flagged), []).append(len(kept))
+        kept.append(record)
+    return [record for record in kept if record is not None]
+
+
+def _open_log(path: str, mode: str = "rt"):
+    """
+    Open a log file, either the live text log or a gzip or lzma compressed
+    archive of it, picking the right opener from the file extension.
+    """
+    if path.endswith(ARCHIVE_EXTENSIONS["gzip"]):
+        _count("coldcall_io_opens_total", "_open_log")
+        return gzip.open(path, mode)
+    if path.endswith(ARCHIVE_EXTENSIONS["lzma"]):
+        _count("coldcall_io_opens_total", "_open_log")
+        return lzma.open(path, mode)
+    return _counted_open(path, mode.replace("t", ""), "_open_log")
+
+
+def log_archive_paths() -> list:
+    """
+    Get the paths of every log archive, oldest day first.
+
+    Return: list
+        The archive paths. The archives are named after their day, so sorting them by name sorts them by day.
+    """
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    return [os.path.join(ARCHIVE_DIR, name) for name in sorted(os.listdir(ARCHIVE_DIR))
+            if name.endswith(tuple(ARCHIVE_EXTENSIONS.values()))]
+
+
+def iter_log_lines(include_archives=True):
+    """
+    Stream every cold call record, first from the archives (oldest day first)
+    and then from the live log. Header lines are skipped. Only one line is held
+    in memory at a time, no matter how many years of logs there are.
+
+    Parameters:
+
+    include_archives: bool -> If set to False only the live log is read
+
+    Yields: str
+        Each record line, including its newline
+    """
+    paths = log_archive_paths() if include_archives else []
+    if os.path.exists(LOG_PATH):
+        paths.append(LOG_PATH)
+
+    for path in paths:
+        with _open_log(path) as f:
+            # Skip the header line
+            f.readline()
+            yield from f
+
+
+def _split_records(lines, columns: tuple, header=True, checked=False):
+    """
+    Split log records given as bytes lines, decoding only the wanted columns of each
+    record. Each line is only split up to the last wanted column, and the columns that
+    aren't wanted are never decoded into strings.
+
+    Parameters:
+
+    lines: Iterable[bytes] -> The lines of the log, starting with its header line
+    columns: tuple -> The indexes of the columns to decode, in the order to return them
+    header: bool -> Set to False if the lines don't start with the header line
+    checked: bool -> If set to True lines that fail check_log_record (torn or hand edited records) are skipped
+
+    Yields: tuple
+        The decoded columns of each record, "" for columns a record doesn't have
+    """
+
+    tab = DELIMITER.encode()
+    last = max(columns)
+    padding = [b""] * (last + 1)
+    # Picks the wanted columns out of a split line in one call
+    pick = operator.itemgetter(*columns) if len(columns) > 1 else (lambda fields: (fields[columns[0]],))
+    lines = iter(lines)
+
+    # Skip the header line
+    if header:
+        next(lines, None)
+
+    for line in lines:
+        if checked and check_log_record(line) not in ("ok", "unchecked", "blank"):
+            continue
+        fields = line.rstrip().split(tab, last + 1)
+        if len(fields) <= last:
+            if len(fields) == 1 and not fields[0]:
+                # Skip blank lines
+                continue
+            fields += padding[len(fields):]
+        yield tuple(map(bytes.decode, pick(fields)))
+
+
+def scan_log(path: str, columns=LOG_COLUMNS, checked=False):
+    """
+    Stream the records of one log file, decoding only the requested columns. The live
+    log is memory mapped instead of read line by line into strings. Compressed archives
+    can't be mapped, so they are streamed through the decompressor instead.
+
+    Parameters:
+
+    path: str -> The log file or archive to read
+    columns: Iterable[str] -> The names of the columns to return (see LOG_COLUMNS)
+    checked: bool -> If set to True records that fail their checksum are skipped
+
+    Yields: tuple
+        The requested columns of every record, as strings
+    """
+
+    indexes = tuple(LOG_COLUMNS.index(column) for column in columns)
+
+    if path.endswith(tuple(ARCHIVE_EXTENSIONS.values())):
+        with _open_log(path, "rb") as f:
+            yield from _split_records(f, indexes, checked=checked)
+        return
+
+    with open(path, "rb") as f:
+        _count("coldcall_io_opens_total", "scan_log")
+        size = os.fstat(f.fileno()).st_size
+        # Empty files can't be memory mapped
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from _scan_mapped_records(buf, indexes, checked)
+        _count("coldcall_io_bytes_read_total", "scan_log", size)
+
+
+@functools.lru_cache(maxsize=None)
+def _record_pattern(columns: tuple):
+    """
+    Build the regular expression _scan_mapped_records finds records with. Each well formed
+    line (at least up to the last wanted column, no trailing whitespace) is matched with only
+    the wanted columns captured. Any other non blank line is matched without captures, so it
+    can be handled the way _split_records handles it.
+    """
+    wanted = set(columns)
+    fields = b"\t".join(b"([^\t\r\n]*+)" if column in wanted else b"[^\t\r\n]*+" for column in range(max(columns) + 1))
+    return re.compile(rb"^(?=[^\r\n])" + fields + rb"(?:\t[^\n]*+)?(?<![ \t\r\v\f])\r?$|^[^\n]+", re.M)
+
+
+def _scan_mapped_records(buf, columns: tuple, checked=False):
+    """
+    Find the records of a memory mapped log in place, the same as _split_records does for
+    lines. The map is searched with a regular expression that captures only the wanted
+    columns, so only their bytes are ever copied out of it and decoded, never a whole line.
+
+    Parameters:
+
+    buf: mmap -> The mapped log, starting with its header line
+    columns: tuple -> The indexes of the columns to decode, in the order to return them
+    checked: bool -> If set to True lines that fail check_log_record are skipped
+
+    Yields: tuple
+        The decoded columns of each record, "" for columns a record doesn't have
+    """
+    # The capture group of every requested column, groups are numbered in column order
+    groups = sorted(set(columns))
+    pick = tuple(groups.index(column) + 1 for column in columns)
+
+    # Skip the header line
+    start = buf.find(b"\n") + 1 or len(buf)
+
+    for match in _record_pattern(tuple(columns)).finditer(buf, start):
+        if checked and check_log_record(buf[match.start():match.end()]) not in ("ok", "unchecked", "blank"):
+            continue
+        if match.lastindex is None:
+            # A short record, or one with trailing whitespace, is rare enough to be split on its own
+            yield from _split_records((buf[match.start():match.end()],), columns, header=False)
+            continue
+        values = match.group(*pick)
+        yield tuple(map(bytes.decode, values)) if len(pick) > 1 else (values.decode(),)
+
+
+def scan_logs(columns=LOG_COLUMNS, include_archives=True, checked=False):
+    """
+    Stream the records of every archive (oldest day first) and then the live log,
+    decoding only the requested columns. This is the shared reader for exports and
+    any other scan over the logs.
+
+    Parameters:
+
+    columns: Iterable[str] -> The names of the columns to return (see LOG_COLUMNS)
+    include_archives: bool -> If set to False only the live log is read
+    checked: bool -> If set to True records that fail their checksum are skipped
+
+    Yields: tuple
+        The requested columns of every record, as strings
+    """
+    paths = log_archive_paths() if include_archives else []
+    if os.path.exists(LOG_PATH):
+        paths.append(LOG_PATH)
+
+    for path in paths:
+        yield from scan_log(path, columns, checked)
+
+
+# The byte offsets of the live log records of every UO ID, loaded from LOG_INDEX_PATH on first use, and the
+# number of bytes at the start of the live log that the index covers
+_log_index = None
+_log_index_end = 0
+# The (date, time, flagged) of the archived records of every UO ID, oldest first, loaded from ARCHIVE_INDEX_PATH on first use
+_archive_index = None
+_LOG_INDEX_LOCK = threading.RLock()
+
+
+def _index_log_lines(f, offset: int) -> list:
+    """
+    Read the records of an open binary log file from offset to its end.
+
+    Return: tuple
+        (UO ID, offset, length) of every record, and the offset of the end of the file
+    """
+    f.seek(offset)
+    if offset == 0:
+        # Skip the header line
+        offset += len(f.readline())
+
+    tab = DELIMITER.encode()
+    uoid_column = LOG_COLUMNS.index("uoid")
+    entries = []
+    for line in f:
+        fields = line.split(tab, uoid_column + 1)
+        if len(fields) > uoid_column:
+            entries.append((fields[uoid_column].decode(), offset, len(line)))
+        offset += len(line)
+    return entries, offset
+
+
+def _add_log_index_entries(entries) -> None:
+    """
+    Add (UO ID, offset, length) entries to the in memory index of the live log.
+    """
+    global _log_index_end
+    for uoid, offset, length in entries:
+        _log_index.setdefault(uoid, array.array("q")).append(offset)
+        _log_index_end = max(_log_index_end, offset + length)
+
+
+def _write_log_index_entries(entries, mode: str, path: str = LOG_INDEX_PATH) -> None:
+    with _counted_open(path, mode, "log_index") as f:
+        f.write("".join(f"{uoid}{DELIMITER}{offset}{DELIMITER}{length}\n" for uoid, offset, length in entries))
+
+
+def rebuild_log_index() -> int:
+    """
+    Build the index of the live log from scratch by reading the whole log. This is
+    done when there is no index yet, and after the live log is rewritten by
+    archive_logs. Calls logged to the live log afterwards are added to the index as
+    they are written.
+
+    Return: int
+        The number of records indexed
+    """
+    global _log_index, _log_index_end
+    with _LOG_INDEX_LOCK:
+        entries, end = [], 0
+        if os.path.exists(LOG_PATH):
+            with _counted_open(LOG_PATH, "rb", "rebuild_log_index") as f:
+                entries, end = _index_log_lines(f, 0)
+
+        os.makedirs(os.path.dirname(LOG_INDEX_PATH), exist_ok=True)
+        # Write the new index beside the old one and swap it in, so a crash never leaves half an index
+        _write_log_index_entries(entries, "w", LOG_INDEX_PATH + ".tmp")
+        os.replace(LOG_INDEX_PATH + ".tmp", LOG_INDEX_PATH)
+        _log_index, _log_index_end = {}, end
+        _add_log_index_entries(entries)
+        return len(entries)
+
+
+def _load_log_index() -> dict:
+    """
+    Get the index of the live log, loading it on first use. Records in the live log
+    past the end of the index (for example if the program stopped between writing a
+    call and indexing it) are indexed first, and if the live log is shorter than the
+    index says it was rewritten, so the index is rebuilt.
+
+    Return: dict
+        The byte offsets of the records of every UO ID
+    """
+    global _log_index, _log_index_end
+    with _LOG_INDEX_LOCK:
+        if _log_index is None:
+            if not os.path.exists(LOG_INDEX_PATH):
+                rebuild_log_index()
+                return _log_index
+
+            _log_index, _log_index_end = {}, 0
+            with _counted_open(LOG_INDEX_PATH, "r", "log_index") as f:
+                _add_log_index_entries((uoid, int(offset), int(length)) for uoid, offset, length
+                                       in (line.rstrip("\n").split(DELIMITER) for line in f))
+
+        try:
+            size = os.stat(LOG_PATH).st_size
+        except FileNotFoundError:
+            size = 0
+        if size < _log_index_end:
+            rebuild_log_index()
+        elif size > _log_index_end:
+            with _counted_open(LOG_PATH, "rb", "log_index") as f:
+                entries, end = _index_log_lines(f, _log_index_end)
+            _write_log_index_entries(entries, "a")
+            _add_log_index_entries(entries)
+            _log_index_end = end
+        return _log_index
+
+
+def _index_appended_records(uoids, lines, expected_start: int, start: int, end: int) -> None:
+    """
+    Add the records FileSink just appended to the live log to its index. The records
+    were written between the byte offsets start and end. They are only added if the
+    index covered the log up to expected_start (the start of the file for a new log),
+    otherwise the index is reloaded and catches up from the log the next time it is used.
+    """
+    global _log_index
+    # Text files turn every newline into the platform's line separator
+    extra = len(os.linesep) - 1
+    lengths = [len(line.encode()) + extra for line in lines]
+
+    with _LOG_INDEX_LOCK:
+        if _log_index is None or _log_index_end != expected_start or start + sum(lengths) != end:
+            _log_index = None
+            return
+
+        entries = []
+        offset = start
+        for uoid, length in zip(uoids, lengths):
+            entries.append((uoid, offset, length))
+            offset += length
+        _write_log_index_entries(entries, "a")
+        _add_log_index_entries(entries)
+
+
+def _add_archive_index_entries(entries) -> None:
+    """
+    Add (UO ID, date, time, flagged) entries to the in memory index of the archives.
+    """
+    for uoid, date, time, flagged in entries:
+        _archive_index.setdefault(uoid, []).append((date, time, flagged))
+
+
+def _write_archive_index_entries(entries, mode: str, path: str = ARCHIVE_INDEX_PATH) -> None:
+    with _counted_open(path, mode, "log_index") as f:
+        f.write("".join(f"{DELIMITER.join(entry)}\n" for entry in entries))
+
+
+def rebuild_archive_index() -> int:
+    """
+    Build the index of the archives from scratch by reading every archive. This is
+    only needed for archives made before they were indexed, archive_logs adds the
+    records it archives to the index as it goes.
+
+    Return: int
+        The number of records indexed
+    """
+    global _archive_index
+    with _LOG_INDEX_LOCK:
+        entries = []
+        for path in log_archive_paths():
+            entries.extend((uoid, date, time, flagged) for date, time, flagged, uoid
+                           in scan_log(path, ("date", "time", "flagged", "uoid")))
+
+        _archive_index = {}
+        _add_archive_index_entries(entries)
+        if os.path.isdir(ARCHIVE_DIR):
+            # Write the new index beside the old one and swap it in, so a crash never leaves half an index
+            _write_archive_index_entries(entries, "w", ARCHIVE_INDEX_PATH + ".tmp")
+            os.replace(ARCHIVE_INDEX_PATH + ".tmp", ARCHIVE_INDEX_PATH)
+        return len(entries)
+
+
+def _load_archive_index() -> dict:
+    """
+    Get the index of the archives, loading it on first use (and building it if there
+    are archives but no index yet).
+
+    Return: dict
+        The (date, time, flagged) of the archived records of every UO ID
+    """
+    global _archive_index
+    with _LOG_INDEX_LOCK:
+        if _archive_index is None:
+            if not os.path.exists(ARCHIVE_INDEX_PATH):
+                rebuild_archive_index()
+                return _archive_index
+
+            _archive_index = {}
+            with _counted_open(ARCHIVE_INDEX_PATH, "r", "log_index") as f:
+                _add_archive_index_entries(line.rstrip("\n").split(DELIMITER) for line in f)
+        return _archive_index
+
+
+def log_offsets(uoid: str) -> list:
+    """
+    Get the byte offsets of the records of one student in the live log, from the index.
+
+    Parameters:
+
+    uoid: str -> The UO ID of the student
+
+    Return: list
+        The offset of every record of the student, oldest first
+    """
+    return list(_load_log_index().get(uoid, ()))
+
+
+def read_log_records(offsets, columns=LOG_COLUMNS):
+    """
+    Read the live log records at the given byte offsets, seeking straight to each one
+    instead of reading the whole log.
+
+    Parameters:
+
+    offsets: Iterable[int] -> Byte offsets of records, ex. from log_offsets
+    columns: Iterable[str] -> The names of the columns to return (see LOG_COLUMNS)
+
+    Return: list
+        The requested columns of every record, as strings
+    """
+    indexes = tuple(LOG_COLUMNS.index(column) for column in columns)
+    offsets = list(offsets)
+    if not offsets:
+        return []
+
+    with _counted_open(LOG_PATH, "rb", "read_log_records") as f:
+        def lines():
+            for offset in offsets:
+                f.seek(offset)
+                yield f.readline()
+        return list(_split_records(lines(), indexes, header=False))
+
+
+def _log_records(f):
+    """
+    Stream the record lines of an open binary log, without its header and blank lines,
+    every one ending in a single newline so the same record compares equal in every file.
+    """
+    # Skip the header line
+    f.readline()
+    for line in f:
+        line = line.rstrip(b"\r\n")
+        if line:
+            yield line + b"\n"
+
+
+def merge_logs(paths):
+    """
+    Merge several logs, for example the live logs of two laptops running the program
+    for the same course, into one stream of records ordered by the time of the call.
+    The files are merged k ways while they are streamed, so only one line per file is
+    held in memory no matter how big they are. A record that is in more than one of the
+    logs (ex. the same log merged twice, or records copied between the machines) is
+    only kept once.
+
+    Parameters:
+
+    paths: Iterable[str] -> The logs to merge, live logs or compressed archives of them
+
+    Yields: bytes
+        Every record line once, oldest first
+    """
+    with contextlib.ExitStack() as stack:
+        streams = [_log_records(stack.enter_context(_open_log(path, "rb"))) for path in paths]
+
+        # The records of the second being merged. Duplicates always have the same time, so only
+        # the records of one second have to be remembered to drop them.
+        second, seen = None, set()
+        # Records start with "YYYY/MM/DD<tab>HH:MM:SS", so that prefix sorts them by time
+        for line in heapq.merge(*streams, key=lambda line: line[:19]):
+            if line[:19] != second:
+                second, seen = line[:19], set()
+            elif line in seen:
+                continue
+            seen.add(line)
+            yield line
+
+
+def scan_merged_logs(paths, columns=LOG_COLUMNS, checked=False):
+    """
+    Stream the records of several merged logs (see merge_logs), decoding only the
+    requested columns, the same as scan_logs does for this machine's logs.
+
+    Parameters:
+
+    paths: Iterable[str] -> The logs to merge
+    columns: Iterable[str] -> The names of the columns to return (see LOG_COLUMNS)
+    checked: bool -> If set to True records that fail their checksum are skipped
+
+    Yields: tuple
+        The requested columns of every record, as strings
+    """
+    indexes = tuple(LOG_COLUMNS.index(column) for column in columns)
+    yield from _split_records(merge_logs(paths), indexes, header=False, checked=checked)
+
+
+def write_merged_log(paths, out_path: str) -> int:
+    """
+    Merge several logs (see merge_logs) into one new log file.
+
+    Parameters:
+
+    paths: Iterable[str] -> The logs to merge
+    out_path: str -> The path of the merged log, which can't be one of the logs being merged
+
+    Return: int
+        The number of records in the merged log
+    """
+    paths = list(paths)
+    if any(os.path.abspath(path) == os.path.abspath(out_path) for path in paths):
+        raise ValueError("The merged log can't be written over one of the logs being merged.")
+
+    written = 0
+    with _counted_open(out_path, "wb", "write_merged_log") as f:
+        f.write(f"{LOG_HEADER}\n".encode())
+        for line in merge_logs(paths):
+            f.write(line)
+            written += 1
+    return written
+
+
+def record_checksum(record: str) -> str:
+    """
+    Get the CRC32 of a log record (without its checksum column), as the 8 hex digits logged after it.
+    """
+    return f"{zlib.crc32(record.encode()):08x}"
+
+
+def _checksum_path(path: str) -> str:
+    # The running checksum of a text log is kept beside it, ex. daily_logs.txt -> daily_logs.crc
+    return os.path.splitext(path)[0] + ".crc"
+
+
+# The (bytes covered, CRC32) of the running checksum of every text log written to, indexed by absolute path
+_log_checksums = {}
+# The paths of the logs whose running checksum has changed in memory since it was last written to its sidecar file
+_unwritten_log_checksums = set()
+# When the running checksum of each log was last written to its sidecar file (time.monotonic), indexed by absolute path
+_log_checksum_written = {}
+_LOG_CHECKSUM_LOCK = threading.Lock()
+
+
+def _read_log_checksum(path: str):
+    """
+    Read the running checksum of a text log from its sidecar file.
+
+    Return: tuple
+        (bytes covered, CRC32), or None if the log has no checksum (or its checksum file is damaged)
+    """
+    try:
+        with _counted_open(_checksum_path(path), "r", "log_checksum") as f:
+            covered, crc = f.read().split()
+        return int(covered), int(crc, 16)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_log_checksum(path: str, covered: int, crc: int) -> None:
+    # The checksum is written in place as one short fixed width line (a single small write) instead of paying
+    # for a rename every time. A damaged checksum file reads as no checksum
+    checksum_path = _checksum_path(path)
+    # Every line is the same length, so an existing file is overwritten without being truncated first
+    with _counted_open(checksum_path, "r+" if os.path.exists(checksum_path) else "w", "log_checksum") as f:
+        f.write(f"{covered:020d}{DELIMITER}{crc:08x}\n")
+    _log_checksums[os.path.abspath(path)] = (covered, crc)
+    _unwritten_log_checksums.discard(os.path.abspath(path))
+    _log_checksum_written[os.path.abspath(path)] = time.monotonic()
+
+
+@atexit.register
+def flush_log_checksums(path=None) -> None:
+    """
+    Write the running checksums that were extended in memory by FileSink to their sidecar
+    files. FileSink itself only writes a checksum once its last write is LOG_CHECKSUM_FLUSH_SECONDS
+    old, so during a burst of calls it can be behind by the calls of the last second. This is
+    called when a sink is flushed or closed, before a log is verified, and when the program
+    exits. If the program dies first the checksums only miss those last calls, which verify_log
+    reports as bytes not covered by the checksum instead of as a mismatch.
+
+    Parameters:
+
+    path: str -> The log whose checksum to write, every log's if None
+
+    Return: None
+    """
+    with _LOG_CHECKSUM_LOCK:
+        paths = list(_unwritten_log_checksums) if path is None else [os.path.abspath(path)]
+        for path in paths:
+            if path not in _unwritten_log_checksums:
+                continue
+            # A log in a folder that was deleted (ex. a temporary one) has nowhere to keep its checksum
+            if not os.path.isdir(os.path.dirname(path)):
+                _unwritten_log_checksums.discard(path)
+                continue
+            _write_log_checksum(path, *_log_checksums[path])
+
+
+def _file_crc(path: str, length=None) -> tuple:
+    """
+    Get the CRC32 of the first length bytes of a file (the whole file if length is None).
+
+    Return: tuple
+        (bytes read, CRC32)
+    """
+    crc, covered = 0, 0
+    with _counted_open(path, "rb", "log_checksum") as f:
+        while length is None or covered < length:
+            block = f.read(1 << 20 if length is None else min(1 << 20, length - covered))
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            covered += len(block)
+    return covered, crc
+
+
+def rebuild_log_checksum(path: str = LOG_PATH) -> None:
+    """
+    Checksum a whole text log from scratch. This is done after the program rewrites the
+    log (archive_logs, quarantine_log_lines), and for logs written before they had a checksum.
+    """
+    with _LOG_CHECKSUM_LOCK:
+        _write_log_checksum(path, *_file_crc(path))
+
+
+def _extend_log_checksum(path: str, data: bytes, start: int, end: int) -> None:
+    """
+    Add the bytes FileSink just appended to a text log (between the byte offsets start and
+    end) to its running checksum. The checksum is only extended if it covered the log up to
+    start, so anything added to the log by something other than the program is left out of
+    it and shows up when the log is verified.
+    """
+    with _LOG_CHECKSUM_LOCK:
+        checksum = _log_checksums.get(os.path.abspath(path), None)
+        if checksum is None or checksum[0] != start:
+            # Another process may have logged to the same file since the checksum was cached
+            checksum = _read_log_checksum(path)
+        if checksum is None:
+            if start > 0:
+                # A log from before logs had checksums, the checksum starts from what is in it now
+                _write_log_checksum(path, *_file_crc(path))
+                return
+            checksum = (0, 0)
+        if checksum[0] != start or start + len(data) != end:
+            return
+        # The copy in memory is updated, and the sidecar file is only written once its last write is
+        # LOG_CHECKSUM_FLUSH_SECONDS old (or by flush_log_checksums), so a burst of calls writes it once
+        path = os.path.abspath(path)
+        _log_checksums[path] = (end, zlib.crc32(data, checksum[1]))
+        if time.monotonic() - _log_checksum_written.get(path, 0.0) >= LOG_CHECKSUM_FLUSH_SECONDS:
+            _write_log_checksum(path, *_log_checksums[path])
+        else:
+            _unwritten_log_checksums.add(path)
+
+
+def check_log_record(line: bytes):
+    """
+    Check one line of a text log.
+
+    Parameters:
+
+    line: bytes -> The line, with or without its newline
+
+    Return: str
+        "ok" for a record whose checksum matches, "unchecked" for a well formed record logged before records had
+        a checksum, "blank" for an empty line, or why the line is bad
+    """
+    try:
+        text = line.rstrip(b"\r\n").decode()
+    except UnicodeDecodeError:
+        return "not UTF-8 text"
+    if not text:
+        return "blank"
+
+    fields = text.count(DELIMITER) + 1
+    if fields == len(LOG_COLUMNS):
+        record, _, crc = text.rpartition(DELIMITER)
+        return "ok" if record_checksum(record) == crc else "checksum does not match the record"
+    if fields == len(LOG_COLUMNS) - 1:
+        return "unchecked" if LEGACY_RECORD_PATTERN.match(text) else "malformed record without a checksum"
+    return f"{fields} columns instead of {len(LOG_COLUMNS)}"
+
+
+def _verify_chunk(path: str, start: int, end: int) -> tuple:
+    """
+    Check the lines of a text log that start between the byte offsets start and end. Runs
+    in a worker process, so only plain values go in and out.
+
+    Return: tuple
+        The number of lines, the number of checked and unchecked records, and (line in the chunk,
+        byte offset, reason, line) of every bad line
+    """
+    lines, checked, unchecked, bad = 0, 0, 0, []
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+            if offset == 0:
+                # The header line
+                result = "blank"
+            else:
+                result = check_log_record(line)
+            if result == "ok":
+                checked += 1
+            elif result == "unchecked":
+                unchecked += 1
+            elif result != "blank":
+                bad.append((lines, offset, result, line.decode(errors="replace").rstrip("\r\n")))
+            lines += 1
+            offset += len(line)
+    return lines, checked, unchecked, bad
+
+
+def _chunk_offsets(path: str, size: int, chunk_size: int) -> list:
+    """
+    Split a file into chunks of about chunk_size bytes that each start at the start of a line.
+    """
+    offsets = [0]
+    with open(path, "rb") as f:
+        for guess in range(chunk_size, size, chunk_size):
+            if guess <= offsets[-1]:
+                continue
+            # Move the cut forward to the start of the next line
+            f.seek(guess - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    return offsets
+
+
+# The result of verifying a log. bad holds (line number, reason, line) of every bad line, checksum is whether the running
+# checksum of the log matches (None if the log has no checksum), and quarantine_path is where the bad lines were moved to
+LogVerification = collections.namedtuple("LogVerification", ("path", "records", "unchecked", "bad", "checksum", "unchecksummed_bytes", "quarantine_path"))
+
+
+def verify_log(path: str = LOG_PATH, quarantine: bool = False, workers=None, chunk_size: int = VERIFY_CHUNK_SIZE) -> LogVerification:
+    """
+    Verify a text log. The log is cut into chunks at line boundaries that are checked in
+    parallel by worker processes, every record against its own CRC32, while this process
+    checks the running checksum of the whole file. Compressed archives aren't verified here
+    since gzip and xz already check every member they decompress.
+
+    Parameters:
+
+    path: str -> The text log to verify, the live log by default
+    quarantine: bool -> If set to True the bad lines are moved out of the log into QUARANTINE_DIR
+    workers: int -> The number of worker processes, defaults to one per CPU
+    chunk_size: int -> The number of bytes each worker checks at a time
+
+    Return: LogVerification
+        The number of good records, records without a checksum and the bad lines of the log, whether the running
+        checksum matches, how many bytes at the end of the log it doesn't cover, and the quarantine file if any
+    """
+    if not os.path.exists(path):
+        return LogVerification(path, 0, 0, [], None, 0, None)
+
+    # Checksums this process only holds in memory are written first, so they are verified too
+    flush_log_checksums()
+    size = os.path.getsize(path)
+    offsets = _chunk_offsets(path, size, chunk_size)
+    chunks = list(zip(offsets, offsets[1:]))
+
+    if len(chunks) < 2:
+        results = [_verify_chunk(path, start, end) for start, end in chunks]
+        checksum = _read_log_checksum(path)
+        covered = _file_crc(path, checksum[0]) if checksum is not None else None
+    else:
+        # the workers are started fresh instead of forked, since forking a process that is running tkinter is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            tasks = [pool.submit(_verify_chunk, os.path.abspath(path), start, end) for start, end in chunks]
+            # The running checksum is one CRC over the whole file, so it is worked out here while the workers check the records
+            checksum = _read_log_checksum(path)
+            covered = _file_crc(path, checksum[0]) if checksum is not None else None
+            results = [task.result() for task in tasks]
+
+    records, unchecked, bad, bad_offsets = 0, 0, [], []
+    first_line = 1
+    for lines, checked, legacy, chunk_bad in results:
+        records += checked
+        unchecked += legacy
+        for line, offset, reason, text in chunk_bad:
+            bad.append((first_line + line, reason, text))
+            bad_offsets.append(offset)
+        first_line += lines
+
+    # A checksum that covers more than the log holds doesn't match, the log was cut short
+    checksum_ok = None if checksum is None else covered == checksum
+    unchecksummed = size - min(checksum[0], size) if checksum is not None else size
+
+    quarantine_path = None
+    if quarantine and bad:
+        quarantine_path = quarantine_log_lines(path, bad_offsets, bad)
+    return LogVerification(path, records, unchecked, bad, checksum_ok, unchecksummed, quarantine_path)
+
+
+def quarantine_log_lines(path: str, offsets, bad) -> str:
+    """
+    Move lines out of a text log into a new file in QUARANTINE_DIR, so they can be looked
+    at and fixed by hand without being counted. The log is rewritten without them and its
+    checksum (and its index, for the live log) is rebuilt.
+
+    Parameters:
+
+    path: str -> The text log
+    offsets: Iterable[int] -> The byte offset of every line to move
+    bad: Iterable[tuple] -> (line number, reason, line) of every line to move, written beside each one
+
+    Return: str
+        The path of the quarantine file
+    """
+    offsets = set(offsets)
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    quarantine_path = os.path.join(QUARANTINE_DIR, f"{name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.txt")
+    with _counted_open(quarantine_path, "w", "quarantine_log_lines") as f:
+        f.write(f"{DELIMITER.join(('<Line>', '<Reason>', '<Record>'))}\n")
+        f.writelines(f"{line}{DELIMITER}{reason}{DELIMITER}{text}\n" for line, reason, text in bad)
+
+    kept_path = path + ".tmp"
+    with _counted_open(path, "rb", "quarantine_log_lines") as log, _counted_open(kept_path, "wb", "quarantine_log_lines") as kept:
+        offset = 0
+        for line in log:
+            if offset not in offsets:
+                kept.write(line)
+            offset += len(line)
+    # Swap in the log without the bad lines in one step, so the log is never left half written
+    os.replace(kept_path, path)
+
+    rebuild_log_checksum(path)
+    if os.path.abspath(path) == os.path.abspath(LOG_PATH):
+        # The offsets of the records after the first bad line have all changed
+        rebuild_log_index()
+    return quarantine_path
+
+
+def student_history(uoid: str, include_archives=True) -> list:
+    """
+    Get every cold call of one student from the logs.
+
+    Parameters:
+
+    uoid: str -> The UO ID of the student
+    include_archives: bool -> If set to False only the live log is read
+
+    Return: list
+        (date, time, flagged) of every call of the student, oldest first
+    """
+    records = []
+    # The archived records of the student are kept in the archive index, since the archives are compressed and
+    # can't be seeked into. A day archived in two runs may be indexed after a later day, so they are put in order
+    if include_archives:
+        records.extend((date, time, flagged, uoid) for date, time, flagged
+                       in sorted(_load_archive_index().get(uoid, ()), key=lambda record: record[0:2]))
+    # The live log records of the student are found with the index of the live log
+    if os.path.exists(LOG_PATH):
+        records.extend(read_log_records(log_offsets(uoid), ("date", "time", "flagged", "uoid")))
+    return [(date, time, flagged == "True") for date, time, flagged, _ in cancel_undone(records, 3, 2)]
+
+
+def archive_logs(before=None, compression="gzip") -> int:
+    """
+    Move the records of every day before the given day out of the live log and into
+    one compressed archive per day in ARCHIVE_DIR. Each archive has its own header
+    and can be decompressed on its own with gzip/xz. If an archive for a day already
+    exists, the records are added to it as another compressed member, which the
+    standard tools still read as one file. The archived records are added to the
+    archive index, so student_history never has to decompress the archives.
+
+    Parameters:
+
+    before: datetime.date -> Days before this one are archived, defaults to today
+    compression: str -> Either "gzip" or "lzma"
+
+    Return: int
+        The number of records that were archived
+    """
+
+    if compression not in ARCHIVE_EXTENSIONS:
+        raise ValueError(f"Unknown compression '{compression}'.")
+
+    if not os.path.exists(LOG_PATH):
+        return 0
+
+    if before is None:
+        before = datetime.date.today()
+    # Dates are logged as YYYY/MM/DD so they can be compared as text
+    cutoff = before.strftime('%Y/%m/%d')
+
+    # The live log is written in order, so if its first record is from the cutoff day or later there is nothing
+    # to archive. This is the usual case after the first time the program is opened on a day, and it only costs
+    # reading the first two lines instead of copying the whole log
+    with _open_log(LOG_PATH) as logfile:
+        logfile.readline()
+        first = logfile.readline().split(DELIMITER, 1)[0]
+    if not first or (first >= cutoff and first.count("/") == 2):
+        return 0
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    # The index has to cover the archives there already are before records are added to them and to it
+    _load_archive_index()
+    archived = 0
+    # (UO ID, date, time, flagged) of every record archived, for the archive index
+    indexed = []
+    # The archive that is currently open, and the day it belongs to. The log is written in order, so
+    # each day's records are next to each other and only one archive has to be open at a time.
+    archive, archive_day = None, None
+    kept_path = LOG_PATH + ".tmp"
+
+    try:
+        with _open_log(LOG_PATH) as logfile, _counted_open(kept_path, "w", "archive_logs") as kept:
+            # Copy the header into the new live log
+            kept.write(logfile.readline())
+
+            for line in logfile:
+                day = line.split(DELIMITER, 1)[0]
+                if day >= cutoff or day.count("/") != 2:
+                    # Today's records (and anything that doesn't look like a record) stay in the live log
+                    kept.write(line)
+                    continue
+
+                if day != archive_day:
+                    if archive is not None:
+                        archive.close()
+                    path = os.path.join(ARCHIVE_DIR, f"daily_logs_{day.replace('/', '-')}.txt{ARCHIVE_EXTENSIONS[compression]}")
+                    needs_header = not os.path.exists(path)
+                    archive = _open_log(path, "at")
+                    archive_day = day
+                    if needs_header:
+                        archive.write(f"{LOG_HEADER}\n")
+
+                archive.write(line)
+                archived += 1
+                fields = line.split(DELIMITER, 6)
+                if len(fields) > 5:
+                    indexed.append((fields[5], fields[0], fields[1], fields[2]))
+
+            # The new live log has to be on disk before it replaces the old one
+            if archived:
+                _fsync(kept, "archive_logs")
+    finally:
+        if archive is not None:
+            archive.close()
+
+    if archived == 0:
+        # Nothing to archive, leave the live log untouched
+        os.remove(kept_path)
+        return 0
+
+    with _LOG_INDEX_LOCK:
+        _write_archive_index_entries(indexed, "a")
+        _add_archive_index_entries(indexed)
+
+    # Swap in the new live log in one step, so the log is never left half written
+    os.replace(kept_path, LOG_PATH)
+    # The offsets of the records left in the live log have all changed, and so has its checksum
+    rebuild_log_index()
+    rebuild_log_checksum()
+    return archived
+
+
+@_track_memory
+def export_final_participation(exp_path: str, log_paths=None, verify=True, quarantine=False):
+    """ Compiles the existant student logs into a compiled record of how student performed in the class.
+
+    Arguments
+    ---------
+    exp_path (str): The filepath to export these logs to.
+    log_paths (Iterable[str]): Logs to merge and export instead of this machine's archives and live log, ex. the live logs of every laptop used in the course.
+    verify (bool): Whether to verify the text logs first (see verify_log) and skip their bad records, so they aren't counted. The logs are only read.
+    quarantine (bool): Whether to also move the bad lines of this machine's live log into QUARANTINE_DIR. Other logs, ex. the ones in log_paths, are never changed.
+
+    Returns
+    -------
+    List[LogVerification]: The verification of every text log that was exported.
+
+    Raises
+    ------
+    KeyError: When we attempt to export to a file that already exists.
+    """
+
+    def load_daily_logs():
+        """ An internal function responsible for importing the data from the existing logging file.
+        """
+
+        # for each log entry in the archives and the live log file that wasn't taken back. The time of day isn't used so it isn't decoded.
+        columns = ("date", "flagged", "fname", "lname", "uoid", "email", "phonetic", "reveal_code")
+        # Torn or hand edited records are skipped when verifying, so they can't shift the columns of the export
+        records = scan_logs(columns, checked=verify) if log_paths is None else scan_merged_logs(log_paths, columns, checked=verify)
+        for log in cancel_undone(records, 4, 1):
+            # Parse whether or not the log entry was flagged to a bool.
+            # Yield the resulting log parameters, with an empty time so the columns stay in the logged order.
+            yield (log[0], "", log[1] == "True") + log[2:]
+
+    def compile_final_participation_logs():
+        """ Internal function responsible for generating the final participation logs.
+        """
+
+        class ParticipationData:
+            """ An internal class holding the participation data for a student.
+
+            Attributes
+            ----------
+            fname (str): The first name of the student
+            lname (str): The last name of the student.
+            uoid (str): The university id of the student.
+            email (str): The email address for the student.
+            phonetic (str): The phonetic spelling of the students name.
+            reveal_code (str): The reveal code for the student.
+            dates (List[str]): The dates the student was cold called.
+            times_flagged (int): The number of times this student has been flagged while this logfile has been active.
+            """
+
+            def __init__(self, fname=None, lname=None, uoid=None, email=None, phonetic=None, reveal_code=None):
+                # Set student attributes as given.
+                self.fname, self.lname, self.uoid, self.email, self.phonetic, self.reveal_code = fname, lname, uoid, email, phonetic, reveal_code
+                # Create an empty list to hold the dates the student was cold called.
+                self.dates = []
+                # Create an accumulated to hold the number of times the student was flagged when the student was cold called.
+                self.times_flagged = 0
+
+            def __str__(self) -> str:
+                # Parse this entry into its component parts for exporting.
                 return DELIMITER.join((
-                    len(self.dates),
-                    self.times_flagged,
+                    str(len(self.dates)),
+                    str(self.times_flagged),
                     self.fname,
                     self.lname,
                     self.uoid,
@@ -523,14 +2220,14 @@ def export_final_participation(exp_path: str):
 
         # For each log that this program has ever logged.
         for log in load_daily_logs():
-            # Get the unique identifier of the student that was logged.
-            uid = SDM.GetStudentUid(log[3], log[4])
+            # Students are identified by the UO ID that was logged.
+            uid = log[5]
 
             # Attempt to fetch the cumulative participation info for this student.
             participation = students.get(uid, None)
             if participation is None:
                 # If we don't already have one see if we can build one from the current student roster.
-                roster_data = SDM.StudentRoster.get(uid, None)
+                roster_data = SDM.StudentRoster.get(SDM.StudentIds.get(uid, None), None)
                 # Otherwise, just use the data from the log.
                 if roster_data is None:
                     roster_data = tuple(log[3:])
@@ -546,20 +2243,169 @@ def export_final_participation(exp_path: str):
                 # Also add whether the student was flagged to the accumulator.
                 participation.times_flagged += 1
 
-        # Yield the data for each student, compiled into a string.
+        # Yield the data for each student, compiled into a line.
         for uid in students:
-            yield str(students[uid])
+            yield f"{students[uid]}\n"
 
+    # Check and handled operations that would overwrite existing files by not doing them.
+    if os.path.exists(exp_path):
+        raise KeyError("The desired export file already exists.")  # TODO: More elegant collision handling.
 
-        # Check and handled operations that would overwrite existing files by not doing them.
-        if os.path.exists(exp_path):
-            raise KeyError("The desired export file already exists.")  # TODO: More elegant collision handling.
+    # Report the torn or hand edited records of the text logs. Only this machine's live log is changed, and only when asked
+    verifications = []
+    if verify:
+        for path in (log_paths if log_paths is not None else [LOG_PATH]):
+            if not path.endswith(tuple(ARCHIVE_EXTENSIONS.values())):
+                local = os.path.abspath(path) == os.path.abspath(LOG_PATH)
+                verifications.append(verify_log(path, quarantine=quarantine and local))
 
     # Open the final participation logging file and write the data for each student to it.
-    with open(exp_path, 'w') as export_file:
+    with _counted_open(exp_path, 'w', "export_final_participation") as export_file:
         # First add the header so we can tell when the columns mean.
         export_file.write(f"{DELIMITER.join(('<Times Called>', '<Times Flagged>', '<First Name>', '<Last Name>', '<UOID>', '<Phonetic Spelling>', '<Reveal Code>', '<Logged Dates>'))}\n")
         # Then rite the date for eahc student as a delimited line of values.
         export_file.writelines(compile_final_participation_logs())
 
-    pass
+    return verifications
+
+
+def flagged_calls(since=None, until=None, log_paths=None) -> dict:
+    """
+    Group the flagged cold calls in the logs by student. The logs are streamed, so only
+    the flagged calls are held in memory. Calls that were taken back are not counted.
+
+    Parameters:
+
+    since: str -> The first day to include, as YYYY/MM/DD, or None to start at the oldest log
+    until: str -> The last day to include, as YYYY/MM/DD, or None to go up to today
+    log_paths: Iterable[str] -> Logs to merge and read instead of this machine's archives and live log
+
+    Return: dict
+        (first name, last name, UO ID, email, phonetic spelling, reveal code) of every student
+        that was flagged, indexed by UO ID, and the (date, time) of each of their flagged calls, oldest first
+    """
+    columns = ("date", "time", "flagged", "fname", "lname", "uoid", "email", "phonetic", "reveal_code")
+    records = scan_logs(columns) if log_paths is None else scan_merged_logs(log_paths, columns)
+
+    students = {}
+    for record in cancel_undone(records, 5, 2):
+        # Dates are logged as YYYY/MM/DD, so comparing them as strings compares the days
+        if record[2] != "True" or (since is not None and record[0] < since) or (until is not None and record[0] > until):
+            continue
+        student = students.get(record[5], None)
+        if student is None:
+            # Use the current roster when the student is still on it, so a changed email address is used
+            roster_data = SDM.StudentRoster.get(SDM.StudentIds.get(record[5], None), None)
+            student = students[record[5]] = (tuple(roster_data[0:6]) if roster_data is not None else record[3:], [])
+        student[1].append((record[0], record[1]))
+    return students
+
+
+def follow_up_messages(students, sender=FOLLOW_UP_SENDER, subject=FOLLOW_UP_SUBJECT):
+    """
+    Build one follow up email per flagged student, listing the calls they were flagged on.
+
+    Parameters:
+
+    students: dict -> The flagged calls of every student, as returned by flagged_calls
+    sender: str -> The address the messages are from
+    subject: str -> The subject of the messages
+
+    Yields: EmailMessage
+        The message to each student with an email address, ordered by last and first name
+    """
+    # Every message of a batch is built in the same second, so the date header is only formatted once
+    date = email.utils.formatdate(localtime=True)
+    domain = sender.rpartition("@")[2] or None
+    for (fname, lname, uoid, address, phonetic, reveal_code), calls in sorted(students.values(), key=lambda student: (student[0][1], student[0][0])):
+        if not address:
+            continue
+        message = email.message.EmailMessage(policy=email.policy.SMTP)
+        message["From"] = sender
+        message["To"] = email.utils.formataddr((f"{fname} {lname}", address))
+        message["Subject"] = subject
+        message["Date"] = date
+        message["Message-ID"] = email.utils.make_msgid(uoid, domain)
+        days = "\n".join(f"    {day} at {time}" for day, time in calls)
+        message.set_content(f"Hi {phonetic or fname},\n\n"
+                            f"You were flagged for a follow up in class {len(calls)} time{'s' if len(calls) != 1 else ''}:\n{days}\n\n"
+                            "Please come by office hours or reply to this email so we can talk about it.\n")
+        yield message
+
+
+def write_follow_up_mbox(path: str, messages) -> int:
+    """
+    Append follow up messages to one mbox file, which any mail client can import.
+    The mailbox is locked and flushed once for the whole batch.
+
+    Parameters:
+
+    path: str -> The mbox file to write, created if it doesn't exist
+    messages: Iterable[EmailMessage] -> The messages, as built by follow_up_messages
+
+    Return: int
+        The number of messages written
+    """
+    box = mailbox.mbox(path, create=True)
+    box.lock()
+    try:
+        written = 0
+        for message in messages:
+            box.add(message)
+            written += 1
+        box.flush()
+    finally:
+        box.unlock()
+        box.close()
+    _count("coldcall_io_opens_total", "write_follow_up_mbox")
+    return written
+
+
+def write_follow_up_eml(directory: str, messages) -> int:
+    """
+    Write follow up messages as one .eml file per student in a folder.
+
+    Parameters:
+
+    directory: str -> The folder to write to, created if it doesn't exist
+    messages: Iterable[EmailMessage] -> The messages, as built by follow_up_messages
+
+    Return: int
+        The number of messages written
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for message in messages:
+        # The Message-ID ends with the UO ID of the student (before the domain), so it names the file uniquely
+        name = message["Message-ID"].strip("<>").split("@")[0].rsplit(".", 1)[-1]
+        with _counted_open(os.path.join(directory, f"{name}.eml"), "wb", "write_follow_up_eml") as f:
+            f.write(message.as_bytes())
+        written += 1
+    return written
+
+
+def send_follow_up_messages(messages, host="localhost", port=25, timeout=10) -> int:
+    """
+    Send follow up messages over a single SMTP connection, so the connection and
+    greeting are paid for once per batch instead of once per message.
+
+    Parameters:
+
+    messages: Iterable[EmailMessage] -> The messages, as built by follow_up_messages
+    host: str -> The SMTP server to send through
+    port: int -> The port of the SMTP server
+    timeout: float -> How many seconds to wait for the server before giving up
+
+    Return: int
+        The number of messages sent
+
+    Raises:
+
+    smtplib.SMTPException, OSError: When the server can't be reached or refuses a message
+    """
+    sent = 0
+    with smtplib.SMTP(host, port, timeout=timeout) as server:
+        for message in messages:
+            server.send_message(message)
+            sent += 1
+    return sent
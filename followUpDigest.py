@@ -0,0 +1,96 @@
+"""followUpDigest.py - Python file that writes a follow up email for every flagged student, as an mbox
+file or a folder of .eml files, or sends them over one SMTP connection.
+"""
+
+import socketserver
+import sys
+import threading
+import time
+import fileIO as fio
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP to accept messages and counts them on the server, without delivering them."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 localhost stand-in SMTP server")
+        for line in self.rfile:
+            command = line.decode("ascii", "replace").strip().upper()
+            if command == "DATA":
+                self.reply("354 end data with <CR><LF>.<CR><LF>")
+                # The message is read up to the line holding a single dot and dropped
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                with self.server.lock:
+                    self.server.received += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            elif command.startswith("EHLO"):
+                self.reply("250 localhost")
+            else:
+                # HELO, MAIL FROM, RCPT TO, RSET and NOOP are all accepted as they are
+                self.reply("250 OK")
+
+
+def serveStandIn():
+    """Starts a stand-in SMTP server on a free port of 127.0.0.1 in a background thread and returns it.
+    Call shutdown() on it to stop serving, its received attribute is the number of messages accepted."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StandInSMTPHandler)
+    server.daemon_threads = True
+    server.received = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def Main(argv=None):
+    """Usage: python followUpDigest.py [--since YYYY/MM/DD] [--until YYYY/MM/DD] (--mbox path | --eml folder | --smtp host:port | --smtp local)
+
+    Writes or sends the follow up messages of the flagged calls between the two days. --smtp local sends
+    them to a stand-in server started for the run, which accepts and counts them without delivering them."""
+
+    argv = sys.argv[1:] if argv is None else argv
+    options = dict(zip(argv[0::2], argv[1::2]))
+    outputs = [option for option in ("--mbox", "--eml", "--smtp") if option in options]
+    if len(argv) % 2 or len(outputs) != 1 or set(options) - {"--since", "--until", "--mbox", "--eml", "--smtp"}:
+        print(Main.__doc__.split("\n")[0])
+        return 2
+
+    start = time.perf_counter()
+    students = fio.flagged_calls(options.get("--since", None), options.get("--until", None))
+    messages = fio.follow_up_messages(students)
+
+    standIn = None
+    if "--mbox" in options:
+        count = fio.write_follow_up_mbox(options["--mbox"], messages)
+        where = options["--mbox"]
+    elif "--eml" in options:
+        count = fio.write_follow_up_eml(options["--eml"], messages)
+        where = options["--eml"]
+    else:
+        if options["--smtp"] == "local":
+            standIn = serveStandIn()
+            host, port = standIn.server_address
+        else:
+            host, _, port = options["--smtp"].partition(":")
+            port = int(port or 25)
+        try:
+            count = fio.send_follow_up_messages(messages, host, port)
+        finally:
+            if standIn is not None:
+                standIn.shutdown()
+                standIn.server_close()
+        where = f"{host}:{port}"
+
+    print(f"{count} follow up messages for {len(students)} flagged students to {where} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
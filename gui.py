@@ -10,27 +10,42 @@ Description:
     Structure of the GUI:
         - On boot, if there is no student data, correctly formatted and saved in the cold-call software the gui will first open a file exploror that asks for a correctly formatted data file
         - After revieving a correctly formatted data file the GUI become a TK frame (aka a window built by Python's TKinter module) that is 800 px in width and 50 px in height
-        - Inside the TK frame are gour InteractiveStudentWidgets (ISW) evenly spaced out using the tkinter grid system
+        - Inside the TK frame are InteractiveStudentWidgets (ISW), one per deck spot (four by default), evenly spaced out using the tkinter grid system
             - Each ISW contains a string that concatonates the first and last name of a student. Each time the queue updates the keystroke event runs the code to update
             the data on the backend, and the ISW text is updated with a new students first and last name.
         - There is one drop down menu that offers functionality for uploading new student date.
             - For example: if the teacher wants to get rid of or add a new student they can edit the data file they uploaded and then upload the new data to the cold-call software
 """
 import testrandom as tr
+import cProfile
+import datetime
+import os
+import queue
+import threading
+import time
 import tkinter as tk
+from tkinter import ttk
 import tkinter.font as font
 from tkinter import filedialog as fd
 from tkinter.messagebox import showinfo
 import fileIO as fio  # key_bindings function() returns keybindings as a dictionary
 from studentDataManager import StudentDataManager as SDM
-from StudentQueue import StudentQueue
+from StudentQueue import StudentQueue, UniformPolicy, WeightedPolicy, CooldownPolicy, COOLDOWN
+from latencyHistogram import LatencyHistogram, dump_histograms
+from imageCache import ThumbnailCache, has_thumbnails
+from studentSearch import StudentSearchIndex
+from rosterWatcher import RosterWatcher
+from deckController import DeckController, PHASES
+
+PREFETCH = 4
+# The number of students behind the deck whose photos are loaded ahead of time
 
 class InteractiveStudentWidget(tk.Label):
     """
     **NOTE: This class must be placed above MainWin because MainWin takes this class as a type for one of its methods**
-    This class will display the students name in a box. It will be instantiated four times and take up one quarter
-    of the rootWindow space. Once all four InteractiveStudentWidget are instantiated they will fill the rootWindow from
-    left to right
+    This class will display the students name in a box. It will be instantiated once for every spot on the deck (four by
+    default) and take up an equal share of the rootWindow space. Once all of the InteractiveStudentWidget are instantiated
+    they will fill the rootWindow from left to right
     """
 
     def __init__(self, masterWindow, width, studentName, font, row=0, column=0, height=50):
@@ -47,8 +62,43 @@ class InteractiveStudentWidget(tk.Label):
                           relief="solid", width=width - 2, height=height - 2, bg='black', fg='white')
         self.grid(row=row, column=column)
 
+        # The id (from the StudentDataManager) of the student shown in this spot, so the student never has to be found from the name text
+        self.studentId = None
+
+        # The photo shown above the name, if any. The label measures its size in characters when it only shows text and in pixels when it
+        # shows an image, so both sizes are kept
+        self.photo = None
+        self.textSize = (width - 2, height - 2)
+        self.photoSize = (width - 2, fio.THUMBNAIL_SIZE + 2 * font.metrics("linespace"))
+
     def setName(self, name: str):
-        self.text.set(name)
+        # Only touch the StringVar when the text actually changes, setting it always schedules a redraw of the label
+        if self.text.get() != name:
+            self.text.set(name)
+
+    def setStudent(self, studentId: int, name: str):
+        self.studentId = studentId
+        self.setName(name)
+
+    def setPhoto(self, photo):
+        # photo is a tk.PhotoImage, or None to show the name only
+        if photo is self.photo:
+            return
+        self.photo = photo
+        if photo is None:
+            self.configure(image="", width=self.textSize[0], height=self.textSize[1])
+        else:
+            self.configure(image=photo, compound="top", width=self.photoSize[0], height=self.photoSize[1])
+
+    def highlight(self):
+        self.configure(bg='white', fg='black')
+
+    def select(self):
+        # Selected for a group call, shown between the highlighted and the plain colors
+        self.configure(bg='gray', fg='white')
+
+    def unhighlight(self):
+        self.configure(bg='black', fg='white')
 
 
 class MainWin(tk.Tk):
@@ -64,10 +114,8 @@ class MainWin(tk.Tk):
 
         # Set up the grid system so everything is equal when spacing. Source: https://www.pythontutorial.net/tkinter/tkinter-grid/
         self.rowconfigure(0, weight=1)
-        self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=1)
-        self.columnconfigure(2, weight=1)
-        self.columnconfigure(3, weight=1)
+        for column in range(maxNumberStudents):
+            self.columnconfigure(column, weight=1)
 
         # Make the window sit on top of all other windows Source: https://www.tutorialspoint.com/how-to-put-a-tkinter-window-on-top-of-the-others
         self.attributes('-topmost', True)
@@ -86,6 +134,17 @@ class MainWin(tk.Tk):
         # Set the size of the window with pixel values
         self.geometry("800x50")
 
+        # Thumbnails of the student photos, loaded in the background and shown above the names once they are ready
+        self.thumbnails = ThumbnailCache(self, onLoad=self.showPhoto)
+
+        # Latency of each phase of a cold call, from the key press to the repainted deck. Dumped to ./data/metrics on exit. The deck controller
+        # times the queue update, log write and save, and the window adds the repaint
+        self.latency = {phase: LatencyHistogram(phase) for phase in PHASES + ("repaint", "key to paint")}
+
+        # The deck controller holds which spot is highlighted, the calls waiting to be handled and the undo history, and makes the changes to the
+        # queue, the log and the saved queue. The window only draws what it says. Its queue is set once the student data is loaded
+        self.deck = DeckController(latency=self.latency)
+
         # the first time the program is run,
         # init the student database and import the photos
         if not fio.data_exists():
@@ -97,14 +156,18 @@ class MainWin(tk.Tk):
 
         self.row = 0  # This MUST stay constant
 
-        # Each spot will have its text edited with a students name in its place
-        self.firstSpot = InteractiveStudentWidget(self, 200, "0 0", self.times24, row=self.row, column=0)
-        self.secondSpot = InteractiveStudentWidget(self, 200, "1 1", self.times24, row=self.row, column=1)
-        self.thirdSpot = InteractiveStudentWidget(self, 200, "2 2", self.times24, row=self.row, column=2)
-        self.fourthSpot = InteractiveStudentWidget(self, 200, "3 3", self.times24, row=self.row, column=3)
+        # Each spot will have its text edited with a students name in its place. The spots are ordered left to right.
+        self.spots = [InteractiveStudentWidget(self, self.widthOfStudentEntry, f"{i} {i}", self.times24, row=self.row, column=i)
+                      for i in range(maxNumberStudents)]
 
-        # Set the current student for key binding purposes
-        self.currentStudent = None
+        # Remove and flag key presses are queued by the deck controller and handled together once Tk is idle, so holding down a key
+        # (autorepeat) costs one save and one repaint per burst instead of one per key event
+        self.flushScheduled = None
+
+        # The profiler toggled with control+p, and the file its stats for this session are written to
+        self.profiler = None
+        self.profiling = False
+        self.profilePath = f"./data/metrics/profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats"
 
         self.PathToStudentData = ""
         self.PathToStudentImages = None
@@ -114,20 +177,17 @@ class MainWin(tk.Tk):
         self.count = 0
 
         # Load the queue of students. If there are none loaded then procede to load the data
-        self.studentqueue = None
         if fio.data_exists():
+            # Roll the logs of past days into compressed archives so the live log only holds today. Only the first time the program
+            # is opened on a day finds past days to archive, any other time this only reads the first record of the log
+            fio.archive_logs()
             # Call to load the roster data from SDM
             SDM.LoadRoster(fio.load_queue())
-            # Set the studentqueue property for this class
-            self.studentqueue = StudentQueue(fio.load_queue())
-            # create a temporary variable which stores a list of the first four students in the queue
-            studentlist = self.studentqueue.getOnDeckStudents()
-            
-            # Fill the four GUI spots with the first four names that were saved in studentlist
-            self.firstSpot.setName(studentlist[0])
-            self.secondSpot.setName(studentlist[1])
-            self.thirdSpot.setName(studentlist[2])
-            self.fourthSpot.setName(studentlist[3])
+            # Give the queue of students to the deck controller
+            self.deck.setQueue(self.newQueue(fio.load_queue()))
+            # Fill the GUI spots with the on deck students
+            self.resizeForPhotos()
+            self.refreshDeck()
 
         # Map the correct keys to the correct functions
         for key in self.kbDictionary:
@@ -139,10 +199,32 @@ class MainWin(tk.Tk):
                 self.bind(self.kbDictionary[key], self.remove)
             elif key == "flag":
                 self.bind(self.kbDictionary[key], self.flag)
+            elif key == "select":
+                self.bind(self.kbDictionary[key], self.select)
             #print(f"key {key} contains value {self.kbDictionary[key]}")
         
         # bind control+t so the user can test the normal distribution of students by writing 100 removes from 100 queue randomizations to the daily_log.txt file
         self.bind('<Control-t>', self.testData)
+
+        # the window showing the progress of the randomness test while it runs
+        self.testWindow = None
+
+        # bind control+z and control+y so the user can take back a call made by mistake, and make it again
+        self.bind('<Control-z>', self.undo)
+        self.bind('<Control-y>', self.redo)
+
+        # bind control+f so the user can search for a student to call on or to see the history of
+        self.bind('<Control-f>', self.openSearch)
+
+        # the search window and the index it searches, which is built the first time the window is opened
+        self.searchWindow = None
+        self.searchIndex = None
+
+        # bind control+p so the user can start and stop profiling the program
+        self.bind('<Control-p>', self.toggleProfiler)
+
+        # dump the latency numbers when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.onClose)
         
         # instantiate the menu bar that contains an import option to import new student roster data
         self.createMenuBar()
@@ -158,8 +240,169 @@ class MainWin(tk.Tk):
             # do not perform the test if the user says no to wanting to perform it
             return
         
-        # Run the test becasue the user confirmed they want to run it
-        tr.Main()
+        # Only one test can run at a time
+        if self.testWindow is not None:
+            return
+
+        # Run the test becasue the user confirmed they want to run it. It runs on a separate thread (which hands the queues to a pool of
+        # worker processes) so the window keeps responding, with a small window showing its progress and a button to cancel it.
+        self.testWindow = tk.Toplevel(self)
+        self.testWindow.title("Testing")
+        self.testWindow.attributes('-topmost', True)
+        self.testProgress = ttk.Progressbar(self.testWindow, length=300, maximum=tr.TRIALS)
+        self.testProgress.grid(row=0, column=0, padx=10, pady=10)
+        self.testCancelled = threading.Event()
+        tk.Button(self.testWindow, text="Cancel", command=self.testCancelled.set).grid(row=1, column=0, pady=(0, 10))
+        self.testWindow.protocol("WM_DELETE_WINDOW", self.testCancelled.set)
+
+        # The test thread can't touch tkinter, so it puts its progress and its result on a queue that pollTest reads
+        self.testUpdates = queue.Queue()
+        # It can't touch the roster either, which the window keeps using while the test runs, so it gets a copy of it taken here
+        students = list(SDM.StudentRoster.items())
+        threading.Thread(target=self.runTest, args=(students,), daemon=True).start()
+        self.after(100, self.pollTest)
+
+    def runTest(self, students):
+        '''
+        Runs on the test thread. Runs the randomness test on students, a list of (student id, student entry) pairs copied from the roster,
+        and puts its progress and its final message on self.testUpdates.
+        '''
+        try:
+            message = tr.Main(progress=lambda done, total: self.testUpdates.put(("progress", done)), cancelled=self.testCancelled,
+                              students=students)
+        except Exception as error:
+            message = f"The test failed: {error}"
+        self.testUpdates.put(("done", message))
+
+    def pollTest(self):
+        '''
+        Called on the tkinter thread every 100 ms while the randomness test runs. Updates the progress bar and closes the test window once the test is done.
+        '''
+        while not self.testUpdates.empty():
+            kind, value = self.testUpdates.get()
+            if kind == "progress":
+                self.testProgress["value"] = value
+            else:
+                self.testWindow.destroy()
+                self.testWindow = None
+                showinfo(title="Test", message=value)
+                return
+        self.after(100, self.pollTest)
+
+    def openSearch(self, event):
+        '''
+        This is the event handler for the key press combination of Control+f. It opens a window with a search box, and every key typed into it lists the students whose name,
+        phonetic spelling or UO ID best match what has been typed so far. The listed student that is selected can be called on (for example when they volunteered) or have
+        their cold call history shown.
+        '''
+        if self.searchWindow is not None:
+            self.searchWindow.lift()
+            self.searchEntry.focus_set()
+            return
+
+        if self.searchIndex is None:
+            self.searchIndex = StudentSearchIndex().attach()
+
+        self.searchWindow = tk.Toplevel(self)
+        self.searchWindow.title("Find Student")
+        self.searchWindow.attributes('-topmost', True)
+        self.searchWindow.protocol("WM_DELETE_WINDOW", self.closeSearch)
+        self.searchWindow.bind('<Escape>', lambda event: self.closeSearch())
+
+        self.searchText = tk.StringVar()
+        self.searchText.trace_add("write", self.updateSearch)
+        self.searchEntry = tk.Entry(self.searchWindow, textvariable=self.searchText, width=40)
+        self.searchEntry.grid(row=0, column=0, columnspan=2, padx=10, pady=(10, 5), sticky="ew")
+        self.searchEntry.bind('<Return>', lambda event: self.showSearchedHistory())
+        self.searchEntry.focus_set()
+
+        self.searchList = tk.Listbox(self.searchWindow, height=10, width=40, exportselection=False)
+        self.searchList.grid(row=1, column=0, columnspan=2, padx=10, sticky="ew")
+        self.searchList.bind('<Double-Button-1>', lambda event: self.showSearchedHistory())
+        self.searchResults = []
+
+        tk.Button(self.searchWindow, text="Call On", command=self.callOnSearched).grid(row=2, column=0, pady=10)
+        tk.Button(self.searchWindow, text="History", command=self.showSearchedHistory).grid(row=2, column=1, pady=10)
+
+    def closeSearch(self):
+        self.searchWindow.destroy()
+        self.searchWindow = None
+
+    def updateSearch(self, *args):
+        '''
+        Called every time the text in the search box changes. Lists the best matching students, the best match first and selected.
+        '''
+        self.searchResults = self.searchIndex.search(self.searchText.get())
+        self.searchList.delete(0, tk.END)
+        for studentId in self.searchResults:
+            student = SDM.StudentRoster[studentId]
+            self.searchList.insert(tk.END, f"{student[0]} {student[1]} ({student[2]})")
+        if self.searchResults:
+            self.searchList.selection_set(0)
+
+    def searchedStudent(self):
+        # The id of the student selected in the search window, or None if no student is listed
+        selection = self.searchList.curselection()
+        if not selection or selection[0] >= len(self.searchResults):
+            return None
+        return self.searchResults[selection[0]]
+
+    def callOnSearched(self):
+        '''
+        Logs a cold call of the student selected in the search window. If the student is on deck they are taken off the deck the same way as pressing the remove key,
+        otherwise the call is only logged and their place in the queue is kept.
+        '''
+        studentId = self.searchedStudent()
+        if studentId is None:
+            return
+        student = SDM.StudentRoster[studentId]
+        if self.deck.callOn(studentId):
+            self.scheduleFlush()
+        showinfo(title="Called On", message=f"Logged a call of {student[0]} {student[1]}.")
+
+    def showSearchedHistory(self):
+        '''
+        Shows how many times the student selected in the search window has been called on and flagged, and their most recent calls.
+        '''
+        studentId = self.searchedStudent()
+        if studentId is None:
+            return
+        student = SDM.StudentRoster[studentId]
+        calls = fio.student_history(student[2])
+        flagged = sum(1 for call in calls if call[2])
+        recent = "\n".join(f"{date} {when}{' (flagged)' if isFlagged else ''}" for date, when, isFlagged in calls[-10:][::-1])
+        showinfo(title="History", message=f"{student[0]} {student[1]} ({student[2]})\nCalled {len(calls)} times, flagged {flagged} times.\n\n{recent}")
+
+    def toggleProfiler(self, event):
+        '''
+        This is the event handler for the key press combination of Control+p. The first press starts cProfile, and the next press stops it and writes the stats gathered so far this
+        session to a pstats file in ./data/metrics. Pressing it again resumes profiling into the same session file.
+        '''
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+
+        if self.profiling:
+            self.profiler.disable()
+            self.profiling = False
+            os.makedirs(os.path.dirname(self.profilePath), exist_ok=True)
+            self.profiler.dump_stats(self.profilePath)
+        else:
+            self.profiling = True
+            self.profiler.enable()
+
+    def onClose(self):
+        '''
+        Called when the window is closed. Stops the profiler if it is running, saves the running checksum of the log, and writes the latency histograms and the file I/O metrics to ./data/metrics before closing the window.
+        '''
+        if self.profiling:
+            self.toggleProfiler(None)
+        if any(histogram.total for histogram in self.latency.values()):
+            dump_histograms(self.latency.values())
+        if self.deck.queue is not None:
+            self.deck.close()
+        fio.flush_log_checksums()
+        fio.write_metrics()
+        self.destroy()
 
     def updateWindowLocation(self):
         # Move window centered horizontally and at the top of the window.
@@ -169,6 +412,64 @@ class MainWin(tk.Tk):
         posDown = 0  # puts the window at the top of the screen
         self.geometry("+{}+{}".format(posRight, posDown))
 
+    def newQueue(self, students):
+        '''
+        Builds the queue of students with the policy picked in the config file (see fio.selection_policy). The participation
+        weighting starts from the calls in the logs, so students called less in past classes keep coming on deck more often.
+        An unknown policy is reported and the uniform policy is used instead.
+        '''
+        name = fio.selection_policy()
+        if name == "participation":
+            policy = WeightedPolicy("participation", fio.call_counts())
+        elif name == "recency":
+            policy = WeightedPolicy("recency")
+        elif name == "cooldown":
+            # the cooldown line of the config file sets how many calls a called upon student stays off the deck
+            cooldown = fio.policy_cooldown()
+            policy = CooldownPolicy(cooldown if cooldown is not None else COOLDOWN)
+        else:
+            if name not in fio.SELECTION_POLICIES:
+                showinfo(
+                    title="Error!",
+                    message=f"Unknown policy '{name}' in the config file, it must be one of: {', '.join(fio.SELECTION_POLICIES)}. Using the uniform policy."
+                )
+            policy = UniformPolicy()
+        return StudentQueue(students, policy, deckSize=self.maxNumberStudents)
+
+    def refreshDeck(self):
+        '''
+        Shows the current on deck students of the queue in the deck spots. Only the spots whose student changed are redrawn.
+        '''
+        deckIds = self.deck.deckIds()
+        for spot, studentId, name in zip(self.spots, deckIds, self.deck.deckNames()):
+            spot.setStudent(studentId, name)
+            # The photo is only shown if it is already loaded, otherwise showPhoto adds it when it is
+            spot.setPhoto(self.thumbnails.get(SDM.StudentRoster[studentId][2]))
+
+        # With fewer students on the roster than spots on the deck the spots left over are emptied
+        for spot in self.spots[len(deckIds):]:
+            spot.setStudent(None, "")
+            spot.setPhoto(None)
+
+        # Start loading the photos of the students that come on deck next
+        nextIds = self.deck.queue.queue[self.maxNumberStudents:self.maxNumberStudents + PREFETCH]
+        self.thumbnails.prefetch(SDM.StudentRoster[studentId][2] for studentId in nextIds)
+
+    def showPhoto(self, uoid, photo):
+        '''
+        Called by the thumbnail cache when a photo has been loaded. Shows it in the spot of the student if they are still on deck.
+        '''
+        for spot in self.spots:
+            if spot.studentId is not None and SDM.StudentRoster[spot.studentId][2] == uoid:
+                spot.setPhoto(photo)
+
+    def resizeForPhotos(self):
+        '''
+        Makes the window tall enough to show the photos above the names if any photos have been imported.
+        '''
+        if has_thumbnails():
+            self.geometry(f"800x{self.spots[0].photoSize[1] + 10}")
+
     # Keyboard functions
     def right(self, event):
         '''
@@ -178,21 +479,7 @@ class MainWin(tk.Tk):
             otherwise this method will move the highlighting of a student one spot to the right of itself or not at all if the rightmost student is already highlighted
         '''
         #print("right key pressed")
-        if self.currentStudent is None:
-            self.currentStudent = self.fourthSpot
-            self.fourthSpot.configure(bg='white', fg='black')
-        elif self.currentStudent == self.firstSpot:
-            self.firstSpot.configure(bg='black', fg='white')
-            self.secondSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.secondSpot
-        elif self.currentStudent == self.secondSpot:
-            self.secondSpot.configure(bg='black', fg='white')
-            self.thirdSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.thirdSpot
-        elif self.currentStudent == self.thirdSpot:
-            self.thirdSpot.configure(bg='black', fg='white')
-            self.fourthSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.fourthSpot
+        self.moveHighlight(self.deck.right)
 
     def left(self, event):
         '''
@@ -202,31 +489,51 @@ class MainWin(tk.Tk):
             otherwise this method will move the highlighting of a student one spot to the left of itself or not at all if the leftmost student is already highlighted
         '''
         #print("left key pressed")
-        if self.currentStudent is None:
-            self.currentStudent = self.firstSpot
-            self.firstSpot.configure(bg='white', fg='black')
-        elif self.currentStudent == self.fourthSpot:
-            self.fourthSpot.configure(bg='black', fg='white')
-            self.thirdSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.thirdSpot
-        elif self.currentStudent == self.thirdSpot:
-            self.thirdSpot.configure(bg='black', fg='white')
-            self.secondSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.secondSpot
-        elif self.currentStudent == self.secondSpot:
-            self.secondSpot.configure(bg='black', fg='white')
-            self.firstSpot.configure(bg='white', fg='black')
-            self.currentStudent = self.firstSpot
+        self.moveHighlight(self.deck.left)
+
+    def moveHighlight(self, move):
+        # Moves the highlight with the deck controller and highlights the spot it moved to
+        if self.deck.queue is None:
+            return
+        previous = self.deck.highlighted
+        self.spots[move()].highlight()
+        if previous is not None and previous != self.deck.highlighted:
+            self.restyle(previous)
+
+    def restyle(self, index):
+        # Shows a spot as highlighted, selected for a group call, or neither
+        if index == self.deck.highlighted:
+            self.spots[index].highlight()
+        elif index in self.deck.selected:
+            self.spots[index].select()
+        else:
+            self.spots[index].unhighlight()
+
+    def clearHighlight(self):
+        # Unhighlights the spots that are highlighted or selected, for when the students in the spots are about to change
+        for index in self.deck.clearHighlight():
+            self.spots[index].unhighlight()
+
+    def select(self, event):
+        '''
+        This method is called when the user presses the select key (space by default). It adds the highlighted student to the group of students to call on
+        together, or takes them out of it if they are already in it. The next remove or flag key press calls on the whole group and the highlighted student at once.
+        '''
+        if self.deck.queue is None or self.deck.select() is None:
+            return
+        self.restyle(self.deck.highlighted)
 
     def createMenuBar(self):
         '''
         Creates the menu bar at the top of the desktop window for Mac computer or at the top of this window for Windows and Linux users.
 
         There is one menu on the bar:
-            An import menu with one option:
+            An import menu with two options:
                 The option is to import new student data (as in a new roster). This button will cause a file picker to open and prompt for a new data file. The user can either cancel or pick a new,
                 correctly formatted, student roster file. After picking the new file, assuming it is formatted correctly, the program asks if the user is sure they want to overwrite the currently
                 loaded student roster file. If the user says yes, then the program replaces the current data file with the new one and updates the data in all nessasary places.
+                The second option is to import a folder of student photos, named by UO ID or First_Last. They are made into thumbnails once and shown above the names on the deck.
+            The import menu also has a check box to watch the imported roster file, so edits to it are picked up while the program runs.
         '''
         # Add menu options Source: https://www.pythontutorial.net/tkinter/tkinter-menu/
         # create a menubar
@@ -242,6 +549,21 @@ class MainWin(tk.Tk):
             command=self.pick_new_database
         )
 
+        # add a menu item to import a folder of student photos
+        self.importMenu.add_command(
+            label="Import Student Photos",
+            command=self.pick_student_photos
+        )
+
+        # add a check box to turn watching the roster file for changes on and off
+        self.watchRoster = tk.BooleanVar(value=False)
+        self.rosterWatcher = None
+        self.importMenu.add_checkbutton(
+            label="Watch Roster File",
+            variable=self.watchRoster,
+            command=self.toggle_roster_watcher
+        )
+
         # add the File menu to the menubar
         self.menubar.add_cascade(
             label="Import",
@@ -251,70 +573,82 @@ class MainWin(tk.Tk):
     def remove(self, event):
         '''
         Event handler for the remove key which is the up arrow by default.
-        This method checks if there is a student highlighted. If so, it removes the student from all nessasary locations in the program and logs them to the nessasary log files. It then updates the
-        student queue and updates the gui so that it displays the new newtudent and moves the other three left to the left. Notably, this method does NOT flag the removed student in log files.
+        This method checks if there is a student highlighted or selected. If so, it queues the student (or the whole selected group along with the highlighted student) to be removed
+        from all nessasary locations in the program and logged to the nessasary log files as one group call. The queued calls are handled by flushCalls once tkinter is idle, which updates the student queue and the gui. Notably, this method does NOT flag the removed student in log files.
         '''
         #print("remove key pressed")
-        if self.currentStudent is not None:
-            self.currentStudent.configure(bg='black', fg='white')
-            student = self.currentStudent.cget('text')
-
-            # give the student name to the queue to be taken off
-            self.studentqueue.processOnDeckStudents(student)
-
-            # give the student name and flagged value, by first getting their id in Ethans code
-            studentList = student.split()
-            studentUid = SDM.GetStudentUid(studentList[0], studentList[1])
-            fio.log_cold_call(studentUid, flagged=False)
-
-            # call for the new first four names in the queue
-            studentlist = self.studentqueue.getOnDeckStudents()
-
-            # update the names of the gui "on deck" display
-            self.firstSpot.setName(studentlist[0])
-            self.secondSpot.setName(studentlist[1])
-            self.thirdSpot.setName(studentlist[2])
-            self.fourthSpot.setName(studentlist[3])
-
-            # Save the data state
-            fio.save_queue(self.studentqueue.sendQueue())
-
-        self.currentStudent = None
+        spots = self.deck.remove()
+        for index in spots:
+            self.spots[index].unhighlight()
+        if spots:
+            self.scheduleFlush()
 
     def flag(self, event):
         '''
-        Event handler for the remove key which is the up arrow by default.
-        This method checks if there is a student highlighted. If so, it removes the student from all nessasary locations in the program and logs them to the nessasary log files. It then updates the
-        student queue and updates the gui so that it displays the new newtudent and moves the other three left to the left. Notably, this method DOES flag the removed student in log files.
+        Event handler for the flag key which is the down arrow by default.
+        This method checks if there is a student highlighted or selected. If so, it queues the student (or the whole selected group along with the highlighted student) to be removed
+        from all nessasary locations in the program and logged to the nessasary log files as one group call. The queued calls are handled by flushCalls once tkinter is idle, which updates the student queue and the gui. Notably, this method DOES flag the removed student in log files.
         '''
         #print("flag key pressed")
-        if self.currentStudent is not None:
-            self.currentStudent.configure(bg='black', fg='white')
-            self.currentStudent.configure(bg='black', fg='white')
-            student = self.currentStudent.cget('text')
+        spots = self.deck.flag()
+        for index in spots:
+            self.spots[index].unhighlight()
+        if spots:
+            self.scheduleFlush()
 
-            # give the student name to the queue to be taken off
-            self.studentqueue.processOnDeckStudents(student)
+    def scheduleFlush(self):
+        '''
+        Makes sure flushCalls runs once tkinter has handled every key event that is currently waiting. Calling this many times before then only schedules one flush.
+        '''
+        if self.flushScheduled is None:
+            self.flushScheduled = self.after_idle(self.flushCalls)
 
-            # give the student name and flagged value, by first getting their id in Ethans code
-            studentList = student.split()
-            uid = SDM.GetStudentUid(studentList[0], studentList[1])
-            fio.log_cold_call(uid, flagged=True)
+    def flushCalls(self):
+        '''
+        Handles every remove and flag that was queued since the last flush. Each student is taken off the deck and logged, then the queue is saved and the deck redrawn once for the
+        whole burst. A student that is no longer on deck by the time their call is handled (for example a repeat of a key press that was already handled) is skipped.
+        '''
+        self.flushScheduled = None
+
+        # the deck controller updates the queue, logs the calls and saves the queue
+        pressed = self.deck.flush()
 
-            # call for the new first four names in the queue
-            studentlist = self.studentqueue.getOnDeckStudents()
+        if pressed:
+            end = time.perf_counter_ns()
 
-            # update the names of the gui "on deck" display
-            self.firstSpot.setName(studentlist[0])
-            self.secondSpot.setName(studentlist[1])
-            self.thirdSpot.setName(studentlist[2])
-            self.fourthSpot.setName(studentlist[3])
+            # update the names of the gui "on deck" display, and have tkinter draw them now so the paint is timed as well
+            self.refreshDeck()
+            self.update_idletasks()
+            painted = time.perf_counter_ns()
+            self.latency["repaint"].recordSince(end, painted)
+            for pressTime in pressed:
+                self.latency["key to paint"].recordSince(pressTime, painted)
 
-            # Save the data state
-            fio.save_queue(self.studentqueue.sendQueue())
+    def undo(self, event):
+        '''
+        This is the event handler for the key press combination of Control+z. It takes back the most recent call: the students it moved are moved back to where they
+        were, and a record taking back the call is added to the log (the original line is left in the log, and exports leave both out).
+        '''
+        # Calls that are still waiting to be handled have to be handled first, so the right call is taken back
+        self.cancelFlush()
+        self.clearHighlight()
+        if self.deck.undo():
+            self.refreshDeck()
 
-        self.currentStudent = None
+    def redo(self, event):
+        '''
+        This is the event handler for the key press combination of Control+y. It makes the most recently undone call again, moving the same students to the same places
+        and logging the call again.
+        '''
+        self.clearHighlight()
+        if self.deck.redo():
+            self.refreshDeck()
 
+    def cancelFlush(self):
+        # Cancels the scheduled flush, for when the deck controller is about to handle the waiting calls itself
+        if self.flushScheduled is not None:
+            self.after_cancel(self.flushScheduled)
+            self.flushScheduled = None
 
     def select_file(self):
         # Source: https://www.pythontutorial.net/tkinter/tkinter-open-file-dialog/
@@ -324,6 +658,61 @@ class MainWin(tk.Tk):
         )
         return filename
 
+    def importStudentData(self, path, over_write=False):
+        '''
+        Imports a roster file with fio.import_student_data on a worker thread, so the window keeps responding while a large file is read and saved. A small window shows
+        the progress of the import with a button to cancel it. This waits (while tkinter keeps handling events) until the import is done and returns its error code.
+        '''
+        # The import can't touch tkinter, so it puts its progress and its result on a queue that pollImport reads
+        self.importUpdates = queue.Queue()
+        self.importResult = tk.IntVar(self, -1)
+        cancelled = threading.Event()
+
+        self.importWindow = tk.Toplevel(self)
+        self.importWindow.title("Importing")
+        self.importWindow.attributes('-topmost', True)
+        self.importProgress = ttk.Progressbar(self.importWindow, length=300, maximum=100)
+        self.importProgress.grid(row=0, column=0, padx=10, pady=10)
+        tk.Button(self.importWindow, text="Cancel", command=cancelled.set).grid(row=1, column=0, pady=(0, 10))
+        self.importWindow.protocol("WM_DELETE_WINDOW", cancelled.set)
+        # Keep the other keys and menus from changing the queue while it is being replaced
+        self.importWindow.grab_set()
+
+        threading.Thread(target=self.runImport, args=(path, over_write, cancelled), daemon=True).start()
+        self.after(50, self.pollImport)
+        self.wait_variable(self.importResult)
+
+        self.importWindow.destroy()
+        self.importWindow = None
+        return self.importResult.get()
+
+    def runImport(self, path, over_write, cancelled):
+        '''
+        Runs on the import thread. Imports the roster and puts its progress and its error code on self.importUpdates. The roster is loaded into the StudentDataManager
+        afterwards on the tkinter thread, since the search index listens to it.
+        '''
+        try:
+            error = fio.import_student_data(path=str(path), over_write=over_write, cancelled=cancelled, load_roster=False,
+                                            progress=lambda done, total: self.importUpdates.put(("progress", 100 * done / max(total, 1))))
+        except Exception:
+            # A file that can't be read (or an import that fails in any other way) is reported the same as one in the wrong format, the current
+            # student data is left as it was. The error code has to be sent whatever happened, since the window waits for it
+            error = 2
+        self.importUpdates.put(("done", error))
+
+    def pollImport(self):
+        '''
+        Called on the tkinter thread every 50 ms while a roster is imported. Updates the progress bar and hands back the error code once the import is done.
+        '''
+        while not self.importUpdates.empty():
+            kind, value = self.importUpdates.get()
+            if kind == "progress":
+                self.importProgress["value"] = value
+            else:
+                self.importResult.set(value)
+                return
+        self.after(50, self.pollImport)
+
     # More Files Input: JD and Sam
     # Runs the first time the program starts
     def init_database(self):
@@ -333,14 +722,14 @@ class MainWin(tk.Tk):
         '''
         selectedFilePath = self.select_file()
         #print(f"The selected file path for the database is {selectedFilePath}")
-        error = fio.import_student_data(path=str(selectedFilePath))
+        error = self.importStudentData(selectedFilePath) if selectedFilePath else 3
         
         while error != 0:
             # if file already exists
             # this should never happen becasue init won't get called if there is a database loaded already
 
-            if error == 3:
-                # if the user hits cancel
+            if error == 3 or error == 4:
+                # if the user hits cancel, in the file picker or while the file is imported
                 showinfo(
                     title="Error!",
                     message="You must pick a file. Format is: tab deliminated text file where hte order of data is First name, last name, 961 number, emial, perfered name"
@@ -357,11 +746,11 @@ class MainWin(tk.Tk):
                     message="File is not in the correct format! It must be in a tab/comma deliminated text file where the order of data is First name, last name, 951 number, email, perfered name"
                 )
             selectedFilePath = self.select_file()
-            error = fio.import_student_data(path=str(selectedFilePath))
+            error = self.importStudentData(selectedFilePath) if selectedFilePath else 3
 
         SDM.LoadRoster(fio.load_queue())
-        self.studentqueue = StudentQueue(fio.load_queue())
-        self.studentqueue.studentOrdering()
+        self.deck.setQueue(self.newQueue(fio.load_queue()))
+        self.deck.queue.studentOrdering()
         self.PathToStudentData = selectedFilePath
 
     def pick_new_database(self):
@@ -376,14 +765,14 @@ class MainWin(tk.Tk):
         selectedFilePath = self.select_file()
 
         #print(f"The selected file path for the updated database is {selectedFilePath}")
-        error = fio.import_student_data(path=str(selectedFilePath), over_write=True)
         if selectedFilePath == "":
             # then the user hit cancel
             return
+        error = self.importStudentData(selectedFilePath, over_write=True)
 
         while error != 0:
-            if selectedFilePath == "":
-                # then the user hit cancel
+            if selectedFilePath == "" or error == 4:
+                # then the user hit cancel, the current student data was left as it was
                 return
 
             # if file already exists
@@ -397,23 +786,78 @@ class MainWin(tk.Tk):
                 rorc = tk.messagebox.askretrycancel("Wrong Format",
                                                     "The data is not formatted correctly. Do you want to retry?")
                 if rorc is False:
-                    fio.import_student_data(path=self.PathToStudentData)
+                    # A failed import leaves the current student data as it was, so only the photos are imported again
                     fio.save_images(path=self.PathToStudentImages)
                     return
             selectedFilePath = self.select_file()
-            error = fio.import_student_data(path=str(selectedFilePath), over_write=True)
+            error = self.importStudentData(selectedFilePath, over_write=True) if selectedFilePath else 3
 
         # Save the new path values
         SDM.LoadRoster(fio.load_new_queue())
-        self.studentqueue = StudentQueue(fio.load_new_queue())
-        self.studentqueue.studentOrdering()
+        self.cancelFlush()
+        self.clearHighlight()
+        # the deck controller drops the calls waiting to be handled and the undo history of the old queue
+        self.deck.setQueue(self.newQueue(fio.load_new_queue()))
+        self.deck.queue.studentOrdering()
         self.PathToStudentData = selectedFilePath
 
+        # watch the new roster file instead of the old one
+        if self.watchRoster.get():
+            self.toggle_roster_watcher()
+
         # reset the GUI "deck"
-        studentlist = self.studentqueue.getOnDeckStudents()
+        self.refreshDeck()
 
-        self.firstSpot.setName(studentlist[0])
-        self.secondSpot.setName(studentlist[1])
-        self.thirdSpot.setName(studentlist[2])
-        self.fourthSpot.setName(studentlist[3])
- 
+    def pick_student_photos(self):
+        '''
+        This method is called by the createMenuBar() method when the option to import student photos is selected by the user. It opens a folder picker, and every photo in the picked
+        folder whose file name is the UO ID or the first and last name (First_Last) of a student on the roster is made into a thumbnail to show on the deck.
+        '''
+        selectedPath = fd.askdirectory(title='Open the folder of student photos', initialdir='~')
+        if not selectedPath:
+            # then the user hit cancel
+            return
+
+        saved = fio.save_images(path=selectedPath)
+        self.PathToStudentImages = selectedPath
+        showinfo(title="Photos", message=f"Imported {saved} student photos.")
+
+        # Show the new photos
+        self.thumbnails.clear()
+        for spot in self.spots:
+            spot.setPhoto(None)
+        self.resizeForPhotos()
+        if self.deck.queue is not None:
+            self.refreshDeck()
+
+    def toggle_roster_watcher(self):
+        '''
+        This method is called by the createMenuBar() method when the watch roster file check box is clicked. While it is checked the roster file that was imported last is checked
+        for changes every couple of seconds, and any students added, removed or changed in it are updated in the program without importing the file again.
+        '''
+        if self.rosterWatcher is not None:
+            self.rosterWatcher.stop()
+            self.rosterWatcher = None
+
+        if not self.watchRoster.get():
+            return
+
+        path = self.PathToStudentData or fio.roster_source()
+        if not path or not os.path.exists(path) or self.deck.queue is None:
+            self.watchRoster.set(False)
+            showinfo(title="Error!", message="The imported roster file could not be found. Import the student data again to watch it.")
+            return
+
+        self.rosterWatcher = RosterWatcher(self, path, self.apply_roster_change)
+        self.rosterWatcher.start()
+
+    def apply_roster_change(self, diff, roster):
+        '''
+        Called by the roster watcher when the watched roster file changed. Updates the roster and the queue with only the students that changed, saves them, and
+        redraws the deck.
+        '''
+        # The deck controller handles the calls still waiting first, since they are for the old roster, and forgets the undo moves made on the old queue
+        self.cancelFlush()
+        self.clearHighlight()
+        self.deck.applyRosterChange(diff, roster)
+        self.refreshDeck()
@@ -0,0 +1,120 @@
+"""imageCache.py - Python file that holds the cache of student photo thumbnails shown on the deck. The
+thumbnails are read on a background thread ahead of time, so showing a student never waits on the disk.
+"""
+
+import base64
+import collections
+import os
+import queue
+import threading
+import tkinter as tk
+import fileIO as fio
+
+CAPACITY = 32
+#the number of PhotoImages kept in the cache, enough for the deck and the students prefetched behind it
+
+POLL_MS = 30
+#how often, in milliseconds, the tkinter thread checks for thumbnails the loader thread has read
+
+
+class ThumbnailCache:
+    """The ThumbnailCache holds the PhotoImage of recently shown students indexed by UO ID. PhotoImages
+    can only be made on the tkinter thread, so the loader thread only reads the thumbnail files and the
+    tkinter thread turns them into PhotoImages when it polls."""
+
+    def __init__(self, master, capacity=CAPACITY, onLoad=None):
+        self.master = master
+        #the tkinter window the PhotoImages belong to
+
+        self.capacity = capacity
+        self.images = collections.OrderedDict()
+        #the loaded PhotoImages indexed by UO ID, the least recently used first
+
+        self.missing = set()
+        #UO IDs that have no thumbnail, so their file isn't looked for again
+
+        self.onLoad = onLoad
+        #called with (UO ID, PhotoImage) on the tkinter thread when a requested thumbnail has been loaded
+
+        self.requested = set()
+        self.requests = queue.Queue()
+        self.loaded = queue.Queue()
+        #UO IDs waiting to be read by the loader thread, and the (UO ID, data) it has read
+
+        self.polling = None
+        threading.Thread(target=self.loadThumbnails, daemon=True).start()
+
+    def get(self, uoid):
+        """Returns the PhotoImage of a student, or None if it isn't loaded yet (or the student has no
+        photo). A student that isn't loaded is queued to be loaded, and onLoad is called once it is."""
+        image = self.images.get(uoid, None)
+        if image is not None:
+            self.images.move_to_end(uoid)
+            return image
+        self.request(uoid)
+        return None
+
+    def prefetch(self, uoids):
+        """Queues the thumbnails of students that will be shown soon to be loaded in the background."""
+        for uoid in uoids:
+            if uoid in self.images:
+                self.images.move_to_end(uoid)
+                #mark the students about to come on deck as recently used so they aren't evicted before they are shown
+            else:
+                self.request(uoid)
+
+    def request(self, uoid):
+        if uoid in self.requested or uoid in self.missing:
+            return
+        self.requested.add(uoid)
+        self.requests.put(uoid)
+        if self.polling is None:
+            self.polling = self.master.after(POLL_MS, self.install)
+
+    def clear(self):
+        """Forgets every loaded thumbnail, for example after new photos were imported."""
+        self.images.clear()
+        self.missing.clear()
+
+    def loadThumbnails(self):
+        """Runs on the loader thread. Reads the thumbnail file of every requested student."""
+        while True:
+            uoid = self.requests.get()
+            path = fio.thumbnail_path(uoid)
+            try:
+                with open(path, "rb") as f:
+                    data = base64.b64encode(f.read())
+            except OSError:
+                data = None
+            self.loaded.put((uoid, data))
+
+    def install(self):
+        """Called on the tkinter thread while thumbnails are being loaded. Makes the PhotoImage of every
+        thumbnail the loader thread has read and adds it to the cache."""
+        self.polling = None
+        while not self.loaded.empty():
+            uoid, data = self.loaded.get()
+            self.requested.discard(uoid)
+            if data is None:
+                self.missing.add(uoid)
+                continue
+            try:
+                image = tk.PhotoImage(master=self.master, data=data)
+            except tk.TclError:
+                self.missing.add(uoid)
+                continue
+
+            self.images[uoid] = image
+            self.images.move_to_end(uoid)
+            while len(self.images) > self.capacity:
+                self.images.popitem(last=False)
+            if self.onLoad is not None:
+                self.onLoad(uoid, image)
+
+        if self.requested:
+            self.polling = self.master.after(POLL_MS, self.install)
+
+
+def has_thumbnails() -> bool:
+    """Returns whether any student photos have been imported."""
+    return os.path.isdir(fio.THUMBNAIL_DIR) and any(name.endswith(".png") for name in os.listdir(fio.THUMBNAIL_DIR))
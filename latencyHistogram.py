@@ -0,0 +1,113 @@
+"""latencyHistogram.py - Python file that holds a small log-linear histogram used to record how long
+the phases of a cold call take, from the key press to the updated deck being painted.
+"""
+
+import datetime
+import os
+
+SIGNIFICANT_BITS = 7
+#the number of bits kept for every value, 7 bits keeps each value to within 1/64 (about 1.5%)
+
+
+class LatencyHistogram:
+    """The LatencyHistogram counts recorded values in buckets. Values below 2^SIGNIFICANT_BITS
+    get a bucket each, and every doubling above that is split into 2^(SIGNIFICANT_BITS-1) buckets
+    of equal width, so the relative error of a bucket is the same at every scale."""
+
+    def __init__(self, name):
+        self.name = name
+        #the name of the phase being recorded, used when the histogram is dumped
+
+        self.counts = {}
+        #the number of values in each bucket, indexed by bucket index. Only used buckets are stored
+
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        #running totals so the summary doesn't need to walk the buckets
+
+    def bucketIndex(self, value):
+        """Returns the index of the bucket that holds value."""
+        shift = value.bit_length() - SIGNIFICANT_BITS
+        if shift <= 0:
+            return value
+        return shift * (1 << (SIGNIFICANT_BITS - 1)) + (value >> shift)
+
+    def bucketValue(self, index):
+        """Returns the highest value that falls in the bucket with the given index."""
+        half = 1 << (SIGNIFICANT_BITS - 1)
+        if index < 2 * half:
+            return index
+        shift = index // half - 1
+        top = index - shift * half
+        return ((top + 1) << shift) - 1
+
+    def record(self, micros):
+        """Records one value, in microseconds."""
+        micros = max(0, int(micros))
+        index = self.bucketIndex(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += micros
+        if self.min is None or micros < self.min:
+            self.min = micros
+        if self.max is None or micros > self.max:
+            self.max = micros
+
+    def recordSince(self, startNs, endNs):
+        """Records the time between two time.perf_counter_ns() readings."""
+        self.record((endNs - startNs) // 1000)
+
+    def valueAtPercentile(self, percentile):
+        """Returns the value below which the given percentage of recorded values fall."""
+        if self.total == 0:
+            return 0
+        target = max(1, round(self.total * percentile / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self.bucketValue(index), self.max)
+        return self.max
+
+    def summary(self):
+        """Returns a one line summary of the histogram."""
+        if self.total == 0:
+            return f"{self.name}: no samples"
+        return (f"{self.name}: count={self.total} min={self.min}us mean={self.sum // self.total}us "
+                f"p50={self.valueAtPercentile(50)}us p90={self.valueAtPercentile(90)}us "
+                f"p99={self.valueAtPercentile(99)}us p99.9={self.valueAtPercentile(99.9)}us max={self.max}us")
+
+    def write(self, f):
+        """Writes the summary and the percentile distribution of the histogram to an open file."""
+        f.write(self.summary() + "\n")
+        if self.total == 0:
+            return
+        f.write("Value(us)\tPercentile\tTotalCount\n")
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            f.write(f"{min(self.bucketValue(index), self.max)}\t{100 * seen / self.total:.3f}\t{seen}\n")
+
+
+def dump_histograms(histograms, directory="./data/metrics") -> str:
+    """
+    Writes every histogram to one text file named after the current time in directory.
+
+    Parameters:
+
+    histograms: Iterable[LatencyHistogram] -> The histograms to write
+    directory: str -> The folder to write the file to, it is created if needed
+
+    Return: str
+        The path of the written file
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"latency_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    with open(path, "w") as f:
+        for histogram in histograms:
+            histogram.write(f)
+            f.write("\n")
+    return path
@@ -0,0 +1,100 @@
+"""loadGenerator.py - Python file that benchmarks the deck without a display by sending random key
+events to a DeckController, with persistence off and then on.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from deckController import DeckController
+from latencyHistogram import LatencyHistogram
+from studentDataManager import StudentDataManager as SDM
+from StudentQueue import StudentQueue
+from stressTest import makeRoster
+
+EVENTS = 1000000
+#the number of key events sent by default, in each of the two runs
+
+STUDENTS = 100
+#the number of students on the generated roster by default
+
+WEIGHTS = {"right": 400, "left": 300, "select": 60, "remove": 180, "flag": 40, "undo": 25, "redo": 15}
+#how often each key is pressed, out of the total
+
+BURST = 8
+#the largest number of key events sent before the controller is flushed, like tkinter handling a burst of key events before it is idle
+
+
+def run(events=EVENTS, students=STUDENTS, seed=0, persist=False):
+    """Sends events random key events to a DeckController in a temporary folder and returns the
+    LatencyHistograms of every kind of key event, of the flushes, and of the phases timed by the controller."""
+
+    rng = random.Random(seed)
+    #picks the keys, kept apart from the generator the queue uses
+
+    keys = list(WEIGHTS)
+    weights = list(WEIGHTS.values())
+    histograms = {key: LatencyHistogram(key) for key in keys + ["flush"]}
+
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        os.makedirs("./data/logs")
+        try:
+            random.seed(seed)
+            roster = makeRoster(students, rng)
+            SDM.LoadRoster(roster)
+            deck = DeckController(StudentQueue(roster), persist=persist)
+            deck.save()
+
+            actions = {"right": deck.right, "left": deck.left, "select": deck.select, "remove": deck.remove, "flag": deck.flag,
+                       "undo": deck.undo, "redo": deck.redo}
+            clock = time.perf_counter_ns
+            burst = rng.randint(1, BURST)
+            for key in rng.choices(keys, weights, k=events):
+                start = clock()
+                actions[key]()
+                histograms[key].recordSince(start, clock())
+
+                burst -= 1
+                if burst == 0:
+                    start = clock()
+                    deck.flush()
+                    histograms["flush"].recordSince(start, clock())
+                    burst = rng.randint(1, BURST)
+            # the log and its checksum have to be on disk before the folder is deleted
+            deck.close()
+        finally:
+            os.chdir(directory)
+
+    histograms.update(deck.latency)
+    return histograms
+
+
+def formatReport(histograms):
+    """Returns the summary line of every histogram that recorded anything."""
+    return "\n".join(histogram.summary() for histogram in histograms.values() if histogram.total)
+
+
+def Main(argv=None):
+    """Usage: python loadGenerator.py [events] [students] [seed]
+
+    Runs the benchmark with persistence off and then on (in a temporary folder), so the report shows what
+    the disk costs."""
+
+    argv = sys.argv[1:] if argv is None else argv
+    events = int(argv[0]) if len(argv) > 0 else EVENTS
+    students = int(argv[1]) if len(argv) > 1 else STUDENTS
+    seed = int(argv[2]) if len(argv) > 2 else 0
+    for persist in (False, True):
+        start = time.perf_counter()
+        histograms = run(events, students, seed, persist)
+        print(f"{events} key events, persistence {'on' if persist else 'off'} ({time.perf_counter() - start:.1f}s)")
+        print(formatReport(histograms))
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -7,7 +7,9 @@ Description:
     in the command: "python3 main.py" it starts the sequence of code that sets up the entire program.
 '''
 
+import os
 import tkinter as tk
+import fileIO as fio
 from gui import MainWin
 
 class Main():
@@ -33,6 +35,11 @@ class Main():
         used by tkinter. That sets off the chain of events that gets the software to run
         correctly.
         '''
+        # If asked for, serve the file I/O metrics on a localhost port while the program runs
+        # ex. COLD_CALL_METRICS_PORT=9464 python3 main.py
+        if os.environ.get("COLD_CALL_METRICS_PORT"):
+            fio.serve_metrics(int(os.environ["COLD_CALL_METRICS_PORT"]))
+
         self.rootWindow = MainWin(4)  # 4 is the maximum number of students in the window
 
         # Run the window mainloop so it shows up on screen
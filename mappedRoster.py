@@ -0,0 +1,209 @@
+"""mappedRoster.py - Python file that holds the out of core queue mode, for simulation runs over rosters far
+bigger than one class. The roster file stays memory mapped on disk and the queue is an array of the
+students' line numbers in it, so with the UniformPolicy or the CooldownPolicy each student costs 12
+bytes. The WeightedPolicy keeps Python objects for every student, so it can't be used here.
+"""
+
+import array
+import mmap
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from StudentQueue import StudentQueue, UniformPolicy, WeightedPolicy, ON_DECK, N
+
+SIZES = (1000, 10000, 100000)
+#the roster sizes compared by default
+
+CALLS = 10000
+#the number of calls made on each queue when comparing
+
+
+class MappedRoster:
+    """The MappedRoster reads student entries (first name, last name, UO ID, email, phonetic spelling,
+    reveal code) straight out of a memory mapped roster file in the format of ./data/students. Indexing
+    it with a student's position (their line number, counting from zero and skipping blank lines) returns
+    their entry, like indexing the StudentDataManager roster with a student id."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+        #an empty file can't be mapped, and has no students to read anyway
+
+        self.offsets = array.array("q")
+        #the byte offset of every student's line in the file, indexed by position
+        start, size = 0, len(self.map)
+        while start < size:
+            end = self.map.find(b"\n", start)
+            if end == -1:
+                end = size
+            if self.map[start:end].strip():
+                self.offsets.append(start)
+            start = end + 1
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, position):
+        start = self.offsets[position]
+        end = self.map.find(b"\n", start)
+        line = self.map[start:end if end != -1 else len(self.map)].decode()
+        student = [value.strip() for value in line.split(fio.DELIMITER)]
+        if len(student) == 4:
+            student.append(student[0])
+            #the phonetic spelling defaults to the first name, as when the roster is imported
+        student += [""] * (6 - len(student))
+        return tuple(student[0:6])
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+class MappedStudentQueue(StudentQueue):
+    """The MappedStudentQueue is a StudentQueue over a MappedRoster. The queue is an array of the positions
+    of the students in the roster file, so a called upon student is moved the same way (by the same
+    selection policy, drawing the same random numbers) as in the normal queue, and only the entries of the
+    on deck students are held in memory."""
+
+    def __init__(self, roster, policy=None, deckSize=ON_DECK, order=None):
+
+        """roster is a MappedRoster. order is the positions of the students in queue order, the order of the
+        roster file if None. Only the UniformPolicy and the CooldownPolicy can be used, the WeightedPolicy
+        keeps Python objects for every student, which this mode is meant to avoid."""
+
+        if isinstance(policy, WeightedPolicy):
+            raise ValueError("The mapped queue only works with the uniform and cooldown policies.")
+
+        self.roster = roster
+        #the mapped roster the positions in the queue point into
+
+        self.queue = array.array("i", range(len(roster)) if order is None else order)
+        #the positions of the students in queue order, four bytes each
+
+        self.deckSize = deckSize
+        self.window = {}
+        #the entries of the on deck students indexed by position, read from the roster when they come on deck
+
+        self.policy = policy if policy is not None else UniformPolicy()
+        self.policy.attach(self.queue, self.deckSize)
+
+    def student(self, position):
+        """Returns the entry of a student, from the materialised deck if they are on it."""
+        entry = self.window.get(position, None)
+        return entry if entry is not None else self.roster[position]
+
+    def getOnDeckStudents(self):
+        """Returns the names of the on deck students. Only students that just came on deck are read from the
+        roster file, and students that left the deck are dropped from memory."""
+        deck = self.getOnDeckIds()
+        if set(deck) != self.window.keys():
+            self.window = {position: self.student(position) for position in deck}
+        return [f"{self.window[position][0]} {self.window[position][1]}" for position in deck]
+
+    def sendQueue(self):
+        """Returns the entries of every student in queue order, read from the roster one at a time as they
+        are iterated over, so the queue can be saved with fileIO.save_queue without holding the whole roster."""
+        self.policy.settle(self.queue)
+        return (self.roster[position] for position in self.queue)
+
+    def addStudents(self, positions):
+        """Adds students that were appended to the roster file (by position) at random locations in the back
+        70% of the queue, the same as StudentQueue.addStudents."""
+        self.policy.settle(self.queue)
+        queue = list(self.queue)
+        for position in positions:
+            startLocation = max(round(N/100 * len(queue)), min(self.deckSize, len(queue)))
+            queue.insert(random.randint(startLocation, len(queue)), position)
+        self.queue = array.array("i", queue)
+        self.policy.attach(self.queue, self.deckSize)
+
+    def removeStudents(self, positions):
+        """Takes students out of the queue (by position), the same as StudentQueue.removeStudents."""
+        leaving = set(positions)
+        self.policy.settle(self.queue)
+        self.queue = array.array("i", (position for position in self.queue if position not in leaving))
+        self.policy.attach(self.queue, self.deckSize)
+
+    def studentOrdering(self):
+        for position in self.queue:
+            print(self.roster[position])
+
+    def savePositions(self, path):
+        """Saves the order of the queue as the raw array of positions, four bytes per student."""
+        self.policy.settle(self.queue)
+        with open(path, "wb") as f:
+            self.queue.tofile(f)
+
+    @classmethod
+    def loadPositions(cls, roster, path, policy=None, deckSize=ON_DECK):
+        """Returns a queue in the order saved with savePositions."""
+        order = array.array("i")
+        with open(path, "rb") as f:
+            order.frombytes(f.read())
+        return cls(roster, policy, deckSize, order)
+
+
+def writeRoster(path, students, seed=0):
+    """Writes a generated roster of students to path in the format of ./data/students."""
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for i in range(students):
+            fname = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6)).capitalize()
+            f.write(fio.DELIMITER.join((fname, f"Student{i}", str(951000000 + i), f"{fname.lower()}{i}@uoregon.edu", fname, "")) + "\n")
+
+
+def measure(makeQueue, calls=CALLS):
+    """Builds a queue with makeQueue and calls on calls on deck students, returning the memory in use after
+    (and the peak while) doing it, in bytes."""
+    tracemalloc.start()
+    queue = makeQueue()
+    for _ in range(calls):
+        queue.getOnDeckStudents()
+        queue.processOnDeckStudents(queue.getOnDeckIds()[random.randrange(queue.deckSize)])
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def Main(argv=None):
+    """Usage: python mappedRoster.py [students ...]
+
+    Compares the memory of the in memory and mapped queues on generated rosters of each size."""
+
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(arg) for arg in argv] or SIZES
+    print(f"{'students':>10} {'in memory':>12} {'mapped':>12} {'mapped peak':>12}")
+    with tempfile.TemporaryDirectory() as folder:
+        for students in sizes:
+            path = os.path.join(folder, f"roster_{students}")
+            writeRoster(path, students)
+
+            random.seed(0)
+            def makeInMemory():
+                # read the same way fileIO.load_queue reads ./data/students
+                with open(path) as f:
+                    return StudentQueue([[value.strip() for value in line.split(fio.DELIMITER)] for line in f])
+            inMemory, _ = measure(makeInMemory)
+            SDM.LoadRoster([])
+
+            random.seed(0)
+            roster = None
+            def makeMapped():
+                nonlocal roster
+                roster = MappedRoster(path)
+                return MappedStudentQueue(roster)
+            mapped, mappedPeak = measure(makeMapped)
+            roster.close()
+
+            print(f"{students:>10} {inMemory / 2**20:>10.1f}MB {mapped / 2**20:>10.1f}MB {mappedPeak / 2**20:>10.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -0,0 +1,7 @@
+"""
+reference - Frozen copies of StudentQueue.py and fileIO.py as they were before any of the
+performance work, kept unchanged as the reference behaviour for stressTest.py.
+
+Do not edit these files. Any optimised queue or file path has to keep doing exactly what
+they do, and stressTest.py checks it against them.
+"""
@@ -0,0 +1,91 @@
+"""rosterWatcher.py - Python file that watches the roster file the student data was imported from, and
+applies any edits made to it to the running program, so the instructor doesn't have to import it again.
+"""
+
+import os
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+POLL_MS = 2000
+#how often, in milliseconds, the roster file is checked for changes
+
+
+def apply_roster_diff(studentQueue, diff):
+    """Applies the changes returned by StudentDataManager.GetRosterDiff to the roster and to the
+    queue. Returns the number of students that were added, removed or changed."""
+
+    added, removed = [], []
+    for name, delta, data in diff:
+        if delta == SDM.DeltaCreate:
+            added.append(SDM.AddStudent(tuple(data)))
+
+        elif delta == SDM.DeltaRemove:
+            studentId = SDM.GetStudentId(tuple(data))
+            SDM.RemoveStudent(studentId)
+            removed.append(studentId)
+
+        elif delta == SDM.DeltaChange:
+            SDM.AddStudent(tuple(new for new, old in data))
+            #the changes are found by UO ID, so the student keeps their id and their entry is updated in place
+
+    if removed:
+        studentQueue.removeStudents(removed)
+    if added:
+        studentQueue.addStudents(added)
+    return len(diff)
+
+
+class RosterWatcher:
+    """The RosterWatcher checks a roster file for changes every POLL_MS milliseconds while it is
+    started, and calls onChange with the changes (from GetRosterDiff) and the new roster when there
+    are any. It never touches the roster itself, that is left to onChange."""
+
+    def __init__(self, master, path, onChange, interval=POLL_MS):
+        self.master = master
+        #the tkinter window whose timer the watcher runs on
+
+        self.path = path
+        self.onChange = onChange
+        self.interval = interval
+
+        self.lastStat = None
+        #the (modification time, size, inode) of the file the last time it was looked at. It starts empty so
+        #the first poll reads the file, and edits made to it after it was imported but before the watcher
+        #started are picked up (an unchanged file makes no changes)
+
+        self.timer = None
+
+    def statKey(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def start(self):
+        if self.timer is None:
+            self.timer = self.master.after(self.interval, self.poll)
+
+    def stop(self):
+        if self.timer is not None:
+            self.master.after_cancel(self.timer)
+            self.timer = None
+
+    def poll(self):
+        """Called on the tkinter timer. Reads the roster file if it changed since the last poll."""
+        self.timer = self.master.after(self.interval, self.poll)
+
+        key = self.statKey()
+        if key is None or key == self.lastStat:
+            return
+        self.lastStat = key
+
+        try:
+            roster = {student[2]: student for student in fio.iter_roster_file(self.path)}
+        except (OSError, ValueError):
+            return
+            #the file is missing or still being saved, it is read again when it changes
+
+        diff = SDM.GetRosterDiff(roster)
+        if diff:
+            self.onChange(diff, list(roster.values()))
@@ -0,0 +1,164 @@
+"""stressTest.py - Python file that runs a differential stress test of the student queue and the queue
+save/load code against the frozen reference copies in reference/, checking the state of both is
+identical after every step.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from studentDataManager import StudentDataManager as SDM
+from StudentQueue import StudentQueue
+import fileIO as fio
+from reference.StudentQueue import StudentQueue as ReferenceQueue
+import reference.fileIO as referenceIO
+
+OPERATIONS = 1000000
+#the number of operations run by default
+
+STUDENTS = 100
+#the number of students on the generated roster by default
+
+WEIGHTS = {"process": 850, "onDeck": 140, "randomize": 9, "saveLoad": 1}
+#how often each operation is picked, out of the total
+
+
+class StressTestFailure(AssertionError):
+    """Raised when the current code ends up in a different state than the reference."""
+
+
+def makeRoster(students, rng):
+    """Returns a roster of students with unique names (the reference queue finds students by name)
+    and unique UO IDs, in the format the program loads them in."""
+    roster = []
+    for i in range(students):
+        fname = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6)).capitalize()
+        roster.append([fname, f"Student{i}", str(951000000 + i), f"{fname.lower()}{i}@uoregon.edu", fname, ""])
+    return roster
+
+
+def run(operations=OPERATIONS, students=STUDENTS, seed=0, report=print):
+    """Runs the stress test in a temporary folder (so the saved queue of the real program is never touched)
+    and returns the number of operations and the reference and current time spent on each kind of operation.
+    Raises StressTestFailure at the first step where the two implementations differ."""
+
+    rng = random.Random(seed)
+    #picks the operations, kept apart from the generator the queues use
+
+    roster = makeRoster(students, rng)
+    kinds = list(WEIGHTS)
+    weights = list(WEIGHTS.values())
+    stats = {kind: [0, 0, 0] for kind in kinds}
+    #the number of operations and the reference and current nanoseconds spent on each kind of operation
+
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        os.makedirs("./data/logs")
+        try:
+            random.seed(seed)
+            SDM.LoadRoster(roster)
+            reference = ReferenceQueue([list(student) for student in roster])
+            current = StudentQueue(roster)
+            uoids = {studentId: student[2] for studentId, student in SDM.StudentRoster.items()}
+
+            for step in range(operations):
+                kind = rng.choices(kinds, weights)[0]
+                if kind == "process":
+                    pick = rng.randrange(4)
+                    args = ((reference.getOnDeckStudents()[pick],), (current.getOnDeckIds()[pick],))
+                    calls = (reference.processOnDeckStudents, current.processOnDeckStudents)
+                elif kind == "onDeck":
+                    args = ((), ())
+                    calls = (reference.getOnDeckStudents, current.getOnDeckStudents)
+                elif kind == "randomize":
+                    args = ((), ())
+                    calls = (reference.randomize, current.randomize)
+                else:
+                    args = ((), ())
+                    calls = (lambda: saveLoadReference(reference), lambda: saveLoadCurrent(current))
+
+                state = random.getstate()
+                start = time.perf_counter_ns()
+                referenceResult = calls[0](*args[0])
+                middle = time.perf_counter_ns()
+                referenceState = random.getstate() if kind != "onDeck" else None
+                random.setstate(state)
+                middle2 = time.perf_counter_ns()
+                currentResult = calls[1](*args[1])
+                end = time.perf_counter_ns()
+
+                stats[kind][0] += 1
+                stats[kind][1] += middle - start
+                stats[kind][2] += end - middle2
+
+                if kind == "onDeck" and referenceResult != currentResult:
+                    raise StressTestFailure(f"Step {step}: the deck is {currentResult}, the reference deck is {referenceResult}.")
+                if kind == "saveLoad":
+                    if referenceResult[0] != currentResult[0]:
+                        raise StressTestFailure(f"Step {step}: the saved queue file is different from the reference.")
+                    if referenceResult[1] != currentResult[1]:
+                        raise StressTestFailure(f"Step {step}: the loaded queue is different from the reference.")
+                    reference = ReferenceQueue(referenceResult[1])
+                    current = StudentQueue(currentResult[1])
+                if referenceState is not None and referenceState != random.getstate():
+                    raise StressTestFailure(f"Step {step}: {kind} drew different random numbers than the reference.")
+                if [student[2] for student in reference.queue] != [uoids[studentId] for studentId in current.queue]:
+                    raise StressTestFailure(f"Step {step}: the queue is different from the reference after {kind}.")
+
+                if report is not None and (step + 1) % 100000 == 0:
+                    report(f"{step + 1} operations identical")
+        finally:
+            os.chdir(directory)
+
+    return stats
+
+
+def saveLoadReference(queue):
+    referenceIO.save_queue(queue.sendQueue())
+    with open("./data/queue_order", "rb") as f:
+        saved = f.read()
+    return saved, referenceIO.load_queue()
+
+
+def saveLoadCurrent(queue):
+    fio.save_queue(queue.sendQueue())
+    with open("./data/queue_order", "rb") as f:
+        saved = f.read()
+    return saved, fio.load_queue()
+
+
+def formatReport(stats):
+    """Returns a table of the time per operation of both implementations and the speedup."""
+    lines = [f"{'operation':<10} {'count':>9} {'reference':>12} {'current':>12} {'speedup':>8}"]
+    for kind, (count, referenceNs, currentNs) in stats.items():
+        if count == 0:
+            continue
+        lines.append(f"{kind:<10} {count:>9} {referenceNs / count / 1000:>10.2f}us {currentNs / count / 1000:>10.2f}us "
+                     f"{referenceNs / max(currentNs, 1):>7.2f}x")
+    totalReference = sum(stat[1] for stat in stats.values())
+    totalCurrent = sum(stat[2] for stat in stats.values())
+    lines.append(f"{'total':<10} {sum(stat[0] for stat in stats.values()):>9} {totalReference / 1e9:>11.2f}s "
+                 f"{totalCurrent / 1e9:>11.2f}s {totalReference / max(totalCurrent, 1):>7.2f}x")
+    return "\n".join(lines)
+
+
+def Main(argv=None):
+    """Usage: python stressTest.py [operations] [students] [seed]"""
+
+    argv = sys.argv[1:] if argv is None else argv
+    operations = int(argv[0]) if len(argv) > 0 else OPERATIONS
+    students = int(argv[1]) if len(argv) > 1 else STUDENTS
+    seed = int(argv[2]) if len(argv) > 2 else 0
+    try:
+        stats = run(operations, students, seed)
+    except StressTestFailure as failure:
+        print(f"FAILED: {failure}")
+        return 1
+    print(formatReport(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
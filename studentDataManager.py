@@ -1,33 +1,60 @@
-from typing import Dict, Tuple, Iterable
+from typing import Dict, Tuple, Iterable, List, Sequence
 
 
 class StudentDataManager:
     """ The software component responsible for holding the student roster.
 
+    Students are identified by their UOID. Every UOID is given a small integer id the first time it is
+    seen, and that id is what the rest of the program uses to refer to the student, so the hot paths
+    hash small ints instead of building and parsing name strings. Names are kept in a secondary index
+    for looking students up by name.
+
     Attributes
     ----------
-    StudentRoster (dict): The student roster.
+    StudentRoster (dict): The student roster, indexed by student id.
+    StudentIds (dict): The student id given to each UOID.
+    NameIndex (dict): The ids of the students with each (first name, last name).
+    Listeners (list): Functions called with (id, old entry, new entry) whenever a student is added, changed or removed.
     DeltaCreate (str): The value indicating that a new student has been added in GetRosterDiff.
     DeltaRemove (str): The value indicating that a student has been removed in GetRosterDiff.
     DeltaChange (str): The value indicating that a students data has been changed in GetRosterDiff.
 
     Methods
     -------
-    GetStudentUid (str, str) -> str: Gets the unique identifier associated with a specific student.
+    GetStudentIdByName (str, str) -> int: Gets the id of a student from their name.
+    GetStudentUid (str, str) -> int: The old name of GetStudentIdByName, it no longer returns a name string.
+    FindStudents (str, str) -> List[int]: Gets the ids of every student with a name.
+    GetStudentId (Sequence[str]) -> int: Gets the id of a student from their student entry.
+    AddStudent (Sequence[str]) -> int: Adds a student entry to the roster.
+    RemoveStudent (int): Takes a student off the roster.
+    AddListener (Callable): Registers a function to be told about every change to the roster.
     LoadRoster (Iterable[Iterable[str]]): Regenerates the student roster data from a new set of student entries.
     GetRosterDiff (dict): Gets the differences between a proposed student roster and the current student roster.
     """
 
-    # The set of students indexed by their uid.
+    # The set of students indexed by their id.
     StudentRoster = {}
 
+    # The id of every UOID that has been seen. Ids are never reused, so they stay the same when the roster is reloaded.
+    StudentIds = {}
+
+    # The ids of the students on the roster indexed by (first name, last name).
+    NameIndex = {}
+
+    # The id the next new student will get.
+    NextId = 0
+
+    # Functions to call with (id, old entry or None, new entry or None) when the roster changes, so indexes built on the roster can update only what changed.
+    Listeners = []
+
     # Different type of changes
     DeltaCreate = "Created"
     DeltaRemove = "Removed"
     DeltaChange = "Changed"
 
-    def GetStudentUid(fname: str, lname: str) -> str:
-        ''' Generates a unique ID for a student from their name.
+    def GetStudentIdByName(fname: str, lname: str) -> int:
+        ''' Looks up the id of a student from their name using the name index. If two students share
+        a name the first one on the roster is returned, use FindStudents to get all of them.
 
         Arguments
         ---------
@@ -36,11 +63,100 @@ class StudentDataManager:
 
         Returns
         -------
-        str: A unique identifier based on the first and last name of a student.
+        int: The id of the student, or None if no student on the roster has this name.
+        '''
+
+        # Look the name up in the name index.
+        ids = StudentDataManager.NameIndex.get((fname, lname), None)
+        return ids[0] if ids else None
+
+    def GetStudentUid(fname: str, lname: str) -> int:
+        ''' The old name of GetStudentIdByName, kept for the frozen code in reference/. It used to build a
+        "fname=...&lname=..." string, it now looks up the int id of the student on the roster (or None),
+        which is still the key of the student in StudentRoster.
+        '''
+        return StudentDataManager.GetStudentIdByName(fname, lname)
+
+    def FindStudents(fname: str, lname: str) -> List[int]:
+        ''' Gets the ids of every student on the roster with the given name.
+        '''
+        return list(StudentDataManager.NameIndex.get((fname, lname), ()))
+
+    def GetStudentId(student: Sequence[str]) -> int:
+        ''' Gets the id of a student entry (first name, last name, UOID, ...), adding the student to
+        the roster if they aren't on it already.
+
+        Arguments
+        ---------
+        student (Sequence[str]): The student entry.
+
+        Returns
+        -------
+        int: The id of the student.
+        '''
+
+        SDM = StudentDataManager
+
+        # The usual case, the student is on the roster under this name.
+        sid = SDM.StudentIds.get(student[2], None)
+        if sid is not None and tuple(SDM.StudentRoster.get(sid, ())[0:2]) == tuple(student[0:2]):
+            return sid
+
+        # Otherwise they are new, or their name was corrected, and the roster is updated under the id of their UOID.
+        return SDM.AddStudent(student)
+
+    def AddStudent(student: Sequence[str]) -> int:
+        ''' Adds a student entry to the roster and the name index. A student is identified by their UOID
+        alone, so an entry with a UOID that is already on the roster (ex. with a corrected name) replaces
+        the entry of that student under the same id, keeping their call history together.
+
+        Arguments
+        ---------
+        student (Sequence[str]): The student entry (first name, last name, UOID, ...).
+
+        Returns
+        -------
+        int: The id of the student.
+        '''
+
+        SDM = StudentDataManager
+
+        # Reuse the id of a UOID we have seen before.
+        sid = SDM.StudentIds.get(student[2], None)
+        if sid is None:
+            sid = SDM.NextId
+            SDM.NextId += 1
+            SDM.StudentIds[student[2]] = sid
+
+        # If the student was already on the roster, take their old name out of the name index, their entry is updated in place.
+        old_data = SDM.StudentRoster.get(sid, None)
+        if old_data is not None:
+            SDM.NameIndex[(old_data[0], old_data[1])].remove(sid)
+
+        SDM.StudentRoster[sid] = student
+        SDM.NameIndex.setdefault((student[0], student[1]), []).append(sid)
+
+        # Tell anything indexing the roster about the change.
+        for listener in SDM.Listeners:
+            listener(sid, old_data, student)
+        return sid
+
+    def RemoveStudent(sid: int) -> None:
+        ''' Takes a student off the roster and out of the name index. Their id is kept for their UOID.
         '''
 
-        # Create and return a string based on the first and last name given as args.
-        return f'fname={fname}&lname={lname}'
+        SDM = StudentDataManager
+        old_data = SDM.StudentRoster.pop(sid)
+        SDM.NameIndex[(old_data[0], old_data[1])].remove(sid)
+
+        for listener in SDM.Listeners:
+            listener(sid, old_data, None)
+
+    def AddListener(listener) -> None:
+        ''' Registers a function to be called with (id, old entry, new entry) every time a student is
+        added (old entry is None), changed, or removed (new entry is None).
+        '''
+        StudentDataManager.Listeners.append(listener)
 
     def LoadRoster(students: Iterable[Iterable[str]]) -> None:
         ''' Overwrites the current student roster with data from a list of student entries.
@@ -50,23 +166,31 @@ class StudentDataManager:
         students (Iterable[Iterable[str]]): A list of student entries to build the new roster from.
         '''
 
-        # Remove all existant data from the student roster.
+        # Tell the listeners every current student is going away.
+        for sid, old_data in StudentDataManager.StudentRoster.items():
+            for listener in StudentDataManager.Listeners:
+                listener(sid, old_data, None)
+
+        # Remove all existant data from the student roster and the name index.
         StudentDataManager.StudentRoster.clear()
+        StudentDataManager.NameIndex.clear()
 
         # For each student in the given set...
         for student in students:
-            # Get a new unique id for this student so they have something to be indexed by in the roster.
-            uid = StudentDataManager.GetStudentUid(student[0], student[1])
-            # Then add them to the roster.
-            StudentDataManager.StudentRoster[uid] = student
+            # Add them to the roster under the id of their UOID.
+            StudentDataManager.AddStudent(student)
 
     def GetRosterDiff(new_roster: Dict[str, Tuple[str, str, str, str, str]]):
-        ''' Gets a list of changes to the current roster given another roster.
+        ''' Gets a list of changes to the current roster given another roster, indexed by UOID.
+
+        Each change is (student name, delta, data). The data of a created student is their new entry,
+        of a removed student their current entry, and of a changed student a (new, current) pair for
+        every value of their entry.
         '''
 
-        # Get a reference to the StudentDataManager and the current student roster.
+        # Get a reference to the StudentDataManager and the current student roster, indexed by UOID like the new one.
         SDM = StudentDataManager
-        old_roster = SDM.StudentRoster
+        old_roster = {data[2]: data for data in SDM.StudentRoster.values()}
 
         # Prepare a list to hold all of the changes to the roster.
         roster_deltas = []
@@ -105,9 +229,9 @@ class StudentDataManager:
             if new_roster.get(uid, None) is not None:
                 continue
 
-            # Otherwise we know that they are being deleted and 
+            # Otherwise we know that they are being deleted and register their current data so they can be found.
             old_data = old_roster[uid]
-            roster_deltas.append((f'{old_data[0]} {old_data[1]}', SDM.DeltaRemove, []))
+            roster_deltas.append((f'{old_data[0]} {old_data[1]}', SDM.DeltaRemove, list(old_data)))
 
         # Return the set of changes that have been proposed to the roster.
         return roster_deltas
@@ -0,0 +1,111 @@
+"""studentSearch.py - Python file that holds the trigram index used to find a student on the roster by
+typing part of their name, phonetic spelling or UO ID.
+"""
+
+import collections
+import heapq
+import re
+import unicodedata
+from studentDataManager import StudentDataManager as SDM
+
+RESULTS = 10
+#the number of matches returned by a search
+
+CANDIDATES = 5
+#the number of best trigram matches looked at per result when ranking, so the ranking only touches a few students
+
+WORD = re.compile(r"[^\W_]+")
+#the characters that make up a word of a name or UO ID
+
+
+def normalize(text):
+    """Returns the lowercase words of text with accents removed, so "José" is found by typing "jose"."""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(character for character in text if not unicodedata.combining(character))
+    return WORD.findall(text)
+
+
+def trigrams(words):
+    """Returns the set of padded trigrams of every word."""
+    grams = set()
+    for word in words:
+        padded = f"  {word} "
+        grams.update({padded[i:i + 3] for i in range(len(padded) - 2)})
+    return grams
+
+
+class StudentSearchIndex:
+    """The StudentSearchIndex maps every trigram to the ids of the students that have it. A search counts
+    how many trigrams of the query each student shares, and ranks them by how similar their trigram sets
+    are, with a bonus for every word of the query that is the start of one of their words."""
+
+    def __init__(self):
+        self.postings = collections.defaultdict(set)
+        #the ids of the students with each trigram
+
+        self.grams = {}
+        self.words = {}
+        #the trigrams and the words of every indexed student, indexed by id, needed to score and remove them
+
+    def attach(self):
+        """Indexes the current roster and keeps the index up to date with every change made to it after."""
+        for studentId, student in SDM.StudentRoster.items():
+            self.add(studentId, student)
+        SDM.AddListener(self.update)
+        return self
+
+    def update(self, studentId, oldStudent, newStudent):
+        """Called by the StudentDataManager when a student is added, changed or removed."""
+        if oldStudent is not None:
+            self.remove(studentId)
+        if newStudent is not None:
+            self.add(studentId, newStudent)
+
+    def add(self, studentId, student):
+        """Adds a student entry (first name, last name, UO ID, email, phonetic spelling, ...) to the index."""
+        if studentId in self.grams:
+            self.remove(studentId)
+        words = normalize(" ".join((student[0], student[1], student[2], student[4] if len(student) > 4 else "")))
+        grams = trigrams(words)
+        self.words[studentId] = tuple(words)
+        self.grams[studentId] = grams
+        postings = self.postings
+        for gram in grams:
+            postings[gram].add(studentId)
+
+    def remove(self, studentId):
+        """Takes a student out of the index."""
+        for gram in self.grams.pop(studentId, ()):
+            students = self.postings[gram]
+            students.discard(studentId)
+            if not students:
+                del self.postings[gram]
+        self.words.pop(studentId, None)
+
+    def search(self, query, limit=RESULTS):
+        """Returns the ids of the students that best match query, best match first."""
+        queryWords = normalize(query)
+        queryGrams = trigrams(queryWords)
+        if not queryGrams:
+            return []
+
+        shared = collections.Counter()
+        for gram in queryGrams:
+            shared.update(self.postings.get(gram, ()))
+        #the number of trigrams of the query each student has, students with none are never looked at
+
+        size = len(queryGrams)
+        grams = self.grams
+        similarity = lambda studentId: shared[studentId] / (size + len(grams[studentId]) - shared[studentId])
+        candidates = heapq.nlargest(limit * CANDIDATES, shared, key=similarity)
+        #the students whose trigrams are the most like the query's (Jaccard similarity)
+
+        def score(studentId):
+            words = self.words[studentId]
+            prefixes = sum(any(word.startswith(queryWord) for word in words) for queryWord in queryWords)
+            return (-(similarity(studentId) + prefixes / len(queryWords)), words)
+            #best score first, and students with the same score in alphabetical order
+
+        return sorted(candidates, key=score)[:limit]
@@ -3,6 +3,10 @@ of student queue selection by instantiating 100 different queues and randomly co
 calling 100 students within each of the queues. The called-upon students will be logged in
 the daily_log.txt file.
 
+The queues are run in a pool of worker processes. Each worker keeps the students it called
+in memory and sends them back when its queues are done, and once every queue has finished
+all of the calls are written to the log with one buffered write.
+
 Created by Michael Gao, JD Paul on 1-25-2022
 """
 
@@ -10,58 +14,147 @@ from StudentQueue import *
 from studentDataManager import StudentDataManager as SDM
 import fileIO as fio
 import os.path, os
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-def Main():
+TRIALS = 100
+#the number of queues that are tested
+CALLS = 100
+#the number of students called upon in each queue
+TRIALS_PER_TASK = 10
+#the number of queues each task sent to a worker process runs
+POLL_SECONDS = 0.1
+#how often the main process checks whether the test was cancelled while it waits for the workers
 
-    """This program instantiates 100 different queues, and within each of the 100 queues
-        it randomly chooses one of the on deck students and then logs those students in the daily_logs.txt
-        This leads to 10000 total randomly called upon students for random distribution analysis if the user
-        chooses to do so.
-        """
+workerCancelled = None
+#in a worker process, the multiprocessing Event that is set when the test is cancelled
 
-    if not os.path.exists('./data/students'):
-        return 'There is no data to test! Please run the program and upload data first.'
-        #this checks if the path data/students exists or not, aka whether there exists student
-        # data or not. If so, it returns a message to the user to upload student data.
 
+def initWorker(cancelled):
+
+    """This function runs once in every worker process as it starts, and keeps the Event that
+    tells the worker the test was cancelled."""
+
+    global workerCancelled
+    workerCancelled = cancelled
+
+
+def runTrials(roster, trials, seed):
+
+    """This function runs in a worker process. It instantiates trials different queues
+    from the roster, and within each of them randomly chooses one of the on deck students
+    CALLS times. It returns the calls it made as a list of (index into the roster, time)
+    pairs instead of logging them, so the worker never touches the log file."""
+
+    random.seed(seed)
+    #seed this worker so different workers don't make the same calls
+
+    SDM.LoadRoster(roster)
+    #loads the student data into this process
+
+    studentIndex = {SDM.GetStudentId(student): i for i, student in enumerate(roster)}
+    #the position in the roster of every student id, which is what gets sent back to the main process
 
-    for i in range(0,100):
-        #iterates 100 times, from 0 - 99
+    calls = []
+    for i in range(0, trials):
 
-        SDM.LoadRoster(fio.load_queue())
-        #loads the student data
-        stud = StudentQueue(fio.load_queue())
-        # instantiates a StudentQueue object stud and passes in the processed student queue data
+        if workerCancelled is not None and workerCancelled.is_set():
+            return calls
+        #stop between queues once the test is cancelled, the calls are thrown away anyway
+
+        stud = StudentQueue(list(roster))
+        # instantiates a StudentQueue object stud and passes in the student data
         stud.randomize()
         # randomizes the ordering of the queue
 
-        for j in range(0,100):
-            # iterates 100 times, from 0 - 99
+        for j in range(0, CALLS):
 
             randomlychosenstudent = random.randint(0, 3)
             # chooses a random integer between 0 and 3 (i.e. 0, 1, 2, 3) and assigns it to
             # randomlychosenstudent variable
 
-            student = stud.queue[randomlychosenstudent]
-            # selects the student and their information by indexing into the stud.queue via
-            # the randomlychosenstudent variable and assigns it to student variable, holds a list
-
-            studentname = student[0] + ' ' + student[1]
-            # creates the student name by concatenating the student first name, stored in student[0],
-            # with a space via ' ', then the student last name, stored in student[1], into the studentname
-            # variable, holds a string
+            studentUid = stud.queue[randomlychosenstudent]
+            # selects the student id by indexing into the stud.queue via the randomlychosenstudent
+            # variable and assigns it to studentUid variable, holds an integer
 
-            stud.processOnDeckStudents(studentname)
-            # calls the processOnDeckStudents with the studentname parameter to remove the student from
+            stud.processOnDeckStudents(studentUid)
+            # calls the processOnDeckStudents with the studentUid parameter to remove the student from
             # the front of the queue and randomly insert it anywhere in the back 70% of the queue
 
-            studentUid = SDM.GetStudentUid(student[0], student[1])
-            # generate the studentUid by calling the GetStudentUid with the student first and last name,
-            # stored inside student[0] and student[1] respectively
+            calls.append((studentIndex[studentUid], datetime.datetime.now()))
+            # keep the call in memory to be logged by the main process
+
+    return calls
+
+
+def Main(progress=None, cancelled=None, workers=None, sink=None, students=None):
+
+    """This program instantiates 100 different queues, and within each of the 100 queues
+        it randomly chooses one of the on deck students and then logs those students in the daily_logs.txt
+        This leads to 10000 total randomly called upon students for random distribution analysis if the user
+        chooses to do so.
+
+        progress is an optional function called with (queues done, total queues) as the worker processes finish.
+        cancelled is an optional threading.Event, if it gets set the remaining queues are stopped and nothing is logged.
+        workers is the number of worker processes, defaulting to one per CPU.
+        sink is an optional fileIO log sink to log the calls to instead of the daily log file.
+        students is an optional list of (student id, student entry) pairs to test with, a copy of the roster
+        taken by the caller. Without it the saved roster is loaded into the StudentDataManager, which must not
+        happen on a thread beside the GUI since the GUI reads the roster while it is being rebuilt.
+        """
+
+    if not os.path.exists('./data/students'):
+        return 'There is no data to test! Please run the program and upload data first.'
+        #this checks if the path data/students exists or not, aka whether there exists student
+        # data or not. If so, it returns a message to the user to upload student data.
 
-            fio.log_cold_call(studentUid, flagged=False)
-            #log the student in the cold call participation log via the studentUid with no flag.
+    if students is None:
+        roster = fio.load_queue()
+        SDM.LoadRoster(roster)
+        #loads the student data once, it is sent to every worker with their tasks
+        students = [(SDM.GetStudentId(student), student) for student in roster]
+    rosterIds = [sid for sid, student in students]
+    roster = [student for sid, student in students]
+    #the roster is only read from this list from here on, never from the StudentDataManager
+
+    calls = []
+    done = 0
+    # spawned workers, since this runs beside tkinter (see fileIO.verify_log)
+    context = multiprocessing.get_context("spawn")
+    workerCancel = context.Event()
+    # a threading.Event can't reach the workers, so a cancel is passed on to them through this one
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initWorker, initargs=(workerCancel,)) as pool:
+        pending = {pool.submit(runTrials, roster, min(TRIALS_PER_TASK, TRIALS - start), random.random())
+                   for start in range(0, TRIALS, TRIALS_PER_TASK)}
+
+        while pending:
+            finished, pending = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            # waiting with a timeout checks for a cancel even while no task finishes
+            if cancelled is not None and cancelled.is_set():
+                workerCancel.set()
+                pool.shutdown(wait=True, cancel_futures=True)
+                # tasks that haven't started are dropped and the running ones stop after their current queue, so
+                # this only waits for that. The workers have to be waited for, a worker that is still starting
+                # when workerCancel is freed can't open it
+                return 'The test was cancelled, nothing was logged.'
+
+            for task in finished:
+                calls.extend(task.result())
+                done += min(TRIALS_PER_TASK, TRIALS - done)
+                if progress is not None:
+                    progress(done, TRIALS)
+
+    calls.sort(key=lambda call: call[1])
+    #merge the calls of every worker in the order they were made
+
+    if calls:
+        (sink or fio.get_log_sink()).write([fio.ColdCall(rosterIds[index], False, when, roster[index]) for index, when in calls])
+    #log every student in the cold call participation log with no flag, in one write. The calls are handed
+    # to the sink with their entries from the copy of the roster, so logging doesn't look them up either
+
+    return f'Logged {len(calls)} cold calls.'
 
 
 if __name__ == '__main__':
-    Main()
+    print(Main())
@@ -0,0 +1,36 @@
+"""Fixtures shared by the tests, which run in a temporary folder laid out like the program's data."""
+
+import os
+import random
+import sys
+import pytest
+
+# The modules of the program live at the top of the repository, beside this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from stressTest import makeRoster
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("./data/logs")
+    # The live log's index and running checksums are cached per process, so each test starts without them
+    monkeypatch.setattr(fio, "_log_index", None)
+    monkeypatch.setattr(fio, "_log_index_end", 0)
+    monkeypatch.setattr(fio, "_archive_index", None)
+    monkeypatch.setattr(fio, "_log_checksums", {})
+    monkeypatch.setattr(fio, "_unwritten_log_checksums", set())
+    monkeypatch.setattr(fio, "_log_checksum_written", {})
+    return tmp_path
+
+
+@pytest.fixture
+def roster(workdir):
+    """A roster of 20 generated students, loaded into the StudentDataManager."""
+    random.seed(0)
+    students = makeRoster(20, random.Random(0))
+    SDM.LoadRoster(students)
+    return students
@@ -0,0 +1,60 @@
+import math
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+numpy = pytest.importorskip("numpy")
+import analytics
+
+
+def record(student, day, time, flagged="False", course=None):
+    fname, lname, uoid = student[0:3]
+    values = (f"2026/01/{day:02d}", time, flagged, uoid, fname, lname)
+    return values + (course,) if course else values
+
+
+ROSTER = [("Ann", "Avery", "951000001"), ("Ben", "Brook", "951000002"), ("Cal", "Cruz", "951000003")]
+OTHERS = [("Dee", "Dunn", "951000004"), ("Eli", "Eads", "951000005")]
+
+
+@pytest.fixture
+def report(monkeypatch):
+    monkeypatch.setattr(SDM, "StudentRoster", {i: student + ("", "", "") for i, student in enumerate(ROSTER)})
+    ann, ben = ROSTER[0], ROSTER[1]
+    dee, eli = OTHERS
+    records = [
+        record(ann, 5, "09:00:00"), record(dee, 5, "09:00:00", course="B"), record(ben, 5, "10:00:00", "True"),
+        record(ann, 6, "09:00:00"), record(eli, 6, "11:00:00", course="B"), record(dee, 6, "12:00:00", course="B"),
+        record(ben, 7, "10:00:00"), record(ben, 8, "10:00:00"), record(ben, 8, "10:05:00", fio.UNDO_PREFIX + "False"),
+        record(eli, 8, "11:00:00", course="B"), record(ann, 9, "09:00:00"),
+    ]
+    logs = analytics.load_logs(records, course="A")
+    return logs, analytics.compute_report(logs)
+
+
+def column(logs, report, name):
+    return {student[2]: report[name][i] for i, student in enumerate(logs.students)}
+
+
+def test_counts_and_gaps(report):
+    logs, report = report
+    assert logs.courses == ["A", "B"] and logs.roster_size == 3
+    assert column(logs, report, "calls") == {"951000001": 3, "951000002": 2, "951000003": 0, "951000004": 2, "951000005": 2}
+    assert column(logs, report, "flags")["951000002"] == 1
+    assert column(logs, report, "flag_ratio")["951000002"] == 0.5
+
+    # Ann was called a day and then three days apart, Ben's undone call on the 8th doesn't count
+    mean_gap, max_gap = column(logs, report, "mean_gap_days"), column(logs, report, "max_gap_days")
+    assert (mean_gap["951000001"], max_gap["951000001"]) == (2.0, 3.0)
+    assert (mean_gap["951000002"], max_gap["951000002"]) == (2.0, 2.0)
+    assert math.isnan(mean_gap["951000003"]) and math.isnan(max_gap["951000003"])
+    assert max_gap["951000004"] == pytest.approx(1 + 3 / 24)
+    assert report["total_calls"] == 9 and list(report["course_calls_per_week"]) == [9]
+
+
+def test_gini_per_course(report):
+    logs, report = report
+    # Course A: Cal 0, Ben 2 and Ann 3 calls. (2 * (1*0 + 2*2 + 3*3)) / (3 * 5) - 4 / 3 = 0.4
+    # Course B: Dee and Eli 2 calls each, so 0. Everyone: 0, 2, 2, 2, 3 gives 66 / 45 - 6 / 5 = 12 / 45
+    assert report["course_gini"] == pytest.approx({"A": 0.4, "B": 0.0})
+    assert report["gini"] == pytest.approx(12 / 45)
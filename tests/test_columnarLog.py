@@ -0,0 +1,69 @@
+import datetime
+import os
+import pytest
+import columnarLog
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+
+@pytest.fixture(params=["numpy", "python"])
+def columns(request, roster, monkeypatch):
+    """The columnar log of a fresh folder, read with NumPy and with the plain Python fallback."""
+    monkeypatch.setattr(columnarLog, "_student_ids", None)
+    if request.param == "python":
+        monkeypatch.setattr(columnarLog, "numpy", None)
+    elif columnarLog.numpy is None:
+        pytest.skip("NumPy is not installed")
+    return roster
+
+
+def makeCalls(uids):
+    start = datetime.datetime(2026, 3, 2, 9, 30)
+    calls = [(uid, i % 3 == 0, start + datetime.timedelta(hours=20 * i)) for i, uid in enumerate(uids)]
+    # Take back the last call, which wasn't flagged
+    calls.append((uids[-1], False, start + datetime.timedelta(hours=20 * len(uids)), True))
+    return calls
+
+
+def test_sink_round_trips_through_load_columns(columns):
+    uids = list(SDM.StudentRoster)[:6] + list(SDM.StudentRoster)[:2]
+    calls = makeCalls(uids)
+    fio.log_cold_calls(calls[:3], sink=fio.ColumnarSink())
+    fio.log_cold_calls(calls[3:], sink=fio.ColumnarSink())
+
+    loaded = columnarLog.load_columns()
+    dictionary = columnarLog.load_dictionary()
+    assert len(dictionary) == 6
+    assert [dictionary[i][2] for i in loaded["student_id"]] == [SDM.StudentRoster[uid][2] for uid, *_ in calls]
+    assert list(loaded["time"]) == [int(when.timestamp()) for _, _, when, *_ in calls]
+    assert list(loaded["flags"]) == [int(flagged) | (2 if undo else 0) for _, flagged, _, *undo in calls]
+
+    # Every third call is flagged, which is both calls of the first student, and the second call of the second student was taken back
+    counts = {student[2]: (called, flagged) for student, called, flagged in columnarLog.participation_counts(loaded)}
+    assert counts[SDM.StudentRoster[uids[0]][2]] == (2, 2)
+    assert counts[SDM.StudentRoster[uids[1]][2]] == (1, 0)
+    assert counts[SDM.StudentRoster[uids[3]][2]] == (1, 1)
+    assert sum(columnarLog.calls_per_day(loaded).values()) == len(uids) - 1
+
+
+def test_torn_append_is_cut_to_the_whole_calls(columns):
+    fio.log_cold_calls(makeCalls(list(SDM.StudentRoster)[:4]), sink=fio.ColumnarSink())
+    # The program stopped after writing the student id of the next call
+    with open(os.path.join(columnarLog.COLUMN_DIR, "student_id.u32"), "ab") as f:
+        f.write(bytes(6))
+
+    loaded = columnarLog.load_columns()
+    assert {len(values) for values in loaded.values()} == {5}
+
+
+def test_converted_text_log_matches_the_columns_logged_beside_it(columns, monkeypatch):
+    fio.log_cold_calls(makeCalls(list(SDM.StudentRoster)[3:10]), sink=fio.FanoutSink(fio.FileSink(), fio.ColumnarSink()))
+    logged = columnarLog.load_columns()
+    dictionary = columnarLog.load_dictionary()
+
+    monkeypatch.setattr(columnarLog, "COLUMN_DIR", "./data/logs/converted")
+    monkeypatch.setattr(columnarLog, "_student_ids", None)
+    assert columnarLog.convert_text_log(fio.iter_log_lines()) == 8
+    converted = columnarLog.load_columns()
+    assert columnarLog.load_dictionary() == dictionary
+    assert {column: list(values) for column, values in converted.items()} == {column: list(values) for column, values in logged.items()}
@@ -0,0 +1,43 @@
+"""The config file, which holds both key bindings and settings."""
+
+import os
+import pytest
+import fileIO as fio
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Writes the given lines as ./data/config in an empty folder."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("./data")
+
+    def write(*lines):
+        with open("./data/config", "w") as f:
+            f.write("".join(line + "\n" for line in lines))
+    return write
+
+
+def test_missing_config_uses_the_defaults(config):
+    assert fio.key_bindings()["right"] == "<Right>"
+    assert fio.selection_policy() == "uniform"
+
+
+def test_settings_are_not_key_bindings(config):
+    config("right : l", "", "policy : Recency", "remove : :")
+    bindings = fio.key_bindings()
+    assert bindings == {"right": "l", "remove": ":", "select": "<space>"}
+    assert fio.selection_policy() == "recency"
+
+
+def test_config_with_only_settings_keeps_the_default_keys(config):
+    config("policy : participation")
+    assert fio.key_bindings()["flag"] == "<Down>"
+    assert fio.selection_policy() == "participation"
+
+
+@pytest.mark.parametrize("value, cooldown", [("8", 8), ("0", None), ("-3", None), ("soon", None)])
+def test_cooldown_setting(config, value, cooldown):
+    config("policy : cooldown", f"cooldown : {value}", "select : s")
+    assert fio.selection_policy() == "cooldown"
+    assert fio.policy_cooldown() == cooldown
+    assert fio.key_bindings() == {"select": "s"}
@@ -0,0 +1,173 @@
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from deckController import DeckController
+from StudentQueue import StudentQueue
+
+
+class RecordingSink:
+    """Keeps every batch of calls written to it."""
+
+    def __init__(self):
+        self.batches = []
+        self.flushes = 0
+
+    def write(self, calls):
+        self.batches.append(list(calls))
+
+    def flush(self):
+        self.flushes += 1
+
+
+def makeDeck(roster, monkeypatch):
+    saves = []
+    monkeypatch.setattr(fio, "save_queue", lambda queue: saves.append(list(queue)))
+    sink = RecordingSink()
+    return DeckController(StudentQueue(roster), sink=sink), sink, saves
+
+
+def test_flush_logs_and_saves_once_per_burst(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    called = [deck.deckIds()[0], deck.deckIds()[2]]
+
+    deck.left()
+    assert deck.remove() == [0]
+    # Nothing moves until the flush, so the deck spots still hold the same students
+    deck.left()
+    deck.right()
+    deck.right()
+    assert deck.flag() == [2]
+    assert sink.batches == [] and saves == []
+
+    assert len(deck.flush()) == 2
+    assert len(sink.batches) == 1
+    assert [(call.uid, call.flagged) for call in sink.batches[0]] == [(called[0], False), (called[1], True)]
+    assert len(saves) == 1
+    assert deck.flush() == []
+
+
+def test_undo_after_flush_restores_the_queue(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    before = list(deck.queue.queue)
+    called = deck.deckIds()[1]
+
+    deck.left()
+    deck.right()
+    deck.remove()
+    deck.flush()
+    assert deck.queue.queue != before
+
+    assert deck.undo()
+    assert deck.queue.queue == before
+    assert [(call.uid, call.undo) for call in sink.batches[-1]] == [(called, True)]
+    assert not deck.undo()
+
+
+def test_undo_handles_pending_calls_first(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    before = list(deck.queue.queue)
+
+    deck.left()
+    deck.remove()
+    deck.flush()
+    afterFirst = list(deck.queue.queue)
+    deck.left()
+    deck.remove()
+
+    assert deck.undo()
+    assert deck.queue.queue == afterFirst
+    assert deck.undo()
+    assert deck.queue.queue == before
+
+
+def test_redo_is_refused_while_calls_are_pending(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    deck.left()
+    deck.remove()
+    deck.flush()
+    deck.undo()
+    undone = list(deck.queue.queue)
+
+    deck.left()
+    deck.remove()
+    assert not deck.redo()
+    assert deck.queue.queue == undone
+
+    # Handling the new call starts a new history, so there is nothing left to redo
+    deck.flush()
+    assert not deck.redo()
+
+
+def test_redo_repeats_the_undone_call(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    deck.left()
+    deck.remove()
+    deck.flush()
+    after = list(deck.queue.queue)
+    deck.undo()
+
+    assert deck.redo()
+    assert deck.queue.queue == after
+    assert not deck.redo()
+
+
+def test_roster_change_resets_undo(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    deck.left()
+    deck.remove()
+    deck.flush()
+
+    newcomer = ["Newbie", "Student", "951999999", "newbie@uoregon.edu", "Newbie", ""]
+    changed = {student[2]: student for student in roster}
+    changed[newcomer[2]] = newcomer
+    deck.applyRosterChange(SDM.GetRosterDiff(changed), list(changed.values()))
+
+    assert deck.queue.numStudents() == len(roster) + 1
+    assert not deck.undo()
+    assert not deck.redo()
+
+
+def test_group_call_is_one_batch_one_save_and_one_undo(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    before = list(deck.queue.queue)
+    group = deck.deckIds()[0:3]
+
+    deck.left()
+    deck.select()
+    deck.right()
+    deck.select()
+    deck.right()
+    assert deck.remove() == [0, 1, 2]
+    assert len(deck.flush()) == 1
+    assert [[call.uid for call in batch] for batch in sink.batches] == [list(group)]
+    assert len(saves) == 1 and len(deck.undoStack) == 1
+    assert not set(group) & set(deck.deckIds())
+
+    # One undo takes back the whole group, and logs taking back each of its calls in one batch
+    assert deck.undo()
+    assert deck.queue.queue == before
+    assert [(call.uid, call.undo) for call in sink.batches[-1]] == [(studentId, True) for studentId in group]
+    assert not deck.undo()
+
+
+def test_close_handles_pending_calls_and_flushes_the_sink(roster, monkeypatch):
+    deck, sink, saves = makeDeck(roster, monkeypatch)
+    deck.left()
+    deck.remove()
+    deck.flush()
+    assert sink.flushes == 0
+
+    deck.right()
+    deck.flag()
+    deck.close()
+    assert len(sink.batches) == 2 and len(saves) == 2
+    assert sink.flushes == 1
+
+
+def test_close_leaves_the_log_checksum_on_disk(roster):
+    deck = DeckController(StudentQueue(roster))
+    for i in range(5):
+        deck.left()
+        deck.remove()
+        deck.flush()
+    deck.close()
+    assert fio._read_log_checksum(fio.LOG_PATH) == fio._file_crc(fio.LOG_PATH)
@@ -0,0 +1,98 @@
+"""The deck spots of the window, driven without a display: the spots are stand-ins that reuse the label update
+code of InteractiveStudentWidget and count how often their text is set."""
+
+import random
+import pytest
+import gui
+from deckController import DeckController
+from studentDataManager import StudentDataManager as SDM
+from StudentQueue import StudentQueue
+from stressTest import makeRoster
+
+
+class Text:
+    """Stands in for the StringVar of a label, counting the times it is set."""
+
+    def __init__(self):
+        self.value = ""
+        self.sets = 0
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        self.sets += 1
+
+
+class Spot:
+    setName = gui.InteractiveStudentWidget.setName
+    setStudent = gui.InteractiveStudentWidget.setStudent
+
+    def __init__(self):
+        self.text = Text()
+        self.studentId = None
+
+    def setPhoto(self, photo):
+        pass
+
+
+class NoThumbnails:
+    def get(self, uoid):
+        return None
+
+    def prefetch(self, uoids):
+        list(uoids)
+
+
+class Window:
+    """The parts of MainWin that refreshDeck uses."""
+    refreshDeck = gui.MainWin.refreshDeck
+
+    def __init__(self, students, spots):
+        SDM.LoadRoster(students)
+        self.maxNumberStudents = spots
+        self.spots = [Spot() for _ in range(spots)]
+        self.deck = DeckController(StudentQueue(students, deckSize=spots), persist=False)
+        self.thumbnails = NoThumbnails()
+
+
+@pytest.mark.parametrize("spots", [1, 4, 7])
+def test_highlight_moves_across_every_spot(spots):
+    window = Window(makeRoster(20, random.Random(spots)), spots)
+    deck = window.deck
+    assert deck.right() == spots - 1
+    for spot in reversed(range(spots - 1)):
+        assert deck.left() == spot
+    assert deck.left() == 0
+    for spot in range(1, spots):
+        assert deck.right() == spot
+    assert deck.right() == spots - 1
+
+
+def test_only_the_spots_that_changed_are_redrawn():
+    random.seed(1)
+    window = Window(makeRoster(30, random.Random(1)), 6)
+    window.refreshDeck()
+    assert [spot.text.get() for spot in window.spots] == window.deck.deckNames()
+    assert [spot.text.sets for spot in window.spots] == [1] * 6
+
+    for _ in range(20):
+        before = [spot.text.get() for spot in window.spots]
+        sets = [spot.text.sets for spot in window.spots]
+        window.deck.right()
+        window.deck.left()
+        window.deck.remove()
+        window.deck.flush()
+        window.refreshDeck()
+
+        after = [spot.text.get() for spot in window.spots]
+        assert after == window.deck.deckNames()
+        assert [spot.text.sets - count for spot, count in zip(window.spots, sets)] == [int(a != b) for a, b in zip(before, after)]
+
+
+def test_spots_without_a_student_are_emptied():
+    window = Window(makeRoster(3, random.Random(2)), 5)
+    window.refreshDeck()
+    assert [spot.text.get() for spot in window.spots[3:]] == ["", ""]
+    assert [spot.studentId for spot in window.spots] == window.deck.deckIds() + [None, None]
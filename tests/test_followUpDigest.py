@@ -0,0 +1,68 @@
+import datetime
+import mailbox
+import os
+import pytest
+import fileIO as fio
+import followUpDigest
+from studentDataManager import StudentDataManager as SDM
+
+
+@pytest.fixture
+def flagged(roster):
+    """Logs calls over four days, and returns the UO IDs of the students flagged on the 6th and 7th with the times of those calls."""
+    ids = list(SDM.StudentRoster)
+    day = lambda number, hour: datetime.datetime(2026, 1, number, hour)
+    fio.log_cold_calls([
+        (ids[0], True, day(5, 9)), (ids[1], False, day(5, 10)),
+        (ids[0], True, day(6, 9)), (ids[2], True, day(6, 10)), (ids[3], False, day(6, 11)),
+        (ids[2], True, day(7, 9)), (ids[4], True, day(7, 10)), (ids[4], True, day(7, 11), True),
+        (ids[5], True, day(8, 9)),
+    ])
+    uoid = lambda number: SDM.StudentRoster[ids[number]][2]
+    return {uoid(0): [("2026/01/06", "09:00:00")], uoid(2): [("2026/01/06", "10:00:00"), ("2026/01/07", "09:00:00")]}
+
+
+def test_flagged_calls_are_grouped_by_student(flagged):
+    students = fio.flagged_calls("2026/01/06", "2026/01/07")
+    assert {uoid: calls for uoid, (student, calls) in students.items()} == flagged
+    assert all(student == tuple(SDM.StudentRoster[SDM.StudentIds[uoid]][0:6]) for uoid, (student, calls) in students.items())
+    # Without a range every flagged call that wasn't taken back counts
+    assert sum(len(calls) for student, calls in fio.flagged_calls().values()) == 5
+
+
+def test_mbox(flagged, capsys):
+    assert followUpDigest.Main(["--since", "2026/01/06", "--until", "2026/01/07", "--mbox", "digest.mbox"]) == 0
+    box = mailbox.mbox("digest.mbox")
+    messages = {message["Message-ID"].split("@")[0].rsplit(".", 1)[-1]: message for message in box}
+    assert set(messages) == set(flagged)
+    for uoid, calls in flagged.items():
+        body = messages[uoid].get_payload(decode=True).decode()
+        assert SDM.StudentRoster[SDM.StudentIds[uoid]][3] in messages[uoid]["To"]
+        assert f"{len(calls)} time" in body and all(f"{day} at {time}" in body for day, time in calls)
+    assert capsys.readouterr().out.startswith("2 follow up messages for 2 flagged students to digest.mbox")
+
+
+def test_eml(flagged):
+    assert followUpDigest.Main(["--since", "2026/01/06", "--until", "2026/01/07", "--eml", "digest"]) == 0
+    assert sorted(os.listdir("digest")) == sorted(f"{uoid}.eml" for uoid in flagged)
+
+
+def test_smtp_stand_in_counts_every_message(flagged, capsys):
+    assert followUpDigest.Main(["--smtp", "local"]) == 0
+    assert capsys.readouterr().out.startswith("3 follow up messages for 3 flagged students to 127.0.0.1:")
+
+    server = followUpDigest.serveStandIn()
+    try:
+        host, port = server.server_address
+        messages = fio.follow_up_messages(fio.flagged_calls("2026/01/06", "2026/01/07"))
+        assert fio.send_follow_up_messages(messages, host, port) == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert server.received == 2
+
+
+def test_usage(workdir, capsys):
+    assert followUpDigest.Main(["--mbox", "a.mbox", "--eml", "b"]) == 2
+    assert followUpDigest.Main(["--since"]) == 2
+    assert capsys.readouterr().out.startswith("Usage:")
@@ -0,0 +1,90 @@
+"""The thumbnail cache, run without a display: the window only schedules the polls, which the tests run by hand,
+and the photos are stand-ins for PhotoImages."""
+
+import base64
+import os
+import time
+import pytest
+import fileIO as fio
+import imageCache
+from imageCache import ThumbnailCache, has_thumbnails
+
+
+class Window:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+
+class Photo:
+    def __init__(self, master, data):
+        if base64.b64decode(data) == b"broken":
+            raise imageCache.tk.TclError("couldn't recognize image data")
+        self.data = base64.b64decode(data)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """A cache of capacity 3 over a folder with the thumbnails of students 1 to 5 and a broken one for student 9."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(imageCache.tk, "PhotoImage", Photo)
+    os.makedirs(fio.THUMBNAIL_DIR)
+    assert not has_thumbnails()
+    for uoid in ("1", "2", "3", "4", "5"):
+        with open(fio.thumbnail_path(uoid), "wb") as f:
+            f.write(uoid.encode())
+    with open(fio.thumbnail_path("9"), "wb") as f:
+        f.write(b"broken")
+
+    window = Window()
+    loaded = []
+    return ThumbnailCache(window, capacity=3, onLoad=lambda uoid, photo: loaded.append((uoid, photo.data))), window, loaded
+
+
+def poll(cache, window):
+    """Waits for the loader thread to read every request, then runs the scheduled poll like the window would."""
+    deadline = time.monotonic() + 5
+    while cache.loaded.qsize() < len(cache.requested) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    window.scheduled.pop()()
+
+
+def test_thumbnails_load_in_the_background(cache):
+    cache, window, loaded = cache
+    assert has_thumbnails()
+    assert cache.get("1") is None
+    assert cache.get("1") is None
+    cache.prefetch(["2", "7"])
+    # One poll is scheduled no matter how many thumbnails are waiting
+    assert len(window.scheduled) == 1 and cache.requested == {"1", "2", "7"}
+
+    poll(cache, window)
+    assert loaded == [("1", b"1"), ("2", b"2")]
+    assert cache.get("1").data == b"1" and cache.get("2").data == b"2"
+    # Students without a photo aren't looked for again
+    assert cache.get("7") is None and "7" in cache.missing and not window.scheduled
+
+
+def test_broken_thumbnails_count_as_missing(cache):
+    cache, window, loaded = cache
+    cache.get("9")
+    poll(cache, window)
+    assert loaded == [] and "9" in cache.missing
+
+
+def test_least_recently_used_thumbnail_is_dropped(cache):
+    cache, window, loaded = cache
+    cache.prefetch(["1", "2", "3"])
+    poll(cache, window)
+    # Showing 1 and prefetching 2 makes 3 the least recently used
+    cache.get("1")
+    cache.prefetch(["2"])
+    cache.get("4")
+    poll(cache, window)
+    assert list(cache.images) == ["1", "2", "4"]
+
+    cache.clear()
+    assert cache.get("1") is None and len(window.scheduled) == 1
@@ -0,0 +1,64 @@
+import os
+import threading
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+
+def writeRoster(path, names):
+    with open(path, "w") as f:
+        f.writelines(f"{name}\tStudent\t{951000000 + i}\t{name.lower()}@uoregon.edu\n" for i, name in enumerate(names))
+
+
+@pytest.fixture
+def imported(workdir, monkeypatch):
+    """Student data imported from a first roster, and a second roster to import over it. Returns the bytes of the imported data."""
+    monkeypatch.setattr(SDM, "StudentRoster", {})
+    monkeypatch.setattr(SDM, "NameIndex", {})
+    monkeypatch.setattr(SDM, "StudentIds", {})
+    monkeypatch.setattr(SDM, "NextId", 0)
+    writeRoster("first.txt", ["Ann", "Ben", "Cal"])
+    writeRoster("second.txt", [chr(ord("A") + i % 26) + "x" * (i // 26 + 1) for i in range(100)])
+    assert fio.import_student_data("first.txt") == 0
+    with open("./data/students", "rb") as f:
+        return f.read()
+
+
+def assertUnchanged(imported):
+    with open("./data/students", "rb") as f:
+        assert f.read() == imported
+    assert sorted(os.listdir("./data")) == ["logs", "roster_source", "students"]
+
+
+def test_import_cancelled_while_reading(imported, monkeypatch):
+    monkeypatch.setattr(fio, "IMPORT_PROGRESS_LINES", 10)
+    cancelled = threading.Event()
+    assert fio.import_student_data("second.txt", over_write=True, cancelled=cancelled,
+                                   progress=lambda done, size: cancelled.set()) == 4
+    assertUnchanged(imported)
+
+
+def test_import_cancelled_after_writing(imported, monkeypatch):
+    cancelled = threading.Event()
+    fsync = fio._fsync
+    # The cancel comes in once the new data is written but before it is swapped in
+    monkeypatch.setattr(fio, "_fsync", lambda f, function: (fsync(f, function), cancelled.set()))
+    assert fio.import_student_data("second.txt", over_write=True, cancelled=cancelled) == 4
+    assertUnchanged(imported)
+
+
+def test_failed_import(imported, monkeypatch):
+    fsync = fio._fsync
+
+    def full(f, function):
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(fio, "_fsync", full)
+    with pytest.raises(OSError):
+        fio.import_student_data("second.txt", over_write=True)
+    assertUnchanged(imported)
+
+    # The next import works as usual
+    monkeypatch.setattr(fio, "_fsync", fsync)
+    assert fio.import_student_data("second.txt", over_write=True) == 0
+    with open("./data/students") as f:
+        assert len(f.readlines()) == 100
@@ -0,0 +1,56 @@
+import os
+from latencyHistogram import LatencyHistogram, dump_histograms, SIGNIFICANT_BITS
+from deckController import DeckController, PHASES
+from StudentQueue import StudentQueue
+
+
+def test_buckets_keep_every_value_to_within_the_significant_bits():
+    histogram = LatencyHistogram("test")
+    for value in list(range(1000)) + [2 ** power + offset for power in range(10, 40) for offset in (-1, 0, 1, 12345)]:
+        top = histogram.bucketValue(histogram.bucketIndex(value))
+        assert value <= top <= value + value / 2 ** (SIGNIFICANT_BITS - 1)
+        # Small values are kept exactly
+        if value < 2 ** SIGNIFICANT_BITS:
+            assert top == value
+
+
+def test_percentiles_and_summary():
+    histogram = LatencyHistogram("save")
+    assert histogram.summary() == "save: no samples"
+    assert histogram.valueAtPercentile(50) == 0
+
+    for micros in range(1, 1001):
+        histogram.record(micros)
+    for percentile, value in ((50, 500), (90, 900), (99, 990), (100, 1000)):
+        assert value <= histogram.valueAtPercentile(percentile) <= value * 1.02
+
+    # Negative values (a clock that went back) are recorded as zero
+    histogram.record(-5)
+    assert (histogram.total, histogram.min, histogram.max) == (1001, 0, 1000)
+    assert histogram.summary().startswith("save: count=1001 min=0us mean=500us p50=")
+
+    histogram.recordSince(1_000_000, 3_500_000)
+    assert histogram.max == 2500
+
+
+def test_dump_writes_every_histogram(tmp_path):
+    first, empty = LatencyHistogram("first"), LatencyHistogram("empty")
+    for micros in (10, 20, 30):
+        first.record(micros)
+    path = dump_histograms([first, empty], str(tmp_path / "metrics"))
+
+    assert os.path.dirname(path) == str(tmp_path / "metrics")
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == first.summary()
+    assert lines[1:5] == ["Value(us)\tPercentile\tTotalCount", "10\t33.333\t1", "20\t66.667\t2", "30\t100.000\t3"]
+    assert "empty: no samples" in lines
+
+
+def test_flush_records_every_phase_of_a_call(roster):
+    deck = DeckController(StudentQueue(roster))
+    for _ in range(3):
+        deck.left()
+        deck.remove()
+        deck.flush()
+    assert {phase: deck.latency[phase].total for phase in PHASES} == {phase: 3 for phase in PHASES}
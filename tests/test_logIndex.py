@@ -0,0 +1,80 @@
+import datetime
+import os
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+
+def logCalls(days, callsPerDay):
+    """Logs callsPerDay calls on each of the days before today and on today, a few of them taken back."""
+    ids = list(SDM.StudentRoster)
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time(9))
+    for day in range(days, -1, -1):
+        start = today - datetime.timedelta(days=day)
+        calls = [(ids[(i * 7 + day) % len(ids)], i % 4 == 0, start + datetime.timedelta(minutes=i)) for i in range(callsPerDay)]
+        fio.log_cold_calls(calls)
+        fio.log_cold_calls([calls[-1][0:2] + (calls[-1][2], True)])
+
+
+def scannedHistory(uoid):
+    """The history of a student the slow way, reading every record of every log."""
+    records = [record for record in fio.scan_logs(("date", "time", "flagged", "uoid")) if record[3] == uoid]
+    return [(date, time, flagged == "True") for date, time, flagged, _ in fio.cancel_undone(records, 3, 2)]
+
+
+def assertOffsetsPointAtRecords():
+    indexed = 0
+    with open(fio.LOG_PATH, "rb") as f:
+        data = f.read()
+    for uoid in {student[2] for student in SDM.StudentRoster.values()}:
+        for offset in fio.log_offsets(uoid):
+            line = data[offset:data.index(b"\n", offset)].decode()
+            assert line.split(fio.DELIMITER)[5] == uoid
+            assert fio.check_log_record(line.encode() + b"\n") is not False
+            indexed += 1
+    assert indexed == data.count(b"\n") - 1
+
+
+def test_offsets_follow_appends_and_rebuilds(roster):
+    logCalls(0, 30)
+    assertOffsetsPointAtRecords()
+    offsets = {uoid: fio.log_offsets(uoid) for uoid in (student[2] for student in roster)}
+
+    # An index read back from its file, and one built from scratch, find the same records
+    fio._log_index = None
+    assert {uoid: fio.log_offsets(uoid) for uoid in offsets} == offsets
+    os.remove(fio.LOG_INDEX_PATH)
+    fio._log_index = None
+    assert fio.rebuild_log_index() == 31
+    assert {uoid: fio.log_offsets(uoid) for uoid in offsets} == offsets
+
+    logCalls(0, 5)
+    assertOffsetsPointAtRecords()
+
+
+def test_history_is_the_same_across_an_archive(roster, monkeypatch):
+    logCalls(3, 12)
+    uoids = [student[2] for student in roster]
+    before = {uoid: fio.student_history(uoid) for uoid in uoids}
+    assert before == {uoid: scannedHistory(uoid) for uoid in uoids}
+    assert sum(map(len, before.values())) == 4 * 11
+
+    assert fio.archive_logs() == 3 * 13
+    assertOffsetsPointAtRecords()
+    assert {uoid: fio.student_history(uoid) for uoid in uoids} == before
+
+    # Once the archive index is loaded a lookup doesn't open the archives
+    scan_log = fio.scan_log
+    monkeypatch.setattr(fio, "scan_log", None)
+    assert {uoid: fio.student_history(uoid) for uoid in uoids} == before
+    fio._archive_index = None
+    assert {uoid: fio.student_history(uoid) for uoid in uoids} == before
+    monkeypatch.setattr(fio, "scan_log", scan_log)
+
+    # Archives made before the archive index existed are indexed on first use
+    os.remove(fio.ARCHIVE_INDEX_PATH)
+    fio._archive_index = None
+    assert {uoid: fio.student_history(uoid) for uoid in uoids} == before
+
+    logCalls(0, 4)
+    assertOffsetsPointAtRecords()
+    assert {uoid: fio.student_history(uoid) for uoid in uoids} == {uoid: scannedHistory(uoid) for uoid in uoids}
@@ -0,0 +1,142 @@
+import datetime
+import os
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+
+def logDays(days, callsPerDay):
+    """Logs callsPerDay calls on each of the days before today, and returns them as (UO ID, flagged) oldest first."""
+    ids = list(SDM.StudentRoster)
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time(9)) - datetime.timedelta(days=days)
+    calls = [(ids[i % len(ids)], i % 3 == 0, start + datetime.timedelta(days=i // callsPerDay, minutes=i % callsPerDay))
+             for i in range(days * callsPerDay)]
+    fio.log_cold_calls(calls)
+    return [(SDM.StudentRoster[uid][2], str(flagged)) for uid, flagged, when in calls]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "lzma"])
+def test_archived_logs_read_back_the_same(roster, compression):
+    logged = logDays(3, 10)
+    assert list(fio.scan_logs(("uoid", "flagged"))) == logged
+
+    assert fio.archive_logs(compression=compression) == 30
+    assert len(fio.log_archive_paths()) == 3
+    assert list(fio.scan_logs(("uoid", "flagged"))) == logged
+    assert list(fio.scan_logs(("uoid",), include_archives=False)) == []
+    assert fio.verify_log().checksum
+
+
+def test_archiving_again_the_same_day_leaves_the_live_log_alone(roster):
+    logDays(2, 5)
+    fio.log_cold_calls([(uid, False, datetime.datetime.now()) for uid in list(SDM.StudentRoster)[:3]])
+    assert fio.archive_logs() == 10
+    before = os.stat(fio.LOG_PATH)
+
+    assert fio.archive_logs() == 0
+    after = os.stat(fio.LOG_PATH)
+    assert (after.st_ino, after.st_mtime_ns, after.st_size) == (before.st_ino, before.st_mtime_ns, before.st_size)
+    assert not os.path.exists(fio.LOG_PATH + ".tmp")
+    assert len(list(fio.scan_logs(("uoid",), include_archives=False))) == 3
+
+
+def editLine(path, number, old, new):
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    lines[number] = lines[number].replace(old, new, 1)
+    with open(path, "wb") as f:
+        f.writelines(lines)
+
+
+@pytest.mark.parametrize("chunk_size", [fio.VERIFY_CHUNK_SIZE, 512])
+def test_clean_log_verifies(roster, chunk_size):
+    logDays(2, 20)
+    verification = fio.verify_log(chunk_size=chunk_size, workers=2)
+    assert (verification.records, verification.bad, verification.checksum, verification.unchecksummed_bytes) == (40, [], True, 0)
+
+
+@pytest.mark.parametrize("chunk_size", [fio.VERIFY_CHUNK_SIZE, 512])
+def test_edited_and_torn_records_are_found(roster, chunk_size):
+    logDays(2, 20)
+    editLine(fio.LOG_PATH, 5, b"Student", b"Studxnt")
+    with open(fio.LOG_PATH, "ab") as f:
+        f.write(b"2026/01/01\t09:00:00\tFal")
+
+    verification = fio.verify_log(chunk_size=chunk_size, workers=2)
+    assert [(line, reason) for line, reason, text in verification.bad] == [
+        (6, "checksum does not match the record"), (42, "3 columns instead of 10")]
+    assert verification.checksum is False
+    assert verification.records == 39
+
+
+def test_quarantine_moves_bad_lines_out(roster):
+    logged = logDays(2, 20)
+    editLine(fio.LOG_PATH, 5, b"Student", b"Studxnt")
+    uoid = logged[4][0]
+    calls = len(fio.student_history(uoid))
+
+    verification = fio.verify_log(quarantine=True)
+    with open(verification.quarantine_path) as f:
+        assert "Studxnt" in f.read()
+    with open(fio.LOG_PATH) as f:
+        assert "Studxnt" not in f.read()
+
+    again = fio.verify_log()
+    assert (again.records, again.bad, again.checksum) == (39, [], True)
+    # The index of the live log was rebuilt, so the student's history lost only the bad call
+    assert len(fio.student_history(uoid)) == calls - 1
+
+
+def test_export_only_reads_other_logs(roster):
+    logDays(1, 20)
+    fio.flush_log_checksums()
+    other = "other_laptop.txt"
+    with open(fio.LOG_PATH, "rb") as f, open(other, "wb") as copy:
+        copy.write(f.read())
+    editLine(other, 5, b"Student", b"Studxnt")
+    with open(other, "rb") as f:
+        before = f.read()
+
+    verifications = fio.export_final_participation("participation.txt", log_paths=[other])
+    assert len(verifications[0].bad) == 1 and verifications[0].quarantine_path is None
+    with open(other, "rb") as f:
+        assert f.read() == before
+    with open("participation.txt") as f:
+        assert sum(int(line.split(fio.DELIMITER)[0]) for line in list(f)[1:]) == 19
+
+
+def test_checksum_falls_behind_the_log_by_at_most_the_flush_interval(roster, monkeypatch):
+    logDays(1, 5)
+    # The first records are checksummed on disk right away, the ones right after them wait in memory
+    covered, crc = fio._read_log_checksum(fio.LOG_PATH)
+    assert (covered, crc) == fio._file_crc(fio.LOG_PATH)
+    logDays(1, 5)
+    assert fio._read_log_checksum(fio.LOG_PATH) == (covered, crc)
+
+    # Once the last write is old enough the next record writes the checksum, whatever sink flushes
+    monkeypatch.setattr(fio, "LOG_CHECKSUM_FLUSH_SECONDS", 0.0)
+    logDays(1, 1)
+    assert fio._read_log_checksum(fio.LOG_PATH) == fio._file_crc(fio.LOG_PATH)
+    assert fio.verify_log().checksum
+
+
+def test_flushing_skips_logs_whose_folder_is_gone(roster, tmp_path):
+    folder = tmp_path / "gone"
+    folder.mkdir()
+    sink = fio.FileSink(str(folder / "log.txt"))
+    fio.log_cold_calls([(uid, False, datetime.datetime.now()) for uid in list(SDM.StudentRoster)[:2]], sink)
+    fio.log_cold_calls([(uid, False, datetime.datetime.now()) for uid in list(SDM.StudentRoster)[:2]], sink)
+    for path in folder.iterdir():
+        path.unlink()
+    folder.rmdir()
+
+    fio.flush_log_checksums()
+    assert not folder.exists() and not fio._unwritten_log_checksums
+
+
+def test_call_counts_leave_out_undone_calls(roster):
+    first, second = list(SDM.StudentRoster)[:2]
+    now = datetime.datetime.now()
+    fio.log_cold_calls([(first, False, now), (first, True, now), (second, False, now)])
+    fio.log_undo(second)
+    assert fio.call_counts() == {first: 2}
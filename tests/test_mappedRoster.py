@@ -0,0 +1,93 @@
+import array
+import random
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from mappedRoster import MappedRoster, MappedStudentQueue, writeRoster
+from StudentQueue import StudentQueue, UniformPolicy, CooldownPolicy, WeightedPolicy
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    """A mapped roster file of 40 generated students, closed after the test."""
+    path = str(tmp_path / "students")
+    writeRoster(path, 40, seed=3)
+    roster = MappedRoster(path)
+    yield roster
+    roster.close()
+
+
+def uoids(queue):
+    return [queue.student(position)[2] for position in queue.queue]
+
+
+def test_entries_are_read_like_an_import(tmp_path):
+    path = str(tmp_path / "students")
+    with open(path, "w") as f:
+        f.write("Ada\tLovelace\t951000001\tada@uoregon.edu\tAyda\t\n\n  \nAlan\tTuring\t951000002\talan@uoregon.edu\n"
+                "Grace\tHopper\t951000003\tgrace@uoregon.edu\tGrace\t1234")
+    roster = MappedRoster(path)
+    assert len(roster) == 3
+    assert roster[0] == ("Ada", "Lovelace", "951000001", "ada@uoregon.edu", "Ayda", "")
+    assert roster[1] == ("Alan", "Turing", "951000002", "alan@uoregon.edu", "Alan", "")
+    assert roster[2] == ("Grace", "Hopper", "951000003", "grace@uoregon.edu", "Grace", "1234")
+    roster.close()
+
+    open(path, "w").close()
+    empty = MappedRoster(path)
+    assert len(empty) == 0
+    empty.close()
+
+
+def callInTurn(queue, calls=300):
+    """Calls on each deck spot in turn, returning the names on deck before every call."""
+    decks = []
+    for call in range(calls):
+        decks.append(queue.getOnDeckStudents())
+        queue.processOnDeckStudents(queue.getOnDeckIds()[call % queue.deckSize])
+    return decks
+
+
+@pytest.mark.parametrize("policy", [UniformPolicy, lambda: CooldownPolicy(cooldown=6)])
+def test_calls_move_students_the_same_as_the_in_memory_queue(mapped, policy, monkeypatch):
+    monkeypatch.setattr(SDM, "Listeners", [])
+    SDM.LoadRoster([mapped[position] for position in range(len(mapped))])
+    # Both queues draw from the same random numbers, so each makes all of its calls from the same seed
+    random.seed(9)
+    inMemory = StudentQueue([mapped[position] for position in range(len(mapped))], policy())
+    expected = callInTurn(inMemory)
+    random.seed(9)
+    queue = MappedStudentQueue(mapped, policy())
+
+    assert callInTurn(queue) == expected
+    assert uoids(queue) == [SDM.StudentRoster[studentId][2] for studentId in inMemory.queue]
+    assert isinstance(queue.queue, array.array)
+    # Only the on deck students are held in memory
+    queue.getOnDeckStudents()
+    assert sorted(queue.window) == sorted(queue.getOnDeckIds())
+    assert [student[2] for student in queue.sendQueue()] == [student[2] for student in inMemory.sendQueue()]
+
+
+def test_positions_round_trip_and_roster_changes_keep_an_array(mapped, tmp_path):
+    random.seed(10)
+    queue = MappedStudentQueue(mapped, CooldownPolicy(cooldown=5))
+    for _ in range(30):
+        queue.processOnDeckStudents(queue.getOnDeckIds()[0])
+    queue.savePositions(str(tmp_path / "positions"))
+    assert (tmp_path / "positions").stat().st_size == 4 * len(mapped)
+
+    loaded = MappedStudentQueue.loadPositions(mapped, str(tmp_path / "positions"), CooldownPolicy(cooldown=5))
+    assert loaded.queue == queue.queue
+
+    loaded.removeStudents([loaded.queue[0], loaded.queue[-1], 7])
+    assert len(loaded.queue) == len(mapped) - 3 and 7 not in loaded.queue
+    loaded.addStudents([7])
+    assert isinstance(loaded.queue, array.array)
+    assert sorted(loaded.queue) == sorted(set(range(len(mapped))) - {queue.queue[0], queue.queue[-1]})
+    # A student added back goes somewhere behind the deck
+    assert 7 not in loaded.getOnDeckIds()
+
+
+def test_weighted_policy_is_refused(mapped):
+    with pytest.raises(ValueError):
+        MappedStudentQueue(mapped, WeightedPolicy())
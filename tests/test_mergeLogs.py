@@ -0,0 +1,72 @@
+import datetime
+import gzip
+import shutil
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+START = datetime.datetime(2026, 1, 5, 9)
+
+
+def logTo(path, calls):
+    """Logs (student number, minutes after START, flagged) calls to the log at path."""
+    ids = list(SDM.StudentRoster)
+    fio.log_cold_calls([(ids[number], flagged, START + datetime.timedelta(minutes=minutes)) for number, minutes, flagged in calls],
+                       fio.FileSink(path))
+
+
+def merged(paths):
+    return list(fio.scan_merged_logs(paths, ("date", "time", "uoid", "flagged")))
+
+
+@pytest.fixture
+def laptops(roster):
+    # Two laptops used in turns during the same classes, one of them with a day already archived
+    logTo("laptop_a.txt", [(0, 0, False), (1, 10, True), (2, 20, False), (3, 40, False)])
+    logTo("laptop_b.txt", [(4, 5, False), (5, 15, False), (6, 20, True), (7, 45, True)])
+    logTo("laptop_b_old.txt", [(8, -1440, False), (9, -1430, False)])
+    with open("laptop_b_old.txt", "rb") as f, gzip.open("laptop_b_old.txt.gz", "wb") as archive:
+        shutil.copyfileobj(f, archive)
+    return ["laptop_a.txt", "laptop_b.txt", "laptop_b_old.txt.gz"]
+
+
+def test_merged_records_are_in_time_order(laptops):
+    records = merged(laptops)
+    uoids = [SDM.StudentRoster[sid][2] for sid in SDM.StudentRoster]
+    assert [uoids.index(record[2]) for record in records] == [8, 9, 0, 4, 1, 5, 2, 6, 3, 7]
+    assert [record[0:2] for record in records] == sorted(record[0:2] for record in records)
+    # Records of the same second keep the order of the logs they came from
+    assert [record[3] for record in records[6:8]] == ["False", "True"]
+
+
+def test_duplicate_records_are_kept_once(laptops):
+    shutil.copy("laptop_a.txt", "laptop_a_copy.txt")
+    assert merged(laptops + ["laptop_a_copy.txt"]) == merged(laptops)
+
+    # A log merged earlier holds copies of the records of the logs it was merged from
+    assert fio.write_merged_log(laptops[0:2], "merged.txt") == 8
+    assert merged(["merged.txt"] + laptops) == merged(laptops)
+
+    # Two calls of one student a minute apart are not duplicates, only the same record twice is
+    logTo("laptop_c.txt", [(0, 0, False), (0, 1, False)])
+    assert len(merged(["laptop_c.txt", "laptop_c.txt"])) == 2
+
+
+def flaggedUoids():
+    ids = list(SDM.StudentRoster)
+    return {SDM.StudentRoster[ids[number]][2] for number in (1, 6, 7)}
+
+
+def test_export_of_merged_logs(laptops):
+    fio.write_merged_log(laptops + ["laptop_a.txt"], "merged.txt")
+    assert fio.write_merged_log(["merged.txt"], "merged_again.txt") == 10
+    with pytest.raises(ValueError):
+        fio.write_merged_log(["merged.txt"], "merged.txt")
+
+    fio.export_final_participation("participation.txt", log_paths=laptops + ["laptop_a.txt"])
+    with open("participation.txt") as f:
+        rows = [line.rstrip("\n").split(fio.DELIMITER) for line in list(f)[1:]]
+    assert len(rows) == 10
+    assert all((row[0], row[1]) == ("1", "1" if row[4] in flaggedUoids() else "0") for row in rows)
+    # Every student's dates come from the merged logs, oldest first
+    assert [row[7] for row in rows][:2] == ["[2026/01/04]", "[2026/01/04]"]
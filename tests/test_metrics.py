@@ -0,0 +1,84 @@
+import os
+import urllib.request
+import pytest
+import fileIO as fio
+
+
+@pytest.fixture
+def metrics(workdir, monkeypatch):
+    """Starts the test with every counter and gauge at zero, returning the counters."""
+    monkeypatch.setattr(fio, "IO_COUNTERS", {})
+    monkeypatch.setattr(fio, "IO_GAUGES", {})
+    return fio.IO_COUNTERS
+
+
+def test_opens_and_bytes_are_counted_for_every_mode(metrics):
+    with fio._counted_open("file", "w", "writer") as f:
+        f.write("x" * 100)
+    with fio._counted_open("file", "a", "appender") as f:
+        f.write("y" * 20)
+    with fio._counted_open("file", "r", "reader") as f:
+        f.read(50)
+    with fio._counted_open("file", "r+", "updater") as f:
+        f.read(10)
+        f.write("z" * 5)
+
+    assert metrics[("coldcall_io_bytes_written_total", "writer")] == 100
+    assert metrics[("coldcall_io_bytes_written_total", "appender")] == 20
+    # Reads go through a buffer, so the whole small file is read from disk at once
+    assert metrics[("coldcall_io_bytes_read_total", "reader")] == 120
+    assert metrics[("coldcall_io_bytes_read_total", "updater")] == 120
+    assert metrics[("coldcall_io_bytes_written_total", "updater")] == 5
+    assert all(metrics[("coldcall_io_opens_total", name)] == 1 for name in ("writer", "appender", "reader", "updater"))
+
+
+def test_saves_records_and_roster_size_are_counted(metrics, roster):
+    fio.save_queue(roster)
+    full = os.path.getsize("./data/queue_order")
+    # The second save writes over the first in place, so only the shorter queue is written
+    fio.save_queue(roster[:5])
+    fio.log_cold_calls([(uid, False, fio.datetime.datetime.now()) for uid in range(3)])
+    fio.load_queue()
+
+    assert metrics[("coldcall_queue_saves_total", "save_queue")] == 2
+    assert metrics[("coldcall_io_bytes_written_total", "save_queue")] == full + os.path.getsize("./data/queue_order")
+    assert metrics[("coldcall_log_records_written_total", "log_cold_call")] == 3
+    assert fio.IO_GAUGES[("coldcall_roster_students", "load_queue")] == 5
+
+
+def test_metrics_are_written_and_served_in_the_prometheus_format(metrics):
+    fio._count("coldcall_io_opens_total", "b_function", 2)
+    fio._count("coldcall_io_opens_total", "a_function")
+    fio._gauge("coldcall_roster_students", "load_queue", 40)
+    expected = (
+        "# HELP coldcall_io_opens_total Files opened by each fileIO function.\n"
+        "# TYPE coldcall_io_opens_total counter\n"
+        'coldcall_io_opens_total{function="a_function"} 1\n'
+        'coldcall_io_opens_total{function="b_function"} 2\n'
+        "# HELP coldcall_roster_students Students in the most recently loaded roster.\n"
+        "# TYPE coldcall_roster_students gauge\n"
+        'coldcall_roster_students{function="load_queue"} 40\n'
+    )
+    assert fio.metrics_text() == expected
+
+    fio.write_metrics("./data/metrics/fileio.prom")
+    with open("./data/metrics/fileio.prom") as f:
+        assert f.read() == expected
+    assert os.listdir("./data/metrics") == ["fileio.prom"]
+
+    server = fio.serve_metrics(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.read().decode() == expected
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_import_records_its_peak_memory(metrics):
+    @fio._track_memory
+    def import_students():
+        return [bytes(1024) for _ in range(100)]
+
+    assert len(import_students()) == 100
+    assert fio.IO_GAUGES[("coldcall_peak_memory_bytes", "import_students")] >= 100 * 1024
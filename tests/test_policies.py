@@ -0,0 +1,126 @@
+import random
+import pytest
+from StudentQueue import StudentQueue, WeightedPolicy, CooldownPolicy
+
+
+def callRandomly(queue, calls):
+    """Calls on a random on deck student calls times, returning the moves and the queue before each one."""
+    moves, before = [], []
+    for _ in range(calls):
+        before.append(list(queue.queue))
+        moves.append(queue.processOnDeckStudents(queue.getOnDeckIds()[random.randrange(queue.deckSize)]))
+    return moves, before
+
+
+@pytest.mark.parametrize("weighting", ["participation", "recency"])
+def test_weighted_undo_and_redo_are_exact(roster, weighting):
+    queue = StudentQueue(roster, WeightedPolicy(weighting))
+    moves, before = callRandomly(queue, 200)
+    after = list(queue.queue)
+
+    for move, state in zip(reversed(moves), reversed(before)):
+        queue.undoMove(move)
+        assert queue.queue == state
+    assert queue.policy.clock == 0 and queue.policy.counts == {} and queue.policy.lastCalled == {}
+
+    for move in moves:
+        queue.redoMove(move)
+    assert queue.queue == after
+
+
+@pytest.mark.parametrize("weighting", ["participation", "recency"])
+def test_weighted_call_keeps_everyone_and_only_swaps(roster, weighting):
+    queue = StudentQueue(roster, WeightedPolicy(weighting))
+    for _ in range(100):
+        before = list(queue.queue)
+        called = queue.getOnDeckIds()[random.randrange(queue.deckSize)]
+        queue.processOnDeckStudents(called)
+        assert sorted(queue.queue) == sorted(before)
+        assert called not in queue.getOnDeckIds()
+        assert sum(a != b for a, b in zip(before, queue.queue)) == 2
+        # Only students off the deck have a weight
+        assert all(value == 0 for value in queue.policy.weights.values[:queue.deckSize])
+
+
+def test_weighted_ignores_students_off_the_deck(roster):
+    queue = StudentQueue(roster, WeightedPolicy())
+    before = list(queue.queue)
+    total = queue.policy.weights.total()
+
+    assert queue.processOnDeckStudents(queue.queue[queue.deckSize + 1]) is None
+    assert queue.queue == before
+    assert queue.policy.weights.total() == total
+
+
+def test_weighted_participation_favours_students_called_less(roster):
+    queue = StudentQueue(roster, WeightedPolicy("participation"))
+    favoured = queue.queue[-1]
+    queue.policy.counts = {studentId: 50 for studentId in queue.queue if studentId != favoured}
+    queue.policy.attach(queue.queue, queue.deckSize)
+
+    # Everyone else off the deck has a weight of 1/51, so the favoured student (weight 1) comes on deck about 3 times in 4
+    picked = 0
+    for _ in range(400):
+        move = queue.processOnDeckStudents(queue.getOnDeckIds()[0])
+        picked += favoured in queue.getOnDeckIds()
+        queue.undoMove(move)
+    assert picked > 250
+
+
+def test_weighted_recency_survives_reordering(roster):
+    queue = StudentQueue(roster, WeightedPolicy("recency"))
+    callRandomly(queue, 30)
+    lastCalled = dict(queue.policy.lastCalled)
+
+    queue.randomize()
+    assert queue.policy.lastCalled == lastCalled
+    queue.removeStudents([queue.queue[-1]])
+    assert queue.policy.clock == 30
+    for slot, studentId in enumerate(queue.queue[queue.deckSize:], start=queue.deckSize):
+        assert queue.policy.weights.values[slot] == lastCalled.get(studentId, 0)
+
+
+def test_cooldown_keeps_called_students_off_the_deck(roster):
+    queue = StudentQueue(roster, CooldownPolicy(cooldown=8))
+    lastCalled = {}
+    for call in range(500):
+        for studentId in queue.getOnDeckIds():
+            assert call - lastCalled.get(studentId, -100) > 8
+        called = queue.getOnDeckIds()[random.randrange(queue.deckSize)]
+        queue.processOnDeckStudents(called)
+        lastCalled[called] = call
+
+
+def test_cooldown_undo_redo_and_reload_are_exact(roster):
+    queue = StudentQueue(roster, CooldownPolicy(cooldown=8))
+    moves, before = callRandomly(queue, 100)
+    after = list(queue.queue)
+
+    for move, state in zip(reversed(moves), reversed(before)):
+        queue.undoMove(move)
+        assert queue.queue == state
+    for move in moves:
+        queue.redoMove(move)
+    assert queue.queue == after
+
+    # A saved queue keeps the students that are cooling down at its end, oldest first
+    reloaded = StudentQueue(queue.sendQueue(), CooldownPolicy(cooldown=8))
+    assert reloaded.queue == queue.queue
+
+
+@pytest.mark.parametrize("weighting", ["participation", "recency"])
+def test_weighted_sample_falls_back_when_the_tree_drifts(roster, weighting, monkeypatch):
+    queue = StudentQueue(roster, WeightedPolicy(weighting))
+    callRandomly(queue, 10)
+    tree = queue.policy.weights if weighting == "participation" else queue.policy.eligible
+    # The tree still holds the weight of the last slot but the slot itself has none, like after the float sums drift,
+    # so every sample lands on a slot without weight
+    last = len(queue.queue) - 1
+    tree.values[last] = 0
+    monkeypatch.setattr(random, "random", lambda: 0.9999999)
+
+    called = queue.getOnDeckIds()[0]
+    pulled = queue.queue[last - 1]
+    move = queue.processOnDeckStudents(called)
+    assert move is not None
+    assert called not in queue.getOnDeckIds() and pulled in queue.getOnDeckIds()
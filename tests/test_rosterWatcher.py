@@ -0,0 +1,105 @@
+import random
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from deckController import DeckController
+from rosterWatcher import RosterWatcher
+from StudentQueue import StudentQueue
+
+
+class Window:
+    """Stands in for the tkinter window whose timer the watcher runs on."""
+
+    def __init__(self):
+        self.timers = {}
+        self.next = 0
+
+    def after(self, ms, callback):
+        self.next += 1
+        self.timers[self.next] = callback
+        return self.next
+
+    def after_cancel(self, timer):
+        del self.timers[timer]
+
+
+def makeStudents(count, rng):
+    """Students whose names are letters only, as a roster file needs them."""
+    name = lambda: "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(7)).capitalize()
+    students = []
+    for i in range(count):
+        fname, lname = name(), name()
+        students.append([fname, lname, str(951100000 + i), f"{fname.lower()}{i}@uoregon.edu", fname, ""])
+    return students
+
+
+def writeRoster(students, extra=""):
+    with open("roster.txt", "w") as f:
+        f.write("".join(fio.DELIMITER.join(student[0:5]) + "\n" for student in students) + extra)
+
+
+@pytest.fixture
+def watched(workdir):
+    """A deck over an imported roster file of 12 students, and a started watcher of the file."""
+    students = makeStudents(16, random.Random(8))
+    writeRoster(students[:12])
+    SDM.LoadRoster(fio.iter_roster_file("roster.txt"))
+    deck = DeckController(StudentQueue(list(fio.iter_roster_file("roster.txt"))))
+    window = Window()
+    watcher = RosterWatcher(window, "roster.txt", deck.applyRosterChange)
+    watcher.start()
+    watcher.start()
+    assert len(window.timers) == 1
+    return deck, watcher, window, students
+
+
+def poll(window):
+    (timer, callback), = window.timers.items()
+    del window.timers[timer]
+    callback()
+
+
+def test_unchanged_roster_changes_nothing(watched):
+    deck, watcher, window, students = watched
+    before = list(deck.queue.queue)
+    poll(window)
+    poll(window)
+    assert deck.queue.queue == before
+    assert len(window.timers) == 1
+
+    watcher.stop()
+    assert window.timers == {}
+
+
+def test_created_changed_and_removed_students_reach_the_queue(watched):
+    deck, watcher, window, students = watched
+    onDeck = deck.deckIds()[1]
+    removed = SDM.StudentRoster[onDeck]
+    changedId = deck.queue.queue[-1]
+    changed = SDM.StudentRoster[changedId]
+
+    edited = [student for student in students[:12] if student[2] != removed[2]]
+    edited = [["Corrected", *student[1:]] if student[2] == changed[2] else student for student in edited] + students[12:14]
+    writeRoster(edited)
+    poll(window)
+
+    queued = {SDM.StudentRoster[studentId][2]: studentId for studentId in deck.queue.queue}
+    assert sorted(queued) == sorted(student[2] for student in edited)
+    assert onDeck not in deck.deckIds() and deck.queue.numStudents() == 13
+    assert queued[changed[2]] == changedId and SDM.StudentRoster[changedId][0] == "Corrected"
+    assert SDM.FindStudents("Corrected", changed[1]) == [changedId]
+    # The new roster and the queue are saved, so they are there the next time the program opens
+    assert sorted(student[2] for student in fio.load_new_queue()) == sorted(queued)
+    assert [student[2] for student in fio.load_queue()] == [SDM.StudentRoster[studentId][2] for studentId in deck.queue.queue]
+
+
+def test_half_saved_roster_waits_for_the_next_change(watched):
+    deck, watcher, window, students = watched
+    before = list(deck.queue.queue)
+    writeRoster(students[:13], "Half\tWrit")
+    poll(window)
+    assert deck.queue.queue == before
+
+    writeRoster(students[:13])
+    poll(window)
+    assert deck.queue.numStudents() == 13
@@ -0,0 +1,70 @@
+"""The memory mapped scanner of the live log has to find the same records as splitting the log line by line."""
+
+import datetime
+import random
+import pytest
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+
+COLUMN_SETS = [fio.LOG_COLUMNS, ("uoid",), ("crc", "date"), ("flagged", "uoid"), ("time", "fname", "phonetic")]
+
+MALFORMED = [
+    b"",
+    b"   ",
+    b"\r",
+    b"2026/03/02",
+    b"2026/03/02\t09:30:00\tFalse",
+    b"\t\t\t\t\t\t\t\t\t",
+    b"2026/03/02\t09:30:00\tFalse\tAda\tLovelace\t951000000\tada@uoregon.edu\tAda\t\t1234 \t",
+    b"2026/03/02\t09:30:00\tTrue\tAda\tLovelace\t951000000\tada@uoregon.edu\tAda\t\t1234\r",
+    b"  2026/03/02\t09:30:00\tTrue\tAda\tLove\rlace\t951000000\tada@uoregon.edu\tAda\t\t1234",
+    b"2026/03/02\t09:30:00\tFalse\tAda\tLovelace\t951000000\tada@uoregon.edu\tAda\t\t1234\textra\tcolumns",
+    b"2026/03/02\t09:30:00\tFalse\tAda\t\x0b",
+    b"ab\t\t cd \x0c",
+]
+
+
+def scanBothWays(path, columns, checked):
+    indexes = tuple(fio.LOG_COLUMNS.index(column) for column in columns)
+    with open(path, "rb") as f:
+        expected = list(fio._split_records(f, indexes, checked=checked))
+    return list(fio.scan_log(path, columns, checked)), expected
+
+
+@pytest.fixture
+def log(roster):
+    """A live log of well formed records with the malformed and short lines mixed in, without a newline at its end."""
+    fio.log_cold_calls([(uid, i % 2 == 0, datetime.datetime(2026, 3, 2, 9, i)) for i, uid in enumerate(list(SDM.StudentRoster)[:12])])
+    with open(fio.LOG_PATH, "rb") as f:
+        lines = f.read().split(b"\n")
+    header, records = lines[0], lines[1:-1]
+    mixed = records[:4] + MALFORMED + records[4:] + [b"2026/03/02\t09:30"]
+    with open(fio.LOG_PATH, "wb") as f:
+        f.write(b"\n".join([header] + mixed))
+    return fio.LOG_PATH
+
+
+@pytest.mark.parametrize("columns", COLUMN_SETS)
+@pytest.mark.parametrize("checked", [False, True])
+def test_mapped_scan_matches_split_records(log, columns, checked):
+    scanned, expected = scanBothWays(log, columns, checked)
+    assert scanned == expected
+    assert len(expected) >= (12 if checked else 20)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_mapped_scan_matches_split_records_on_random_lines(workdir, seed):
+    rng = random.Random(seed)
+    alphabet = ["a", "1", "\t", "\t", "\t", " ", "\r", "\x0b", "\n"]
+    with open(fio.LOG_PATH, "w", newline="") as f:
+        f.write("header\n" + "".join(rng.choice(alphabet) for _ in range(5000)))
+    for columns in COLUMN_SETS:
+        scanned, expected = scanBothWays(fio.LOG_PATH, columns, False)
+        assert scanned == expected
+
+
+def test_header_only_and_empty_logs_have_no_records(workdir):
+    for contents in (b"", b"header", b"header\n", b"header\n\n  \n"):
+        with open(fio.LOG_PATH, "wb") as f:
+            f.write(contents)
+        assert scanBothWays(fio.LOG_PATH, ("uoid",), False) == ([], [])
@@ -0,0 +1,84 @@
+import datetime
+import os
+import fileIO as fio
+from studentDataManager import StudentDataManager as SDM
+from deckController import DeckController
+from StudentQueue import StudentQueue
+
+
+class ClosingSink(fio.MemorySink):
+    """A MemorySink that counts flushes and closes."""
+
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+        self.closes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        self.closes += 1
+
+
+def calls(count, start=0):
+    uids = list(SDM.StudentRoster)
+    return [(uids[(start + i) % len(uids)], i % 2 == 1, datetime.datetime(2026, 3, 2, 10, i % 60)) for i in range(count)]
+
+
+def test_memory_sink_keeps_the_newest_calls_up_to_its_capacity(roster):
+    sink = fio.MemorySink(capacity=5)
+    fio.log_cold_calls(calls(3), sink)
+    assert sink.written == 3 and [call.uid for call in sink.calls] == [uid for uid, _, _ in calls(3)]
+
+    fio.log_cold_calls(calls(4, start=3), sink)
+    assert sink.written == 7
+    assert [(call.uid, call.flagged) for call in sink.calls] == [(uid, flagged) for uid, flagged, _ in (calls(3) + calls(4, start=3))[2:]]
+    assert sink.calls[-1].student_data == SDM.StudentRoster[sink.calls[-1].uid]
+
+
+def test_null_sink_only_counts(roster):
+    sink = fio.NullSink()
+    fio.log_cold_calls(calls(6), sink)
+    fio.log_undo(list(SDM.StudentRoster)[0], sink=sink)
+    assert sink.written == 7
+    assert not os.path.exists(fio.LOG_PATH)
+
+
+def test_fanout_writes_flushes_and_closes_every_sink(roster):
+    first, counting, closing = fio.MemorySink(), fio.NullSink(), ClosingSink()
+    sink = fio.FanoutSink(first, counting, closing, fio.FileSink())
+    fio.log_cold_calls(calls(4), sink)
+
+    assert list(first.calls) == list(closing.calls) and len(first.calls) == 4
+    assert counting.written == 4
+    assert len(list(fio.scan_logs(("uoid",)))) == 4
+    # Sinks without flush or close (the memory and null sinks) are skipped
+    sink.flush()
+    sink.close()
+    assert (closing.flushes, closing.closes) == (1, 1)
+    assert fio._read_log_checksum(fio.LOG_PATH) == fio._file_crc(fio.LOG_PATH)
+
+
+def test_calls_go_to_the_chosen_sink(roster):
+    default = fio.get_log_sink()
+    sink = fio.MemorySink()
+    fio.set_log_sink(sink)
+    try:
+        fio.log_cold_call(list(SDM.StudentRoster)[1], flagged=True)
+        assert fio.get_log_sink() is sink
+    finally:
+        fio.set_log_sink(default)
+    assert [(call.uid, call.flagged, call.undo) for call in sink.calls] == [(list(SDM.StudentRoster)[1], True, False)]
+    assert not os.path.exists(fio.LOG_PATH)
+
+
+def test_deck_without_persistence_writes_nothing(roster):
+    deck = DeckController(StudentQueue(roster), persist=False)
+    for _ in range(3):
+        deck.left()
+        deck.flag()
+        deck.flush()
+    deck.close()
+    assert deck.sink.written == 3
+    assert os.listdir("./data") == ["logs"] and os.listdir("./data/logs") == []
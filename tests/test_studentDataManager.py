@@ -0,0 +1,61 @@
+import pytest
+from studentDataManager import StudentDataManager as SDM
+
+
+@pytest.fixture
+def emptyRoster(monkeypatch):
+    """A StudentDataManager that has never seen a student."""
+    monkeypatch.setattr(SDM, "StudentRoster", {})
+    monkeypatch.setattr(SDM, "StudentIds", {})
+    monkeypatch.setattr(SDM, "NameIndex", {})
+    monkeypatch.setattr(SDM, "NextId", 0)
+    changes = []
+    monkeypatch.setattr(SDM, "Listeners", [lambda *change: changes.append(change)])
+    return changes
+
+
+def student(fname, lname, uoid):
+    return [fname, lname, uoid, f"{fname.lower()}@uoregon.edu", fname, ""]
+
+
+def test_students_with_the_same_name_get_their_own_ids(emptyRoster):
+    first = student("Sam", "Lee", "951000001")
+    second = student("Sam", "Lee", "951000002")
+    SDM.LoadRoster([first, second])
+
+    ids = SDM.FindStudents("Sam", "Lee")
+    assert len(ids) == 2 and ids[0] != ids[1]
+    assert [SDM.StudentRoster[sid] for sid in ids] == [first, second]
+    assert SDM.GetStudentIdByName("Sam", "Lee") == ids[0]
+    assert [SDM.GetStudentId(first), SDM.GetStudentId(second)] == ids
+    assert SDM.FindStudents("Sam", "Park") == [] and SDM.GetStudentIdByName("Sam", "Park") is None
+
+
+def test_a_corrected_name_keeps_the_id(emptyRoster):
+    sid = SDM.AddStudent(student("Jon", "Smith", "951000003"))
+    corrected = student("John", "Smith", "951000003")
+
+    assert SDM.GetStudentId(corrected) == sid
+    assert SDM.StudentRoster == {sid: corrected}
+    assert SDM.FindStudents("Jon", "Smith") == []
+    assert SDM.FindStudents("John", "Smith") == [sid]
+    # The listeners are told it is the same student with a new entry, not a removal and an addition
+    assert emptyRoster[-1] == (sid, student("Jon", "Smith", "951000003"), corrected)
+
+
+def test_reloading_the_roster_reuses_ids(emptyRoster):
+    roster = [student(f"Name{i}", "Student", f"95100001{i}") for i in range(5)]
+    SDM.LoadRoster(roster)
+    ids = {entry[2]: SDM.GetStudentId(entry) for entry in roster}
+
+    # A reload in another order, without one student and with a new one, keeps the ids of the UOIDs it has seen
+    newcomer = student("New", "Student", "951000020")
+    SDM.LoadRoster([newcomer] + roster[:0:-1])
+    assert {entry[2]: SDM.GetStudentId(entry) for entry in roster[1:]} == {uoid: ids[uoid] for uoid in list(ids)[1:]}
+    assert SDM.GetStudentId(newcomer) not in ids.values()
+    assert ids[roster[0][2]] not in SDM.StudentRoster
+
+    # A student who comes back gets their old id, ids are never reused for someone else
+    SDM.LoadRoster(roster)
+    assert {entry[2]: SDM.GetStudentId(entry) for entry in roster} == ids
+    assert len(SDM.StudentRoster) == 5 and SDM.NextId == 6
@@ -0,0 +1,67 @@
+import random
+import pytest
+from studentDataManager import StudentDataManager as SDM
+from studentSearch import StudentSearchIndex
+from stressTest import makeRoster
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """A search index attached to a roster of 50 students, with its listener only registered for the test."""
+    monkeypatch.setattr(SDM, "Listeners", [])
+    SDM.LoadRoster(makeRoster(50, random.Random(4)))
+    return StudentSearchIndex().attach()
+
+
+def rebuilt():
+    """A search index built from scratch over the current roster."""
+    fresh = StudentSearchIndex()
+    for studentId, student in SDM.StudentRoster.items():
+        fresh.add(studentId, student)
+    return fresh
+
+
+def assertMatchesRoster(index):
+    fresh = rebuilt()
+    assert index.grams == fresh.grams and index.words == fresh.words
+    assert dict(index.postings) == dict(fresh.postings)
+
+
+def test_search_finds_names_phonetic_spellings_and_ids(index):
+    sid = SDM.AddStudent(["José", "Nuñez-Ortiz", "951777777", "jose@uoregon.edu", "Hosay", ""])
+    assert index.search("jose nunez")[0] == sid
+    assert index.search("hosay")[0] == sid
+    assert index.search("951777777")[0] == sid
+    assert index.search("ortz")[0] == sid
+    assert index.search("  ") == []
+
+
+def test_index_follows_every_change_to_the_roster(index):
+    rng = random.Random(5)
+    newcomers = iter(makeRoster(200, random.Random(6))[50:])
+    for _ in range(300):
+        students = list(SDM.StudentRoster.items())
+        change = rng.random()
+        if change < 0.4:
+            SDM.AddStudent(next(newcomers))
+        elif change < 0.7:
+            # A corrected name keeps the student's id
+            studentId, student = rng.choice(students)
+            SDM.AddStudent([student[0] + "e", "Renamed"] + list(student[2:]))
+        else:
+            SDM.RemoveStudent(rng.choice(students)[0])
+    assertMatchesRoster(index)
+
+    SDM.LoadRoster(makeRoster(30, random.Random(7)))
+    assertMatchesRoster(index)
+
+
+def test_renamed_and_removed_students_are_found_by_their_current_entry(index):
+    studentId, student = list(SDM.StudentRoster.items())[0]
+    SDM.AddStudent(["Zelda", "Quinterro", student[2], student[3], "Zelda", ""])
+    assert index.search("zelda")[0] == studentId
+    assert studentId not in index.search(f"{student[0]} {student[1]}")
+
+    SDM.RemoveStudent(studentId)
+    assert studentId not in index.search("zelda quinterro")
+    assert not any(studentId in students for students in index.postings.values())
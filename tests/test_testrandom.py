@@ -0,0 +1,33 @@
+import threading
+import fileIO as fio
+import testrandom as tr
+from studentDataManager import StudentDataManager as SDM
+
+
+def test_a_roster_copy_is_tested_without_touching_the_roster(roster):
+    open("./data/students", "w").close()
+    students = list(SDM.StudentRoster.items())
+    before = dict(SDM.StudentRoster)
+    changes = []
+    SDM.Listeners.append(lambda *change: changes.append(change))
+    sink = fio.MemorySink()
+    try:
+        assert tr.Main(workers=2, sink=sink, students=students) == f"Logged {tr.TRIALS * tr.CALLS} cold calls."
+    finally:
+        SDM.Listeners.pop()
+
+    # The roster the window reads was never rebuilt, and every call was logged with its entry from the copy
+    assert SDM.StudentRoster == before and changes == []
+    entries = dict(students)
+    assert all(call.student_data is entries[call.uid] for call in sink.calls)
+    assert [call.when for call in sink.calls] == sorted(call.when for call in sink.calls)
+
+
+def test_cancel_logs_nothing(roster):
+    open("./data/students", "w").close()
+    cancelled = threading.Event()
+    cancelled.set()
+    sink = fio.MemorySink()
+    assert tr.Main(cancelled=cancelled, workers=1, sink=sink, students=list(SDM.StudentRoster.items())) == \
+        "The test was cancelled, nothing was logged."
+    assert sink.written == 0
@@ -0,0 +1,86 @@
+import datetime
+import itertools
+import types
+import pytest
+import deckController
+import fileIO as fio
+from deckController import DeckController
+from studentDataManager import StudentDataManager as SDM
+from StudentQueue import StudentQueue
+
+exports = itertools.count()
+
+
+def exported():
+    """(times called, times flagged) of every student in a fresh final participation export."""
+    path = f"participation_{next(exports)}.txt"
+    fio.export_final_participation(path)
+    with open(path) as f:
+        rows = [line.rstrip("\n").split(fio.DELIMITER) for line in list(f)[1:]]
+    return {row[4]: (int(row[0]), int(row[1])) for row in rows}
+
+
+def analyzed():
+    analytics = pytest.importorskip("analytics")
+    logs = analytics.load_logs(include_roster=False)
+    report = analytics.compute_report(logs)
+    return {student[2]: (int(report["calls"][i]), int(report["flags"][i])) for i, student in enumerate(logs.students)}
+
+
+def flagged():
+    return {uoid: len(calls) for uoid, (student, calls) in fio.flagged_calls().items()}
+
+
+def test_undone_call_is_gone_from_every_reader_until_it_is_redone(roster):
+    deck = DeckController(StudentQueue(roster))
+    uoid = SDM.StudentRoster[deck.deckIds()[0]][2]
+    deck.left()
+    deck.flag()
+    deck.flush()
+    assert (exported(), analyzed(), flagged()) == ({uoid: (1, 1)}, {uoid: (1, 1)}, {uoid: 1})
+
+    assert deck.undo()
+    assert (exported(), analyzed(), flagged()) == ({}, {}, {})
+
+    assert deck.redo()
+    assert (exported(), analyzed(), flagged()) == ({uoid: (1, 1)}, {uoid: (1, 1)}, {uoid: 1})
+
+
+class Clock:
+    """Stands in for datetime.datetime in the deck controller, so its calls are logged at known times."""
+    start = datetime.datetime.combine(datetime.date.today(), datetime.time(0, 0, 1))
+    ticks = 0
+
+    @classmethod
+    def now(cls):
+        cls.ticks += 1
+        return cls.start + datetime.timedelta(seconds=cls.ticks)
+
+
+def test_undo_after_call_on_takes_back_the_call_on(roster, monkeypatch):
+    monkeypatch.setattr(deckController, "datetime", types.SimpleNamespace(datetime=Clock))
+    deck = DeckController(StudentQueue(roster))
+    studentId = deck.deckIds()[0]
+    uoid = SDM.StudentRoster[studentId][2]
+    deck.left()
+    deck.remove()
+    deck.flush()
+    afterDeckCall = list(deck.queue.queue)
+    deckCallTime = Clock.start + datetime.timedelta(seconds=Clock.ticks)
+
+    # The student is off the deck now, so calling on them again only logs the call
+    assert not deck.callOn(studentId)
+    assert exported() == {uoid: (2, 0)}
+
+    # The call on is the newest call, so it is the one taken back, by the controller and by the log's readers
+    assert deck.undo()
+    assert deck.queue.queue == afterDeckCall
+    assert fio.student_history(uoid) == [(deckCallTime.strftime("%Y/%m/%d"), deckCallTime.strftime("%H:%M:%S"), False)]
+
+    assert deck.undo()
+    assert deck.queue.queue != afterDeckCall and studentId in deck.deckIds()
+    assert exported() == {}
+
+    assert deck.redo() and deck.redo()
+    assert exported() == {uoid: (2, 0)}
+    assert not deck.redo()
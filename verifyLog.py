@@ -0,0 +1,49 @@
+"""verifyLog.py - Python file that verifies the cold call logs from the command line (see
+fileIO.verify_log), and can move their bad lines into ./data/logs/quarantine.
+"""
+
+import sys
+import fileIO as fio
+
+SHOWN = 20
+#the number of bad lines listed per log, the rest are only counted
+
+
+def formatVerification(verification):
+    """Returns a report of one verified log."""
+    lines = [f"{verification.path}: {verification.records} records checked, {verification.unchecked} without a checksum, "
+             f"{len(verification.bad)} bad"]
+    if verification.checksum is None:
+        lines.append("  the log has no running checksum")
+    elif not verification.checksum:
+        lines.append("  the running checksum does not match, the log was changed outside the program")
+    if verification.unchecksummed_bytes:
+        lines.append(f"  the last {verification.unchecksummed_bytes} bytes are not covered by the running checksum")
+    for line, reason, text in verification.bad[:SHOWN]:
+        lines.append(f"  line {line}: {reason}: {text[:80]}")
+    if len(verification.bad) > SHOWN:
+        lines.append(f"  ... and {len(verification.bad) - SHOWN} more")
+    if verification.quarantine_path is not None:
+        lines.append(f"  bad lines moved to {verification.quarantine_path}")
+    return "\n".join(lines)
+
+
+def Main(argv=None):
+    """Usage: python verifyLog.py [--quarantine] [log ...]
+
+    Verifies each log (the live log if none is given), returns 1 if any of them has bad lines."""
+
+    argv = sys.argv[1:] if argv is None else argv
+    quarantine = "--quarantine" in argv
+    paths = [arg for arg in argv if arg != "--quarantine"] or [fio.LOG_PATH]
+
+    clean = True
+    for path in paths:
+        verification = fio.verify_log(path, quarantine=quarantine)
+        print(formatVerification(verification))
+        clean = clean and not verification.bad and verification.checksum is not False
+    return 0 if clean else 1
+
+
+if __name__ == '__main__':
+    sys.exit(Main())